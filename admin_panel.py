@@ -7,8 +7,14 @@ from datetime import datetime
 from dotenv import load_dotenv
 import os
 import re
+import bisect
+import time
+from collections import Counter, deque
+
+import aiohttp
 
 from src.bot.constants import GROUPS_BY_COURSE
+from src.config.settings import METRICS_HOST, METRICS_PORT
 
 load_dotenv()
 
@@ -17,6 +23,89 @@ if not ADMIN_PASSWORD:
     raise ValueError("ADMIN_PASSWORD не установлен в .env файле!")
 
 GROUP_FORMAT_PATTERN = re.compile(r"^[1-4][а-яё]{1,3}\d{1,2}$", re.IGNORECASE)
+PAGE_SIZE = 50
+EVENTS_URL = f"http://{METRICS_HOST}:{METRICS_PORT}/events"
+LIVE_REDRAW_INTERVAL = 0.5  # не чаще, чем раз в полсекунды: при нагрузке событий сотни в секунду
+LIVE_RECONNECT_DELAY = 5
+
+
+class KeysetTable:
+    """
+    Таблица, которая загружает данные страницами по ключу последней строки.
+
+    fetch(cursor, limit, **filters) возвращает строки после cursor; cursor_of(row)
+    даёт ключ для следующей страницы. Запрашивается на одну строку больше
+    страницы — так видно, есть ли следующая, без COUNT(*).
+    """
+
+    def __init__(self, columns, fetch, cursor_of, filters):
+        self.columns = columns  # [(заголовок, ключ строки)]
+        self.fetch = fetch
+        self.cursor_of = cursor_of
+        self.filters = filters  # {параметр fetch: поле ввода}
+        self._cursors = [None]  # курсоры начала уже открытых страниц
+        self.loaded = False
+
+        self.table = ft.DataTable(columns=[ft.DataColumn(ft.Text(title)) for title, _ in columns], rows=[])
+        self.info = ft.Text(color=ft.Colors.GREY_400)
+        self.prev_button = ft.OutlinedButton("◀ Назад", on_click=self.prev_page, disabled=True)
+        self.next_button = ft.OutlinedButton("Дальше ▶", on_click=self.next_page, disabled=True)
+        for field in filters.values():
+            field.on_submit = self.apply_filters
+
+    @property
+    def control(self):
+        return ft.Column([
+            ft.Row([*self.filters.values(), ft.FilledButton("Найти", on_click=self.apply_filters)]),
+            self.table,
+            ft.Row([self.prev_button, self.next_button, self.info]),
+        ])
+
+    def _filter_values(self):
+        values = {}
+        for name, field in self.filters.items():
+            value = (field.value or "").strip()
+            if value:
+                values[name] = int(value) if name == "user_id" and value.isdigit() else value
+        return values
+
+    async def load(self):
+        self.loaded = True
+        self.info.value = "Загрузка..."
+        self.info.update()
+        page_number = len(self._cursors)
+        rows = await self.fetch(self._cursors[-1], PAGE_SIZE + 1, **self._filter_values())
+        has_next = len(rows) > PAGE_SIZE
+        rows = rows[:PAGE_SIZE]
+
+        self.table.rows = [
+            ft.DataRow(cells=[ft.DataCell(ft.Text("" if row.get(key) is None else str(row[key])))
+                              for _, key in self.columns])
+            for row in rows
+        ]
+        self._next_cursor = self.cursor_of(rows[-1]) if has_next else None
+        self.prev_button.disabled = page_number == 1
+        self.next_button.disabled = not has_next
+        self.info.value = f"Страница {page_number}" if rows else "Ничего не найдено"
+        self.table.update()
+        self.prev_button.update()
+        self.next_button.update()
+        self.info.update()
+
+    async def next_page(self, e):
+        if self._next_cursor is not None:
+            self._cursors.append(self._next_cursor)
+            await self.load()
+
+    async def prev_page(self, e):
+        if len(self._cursors) > 1:
+            self._cursors.pop()
+            await self.load()
+
+    async def apply_filters(self, e):
+        self._cursors = [None]
+        await self.load()
+
 
 async def main(page: ft.Page):
     page.title = "Админ-панель расписания"
@@ -29,6 +118,7 @@ async def main(page: ft.Page):
     password_field = ft.TextField(label="Введите пароль", password=True, width=400)
     error_text = ft.Text(color=ft.Colors.RED)
     status_text = ft.Text(color=ft.Colors.GREEN)
+    live_task = None
 
     async def login(e):
         if password_field.value == ADMIN_PASSWORD:
@@ -40,6 +130,10 @@ async def main(page: ft.Page):
         page.update()
 
     async def logout(e):
+        nonlocal live_task
+        if live_task is not None:
+            live_task.cancel()
+            live_task = None
         page.controls.clear()
         password_field.value = ""
         page.add(
@@ -66,11 +160,11 @@ async def main(page: ft.Page):
     async def admin_dashboard():
         await db.connect()
 
-        stats = await db.get_statistics()
-        info = await db.get_database_info()
-
-        all_schedules = await db.get_all_schedules()
-        available_groups = sorted(all_schedules.keys())
+        # Панель рисуется сразу; статистика и список групп догружаются в фоне,
+        # подсчёт записей по таблицам и просмотр данных — по кнопке
+        stats = None
+        info = None
+        available_groups = []
 
         # Блок "О проекте"
         about_project_block = ft.Container(
@@ -232,10 +326,9 @@ async def main(page: ft.Page):
                 new_group_field.value = ""
                 schedule_json_field.value = ""
 
-                # Обновляем список групп
-                nonlocal all_schedules, available_groups
-                all_schedules = await db.get_all_schedules()
-                available_groups = sorted(all_schedules.keys())
+                # Добавляем группу в список, не перечитывая все расписания
+                if group_upper not in available_groups:
+                    bisect.insort(available_groups, group_upper)
 
                 # Обновляем dropdown
                 group_dropdown.options = [ft.dropdown.Option(g) for g in available_groups]
@@ -269,24 +362,53 @@ async def main(page: ft.Page):
 
         def refresh_display():
             stats_column.controls.clear()
-            stats_column.controls.extend([
-                ft.Text("Статистика бота", size=24),
-                ft.Text(f"Всего пользователей: {stats.get('total_users', 0)}"),
-                ft.Text(f"Всего запросов расписания: {stats.get('total_requests', 0)}"),
-                ft.Text("Популярные группы:", weight=ft.FontWeight.BOLD),
-                ft.Column([ft.Text(f"• {g['_id']} — {g['count']} запросов") for g in stats.get('popular_groups', [])] or [ft.Text("Нет данных")])
-            ])
+            if stats is None:
+                stats_column.controls.extend([
+                    ft.Text("Статистика бота", size=24),
+                    ft.ProgressRing(width=24, height=24),
+                ])
+            else:
+                stats_column.controls.extend([
+                    ft.Text("Статистика бота", size=24),
+                    ft.Text(f"Всего пользователей: {stats.get('total_users', 0)}"),
+                    ft.Text(f"Всего запросов расписания: {stats.get('total_requests', 0)}"),
+                    ft.Text("Популярные группы:", weight=ft.FontWeight.BOLD),
+                    ft.Column([ft.Text(f"• {g['_id']} — {g['count']} запросов") for g in stats.get('popular_groups', [])] or [ft.Text("Нет данных")])
+                ])
 
             db_info_column.controls.clear()
-            db_info_column.controls.extend([
-                ft.Text("Информация о базе данных", size=24),
-                ft.Text(f"Путь к БД: {info.get('database_path', 'неизвестно')}"),
-                ft.Column([ft.Text(f"• {table_names_ru.get(table, table)}: {count} записей") for table, count in info.get('tables', {}).items()])
-            ])
+            db_info_column.controls.append(ft.Text("Информация о базе данных", size=24))
+            if info is None:
+                # COUNT(*) по всем таблицам на большой БД небыстрый — только по запросу
+                db_info_column.controls.append(
+                    ft.OutlinedButton("Подсчитать записи в таблицах", on_click=load_db_info)
+                )
+            else:
+                db_info_column.controls.extend([
+                    ft.Text(f"Путь к БД: {info.get('database_path', 'неизвестно')}"),
+                    ft.Column([ft.Text(f"• {table_names_ru.get(table, table)}: {count} записей") for table, count in info.get('tables', {}).items()])
+                ])
 
+        async def load_stats():
+            nonlocal stats
+            stats = await db.get_statistics()
+            refresh_display()
             page.update()
 
-        refresh_display()
+        async def load_groups():
+            available_groups[:] = await db.get_group_names()
+            # Выбор пользователя не сбрасываем — только подставляем варианты
+            course_number = course_dropdown.value.split()[0] if course_dropdown.value else ""
+            group_dropdown.options = [ft.dropdown.Option(g) for g in available_groups if g.startswith(course_number)]
+            group_dropdown.update()
+
+        async def load_db_info(e):
+            nonlocal info
+            db_info_column.controls[1:] = [ft.ProgressRing(width=24, height=24)]
+            page.update()
+            info = await db.get_database_info()
+            refresh_display()
+            page.update()
 
         async def refresh_stats(e):
             status_text.value = "Обновление статистики..."
@@ -295,20 +417,160 @@ async def main(page: ft.Page):
 
             nonlocal stats, info
             stats = await db.get_statistics()
-            info = await db.get_database_info()
+            if info is not None:
+                info = await db.get_database_info()
             refresh_display()
 
             status_text.value = "✅ Статистика обновлена!"
             status_text.color = ft.Colors.GREEN
             page.update()
 
+        # Бот в реальном времени: события из процесса бота, SQLite не трогаем
+        live_connection = ft.Text("Подключение к боту...", color=ft.Colors.GREY_400)
+        live_preload_bar = ft.ProgressBar(width=400, value=0)
+        live_preload = ft.Text("Предзагрузка: нет данных")
+        live_cache = ft.Text("Кэш: нет данных")
+        live_outbox = ft.Text("Очередь отправки: нет данных")
+        live_requests = ft.Text("Запросов с момента подключения: 0")
+        live_errors = ft.Column([ft.Text("Ошибок нет", color=ft.Colors.GREY_400)])
+        session_groups = Counter()
+        recent_errors = deque(maxlen=10)
+        session_requests = 0
+
+        live_column = ft.Column([
+            ft.Text("Бот в реальном времени", size=24),
+            live_connection,
+            live_preload,
+            live_preload_bar,
+            live_cache,
+            live_outbox,
+            live_requests,
+            ft.Text("Последние ошибки хендлеров:", weight=ft.FontWeight.BOLD),
+            live_errors,
+        ])
+
+        def apply_event(event):
+            nonlocal session_requests
+            kind = event.get('type')
+            if kind == 'snapshot':
+                apply_event({'type': 'preload', **event['status']['preload']})
+            if kind in ('snapshot', 'stats'):
+                cache, queue = event['cache'], event['outbox']
+                live_cache.value = (f"Кэш: {cache['groups']} групп, попаданий {cache['hit_ratio']:.1%} "
+                                    f"({cache['hits']} / {cache['hits'] + cache['misses']})")
+                live_outbox.value = (f"Очередь отправки: в очереди {sum(queue['queue_depth'].values())}, "
+                                     f"отправлено {queue['sent']}, ошибок {queue['failed']}, "
+                                     f"p95 {queue['latency_ms']['p95']:.0f} мс")
+            elif kind == 'preload':
+                total = event['total']
+                live_preload_bar.value = event['done'] / total if total else 0
+                state = "идёт" if event['running'] else "завершена"
+                live_preload.value = (f"Предзагрузка {state}: {event['done']}/{total}, "
+                                      f"с ошибками {event['failed']}")
+            elif kind == 'request':
+                session_requests += 1
+                session_groups[event['group']] += 1
+                top = ", ".join(f"{g} ({n})" for g, n in session_groups.most_common(5))
+                live_requests.value = f"Запросов с момента подключения: {session_requests}; чаще всего: {top}"
+                # Счётчики из БД досчитываем сами, а не перезапрашиваем агрегаты
+                if stats is not None:
+                    stats['total_requests'] = stats.get('total_requests', 0) + 1
+                    for item in stats.get('popular_groups', []):
+                        if item['_id'] == event['group']:
+                            item['count'] += 1
+                            stats['popular_groups'].sort(key=lambda g: g['count'], reverse=True)
+                            break
+            elif kind == 'error':
+                moment = datetime.fromtimestamp(event['ts']).strftime("%H:%M:%S")
+                recent_errors.appendleft(f"{moment} {event['handler']}: {event['error']}")
+                live_errors.controls = [ft.Text(line, color=ft.Colors.RED_300) for line in recent_errors]
+
+        async def follow_events():
+            # Сервер событий живёт рядом с /metrics; бот может быть ещё не запущен — переподключаемся
+            async with aiohttp.ClientSession() as session:
+                while True:
+                    try:
+                        async with session.ws_connect(EVENTS_URL, heartbeat=30) as ws:
+                            live_connection.value = "🟢 Подключено к боту"
+                            live_connection.color = ft.Colors.GREEN
+                            live_column.update()
+                            drawn_at = 0.0
+                            async for message in ws:
+                                if message.type != aiohttp.WSMsgType.TEXT:
+                                    break
+                                event = message.json()
+                                apply_event(event)
+                                now = time.monotonic()
+                                if event['type'] in ('snapshot', 'stats') or now - drawn_at >= LIVE_REDRAW_INTERVAL:
+                                    drawn_at = now
+                                    refresh_display()
+                                    page.update()
+                    except aiohttp.ClientError:
+                        pass
+                    live_connection.value = f"🔴 Бот недоступен ({EVENTS_URL}), переподключение..."
+                    live_connection.color = ft.Colors.RED
+                    live_column.update()
+                    await asyncio.sleep(LIVE_RECONNECT_DELAY)
+
+        # Просмотр данных: страницы по ключу и фильтры на стороне БД
+        browsers = {
+            "Пользователи": KeysetTable(
+                [("Telegram ID", "user_id"), ("Группа", "group_name"), ("Активность", "last_activity")],
+                lambda cursor, limit, **filters: db.list_users(cursor, limit, **filters),
+                lambda row: row['user_id'],
+                {"group_name": ft.TextField(label="Группа", width=200)},
+            ),
+            "Логи": KeysetTable(
+                [("ID", "id"), ("Telegram ID", "user_id"), ("Группа", "group_name"), ("День", "day"), ("Время", "timestamp")],
+                lambda cursor, limit, **filters: db.list_logs(cursor, limit, **filters),
+                lambda row: row['id'],
+                {"user_id": ft.TextField(label="Telegram ID", width=200),
+                 "group_name": ft.TextField(label="Группа", width=200)},
+            ),
+            "Расписания": KeysetTable(
+                [("Группа", "group_name"), ("Неделя", "week_start"), ("Обновлено", "updated_at"),
+                 ("Активно", "is_active"), ("Размер, байт", "size_bytes")],
+                lambda cursor, limit, **filters: db.list_schedules(cursor, limit, **filters),
+                lambda row: (row['group_name'], row['week_start']),
+                {"group_prefix": ft.TextField(label="Группа начинается с", width=200)},
+            ),
+        }
+        browser_area = ft.Container()
+
+        async def open_browser(name):
+            browser = browsers[name]
+            browser_area.content = browser.control
+            browser_area.update()
+            if not browser.loaded:
+                await browser.load()
+
+        data_section = ft.Column([
+            ft.Text("Данные", size=24),
+            ft.Row([
+                ft.OutlinedButton(name, on_click=lambda e, name=name: asyncio.create_task(open_browser(name)))
+                for name in browsers
+            ]),
+            browser_area,
+        ])
+
         # Кнопки действий
         action_buttons = ft.Column([
             ft.FilledButton("Обновить расписание", on_click=lambda e: asyncio.create_task(update_schedules()), width=250, style=ft.ButtonStyle(bgcolor=ft.Colors.BLUE_700)),
             ft.FilledButton("Обновить статистику бота", on_click=refresh_stats, width=250, style=ft.ButtonStyle(bgcolor=ft.Colors.GREEN_700)),
             ft.FilledButton("Очистить кэш", on_click=lambda e: asyncio.create_task(clear_cache()), width=250, style=ft.ButtonStyle(bgcolor=ft.Colors.RED_700)),
+            ft.FilledButton("Резервная копия БД", on_click=lambda e: asyncio.create_task(backup_database()), width=250, style=ft.ButtonStyle(bgcolor=ft.Colors.AMBER_700)),
         ], spacing=15)
 
+        refresh_display()
+        # Задачи стартуют, когда панель уже добавлена на страницу
+        asyncio.create_task(load_stats())
+        asyncio.create_task(load_groups())
+        nonlocal live_task
+        if METRICS_PORT:
+            live_task = asyncio.create_task(follow_events())
+        else:
+            live_connection.value = "Поток событий выключен (METRICS_PORT=0)"
+
         # Основной интерфейс
         return ft.Column([
             ft.Row([
@@ -337,12 +599,18 @@ async def main(page: ft.Page):
             stats_column,
             ft.Divider(),
 
+            live_column,
+            ft.Divider(),
+
             ft.Row([
                 db_info_column,
                 ft.VerticalDivider(width=40),
                 action_buttons
             ], alignment=ft.MainAxisAlignment.START, vertical_alignment=ft.CrossAxisAlignment.START),
 
+            ft.Divider(),
+            data_section,
+
             ft.Divider(),
             status_text
         ], spacing=20)
@@ -365,4 +633,21 @@ async def main(page: ft.Page):
         status_text.color = ft.Colors.GREEN
         page.update()
 
+    async def backup_database():
+        status_text.value = "Создание резервной копии..."
+        status_text.color = ft.Colors.BLUE
+        page.update()
+        try:
+            result = await db.backup()
+            status_text.value = (
+                f"✅ Резервная копия: {result['path']} — "
+                f"{result['size_bytes'] / 1024:.1f} КБ за {result['duration']:.2f} с "
+                f"({result['pages_per_sec']:.0f} стр/с)"
+            )
+            status_text.color = ft.Colors.GREEN
+        except Exception as ex:
+            status_text.value = f"❌ Ошибка резервного копирования: {str(ex)}"
+            status_text.color = ft.Colors.RED
+        page.update()
+
 ft.app(target=main)
\ No newline at end of file
@@ -0,0 +1,88 @@
+"""Общие помощники бенчмарков: синтетические данные и отчёт по перцентилям."""
+import random
+import time
+from datetime import date, timedelta
+from typing import Dict, List
+
+from src.parser.parser import format_date_russian
+
+DAY_KEYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday']
+DAY_NAMES = ["Понедельник", "Вторник", "Среда", "Четверг", "Пятница", "Суббота", "Вся неделя"]
+
+SUBJECTS = [
+    "Математика", "Информатика", "Физика", "История", "Английский язык",
+    "Экономика организации", "Бухгалтерский учёт", "Физическая культура",
+    "Основы алгоритмизации", "Базы данных", "Право", "Менеджмент",
+    "Статистика", "Операционные системы", "Компьютерные сети",
+]
+SURNAMES = [
+    "Иванов", "Петрова", "Сидоров", "Кузнецова", "Смирнов", "Попова", "Васильев",
+    "Соколова", "Михайлов", "Новикова", "Фёдоров", "Морозова", "Волков", "Алексеева",
+    "Лебедев", "Семёнова", "Егоров", "Павлова", "Козлов", "Степанова", "Николаев",
+    "Орлова", "Андреев", "Макарова", "Захаров", "Зайцева", "Соловьёв", "Борисова",
+    "Яковлев", "Григорьева", "Романов", "Воробьёва", "Сергеев", "Кузьмина", "Фролов",
+]
+INITIALS = "АБВГДЕИКЛМНОПРСТ"
+
+
+def make_teachers(rng: random.Random, count: int = 120) -> List[str]:
+    teachers = set()
+    while len(teachers) < count:
+        teachers.add(f"{rng.choice(SURNAMES)} {rng.choice(INITIALS)}.{rng.choice(INITIALS)}.")
+    return sorted(teachers)
+
+
+def fake_schedule(rng: random.Random, week_start: date, teachers: List[str]) -> Dict:
+    """Расписание группы на неделю в формате, который отдаёт парсер"""
+    schedule: Dict = {}
+    for offset, day_key in enumerate(DAY_KEYS):
+        lessons = []
+        for pair in range(1, rng.randint(2, 5) + 1):
+            lessons.append(
+                f"{pair} пара: {rng.choice(SUBJECTS)} {rng.choice(teachers)} каб. {rng.randint(101, 420)}"
+            )
+        schedule[day_key] = {
+            'lessons': lessons,
+            'date': format_date_russian(week_start + timedelta(days=offset))
+        }
+    week_end = week_start + timedelta(days=5)
+    schedule['date_range'] = f"{week_start:%d.%m.%Y}-{week_end:%d.%m.%Y}"
+    schedule['current_day'] = ""
+    return schedule
+
+
+def percentile(sorted_samples: List[float], q: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, max(0, round(q / 100 * len(sorted_samples)) - 1))
+    return sorted_samples[index]
+
+
+def report(title: str, results: Dict[str, List[float]]) -> None:
+    """Печатает таблицу латентностей в миллисекундах"""
+    print(f"\n{title}")
+    print(f"{'операция':<32}{'n':>8}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+    for name, samples in results.items():
+        ordered = sorted(samples)
+        mean = sum(ordered) / len(ordered) if ordered else 0.0
+        print(
+            f"{name:<32}{len(ordered):>8}"
+            f"{mean * 1000:>10.3f}{percentile(ordered, 50) * 1000:>10.3f}"
+            f"{percentile(ordered, 95) * 1000:>10.3f}{percentile(ordered, 99) * 1000:>10.3f}"
+            f"{(ordered[-1] if ordered else 0.0) * 1000:>10.3f}"
+        )
+
+
+class Timer:
+    """Контекстный менеджер: добавляет длительность блока в список"""
+
+    def __init__(self, samples: List[float]):
+        self.samples = samples
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.samples.append(time.perf_counter() - self.started)
+        return False
@@ -0,0 +1,83 @@
+"""
+Пропускная способность ежедневной рассылки и задержка интерактивных ответов во время неё.
+
+    python -m benchmarks.digest_bench --subscribers 20000 --rate 1000
+"""
+import os
+
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+from typing import Dict, List
+
+from benchmarks.common import fake_schedule, make_teachers, report
+from src.bot.constants import ALL_GROUPS
+from benchmarks.fake_telegram import FakeTelegramAPI
+from src.bot.core import bot
+from src.bot.digest import send_digest
+from src.bot.outbox import outbox
+from src.bot.schedule_cache import schedule_cache
+from src.database.db import db
+
+
+async def seed(rng: random.Random, subscribers: int) -> date:
+    teachers = make_teachers(rng)
+    monday = date.today() - timedelta(days=date.today().weekday())
+    for group in ALL_GROUPS:
+        await db.save_schedule(group, fake_schedule(rng, monday, teachers), monday.isoformat())
+    for user_id in range(1, subscribers + 1):
+        await db.save_user_preference(user_id, rng.choice(ALL_GROUPS))
+        await db.set_digest_subscription(user_id, True)
+    await schedule_cache.reload()
+    return monday + timedelta(days=1)  # вторник: дата совпадает с синтетическим расписанием
+
+
+async def interactive_probe(stop: asyncio.Event, samples: List[float]) -> None:
+    """Имитирует ответы пользователям, которые пишут боту во время рассылки"""
+    chat_id = 10_000_000
+    while not stop.is_set():
+        chat_id += 1
+        started = time.perf_counter()
+        await bot.send_message(chat_id, "ответ пользователю")
+        samples.append(time.perf_counter() - started)
+        await asyncio.sleep(0.05)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", type=int, default=20000)
+    parser.add_argument("--rate", type=float, default=1000, help="общий лимит очереди, сообщений/с")
+    parser.add_argument("--api-latency", type=float, default=0.005, help="задержка поддельного API, с")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    target_date = await seed(random.Random(args.seed), args.subscribers)
+    api = FakeTelegramAPI(latency=args.api_latency)
+    await api.start()
+    await outbox.start(bot, global_rate=args.rate)
+
+    stop = asyncio.Event()
+    interactive: List[float] = []
+    probe = asyncio.create_task(interactive_probe(stop, interactive))
+    result = await send_digest(target_date)
+    stop.set()
+    await probe
+
+    print(f"подписчиков: {result['recipients']}, групп: {result['groups']}, доставлено: {result['sent']}, "
+          f"ошибок: {result['failed']}")
+    print(f"время: {result['duration']:.2f} с, пропускная способность: {result['per_sec']:.0f} сообщений/с "
+          f"(лимит {args.rate:g})")
+    results: Dict[str, List[float]] = {"интерактивный ответ": interactive}
+    report("задержка ответов во время рассылки, мс", results)
+
+    await outbox.stop()
+    await bot.close_session()
+    await api.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
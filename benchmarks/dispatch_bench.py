@@ -0,0 +1,83 @@
+"""
+Бенчмарк выбора хендлера: старая цепочка предикатов против TextRouter.
+
+    python -m benchmarks.dispatch_bench --messages 200000
+"""
+import argparse
+import random
+import time
+from types import SimpleNamespace
+
+from benchmarks.common import DAY_NAMES
+from src.bot.constants import ALL_GROUPS, GROUPS_BY_COURSE, DAYS_MAPPING
+import src.bot.handlers  # noqa: F401 — регистрация маршрутов
+from src.bot.router import router
+
+MENU_TEXTS = [
+    "🏠 Главное меню", "ℹ️ Информация о проекте", "📅 Расписание",
+    "🔍 Поиск по преподавателю", "👨‍🏫 Все преподаватели на неделю", "Назад к курсам",
+]
+FREE_TEXTS = ["привет", "Иванов", "как дела?", "расписание на завтра"]
+
+# Словари режимов в том виде, в каком их проверяла старая цепочка
+search_mode: dict[int, bool] = {}
+admin_password_mode: dict[int, bool] = {}
+
+
+def legacy_chain():
+    """Предикаты в том порядке, в каком их проверял telebot до роутера"""
+    return [
+        lambda m: m.text and m.text.strip() == "🏠 Главное меню",
+        lambda m: m.text == "ℹ️ Информация о проекте",
+        lambda m: m.text == "📅 Расписание",
+        lambda m: m.text == "🔍 Поиск по преподавателю",
+        lambda m: m.text == "👨‍🏫 Все преподаватели на неделю",
+        lambda m: m.text and m.from_user.id in search_mode and search_mode[m.from_user.id],
+        lambda m: m.from_user.id in admin_password_mode and admin_password_mode[m.from_user.id],
+        lambda m: m.text == "🚪 Выйти из админ-панели",
+        lambda m: m.text in ["📊 Статистика", "🗑 Очистить кэш", "🗃 Инфо о БД", "🔄 Обновить расписания"],
+        lambda m: m.text in GROUPS_BY_COURSE.keys(),
+        lambda m: m.text == "Назад к курсам",
+        lambda m: any(m.text in groups for groups in GROUPS_BY_COURSE.values()),
+        lambda m: m.text in DAYS_MAPPING.keys(),
+        lambda m: True,
+    ]
+
+
+def make_messages(count: int, rng: random.Random) -> list:
+    pool = MENU_TEXTS + list(GROUPS_BY_COURSE) + ALL_GROUPS + DAY_NAMES + FREE_TEXTS
+    return [
+        SimpleNamespace(text=rng.choice(pool), from_user=SimpleNamespace(id=rng.randint(1, 100_000)))
+        for _ in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    messages = make_messages(args.messages, random.Random(args.seed))
+    chain = legacy_chain()
+
+    started = time.perf_counter()
+    for message in messages:
+        for predicate in chain:
+            if predicate(message):
+                break
+    legacy = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for message in messages:
+        router.resolve(message)
+    routed = time.perf_counter() - started
+
+    print(f"сообщений: {args.messages}")
+    print(f"цепочка предикатов: {legacy / args.messages * 1e6:8.3f} мкс/сообщение")
+    print(f"TextRouter:         {routed / args.messages * 1e6:8.3f} мкс/сообщение")
+    print(f"ускорение:          {legacy / routed:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
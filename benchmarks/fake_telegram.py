@@ -0,0 +1,155 @@
+"""
+Локальный поддельный Telegram Bot API для бенчмарков и нагрузочных прогонов.
+
+Отвечает на методы бота как настоящий API (ok/result), запоминает все вызовы
+с отметкой времени и может отдавать синтетические 429 для проверки бэкоффа.
+"""
+import asyncio
+import itertools
+import json
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+from telebot import asyncio_helper
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "ScheduleBot", "username": "schedule_bot"}
+
+
+class FakeTelegramAPI:
+    def __init__(self, host: str = "127.0.0.1", port: int = 8081, latency: float = 0.0,
+                 throttle_every: int = 0, retry_after: int = 1) -> None:
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.throttle_every = throttle_every  # каждый N-й вызов получает 429
+        self.retry_after = retry_after
+        self.calls: List[Dict[str, Any]] = []
+        self.methods: Counter = Counter()
+        self.waiters: Dict[int, asyncio.Future] = {}
+        self._message_ids = itertools.count(1)
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def api_url(self) -> str:
+        return f"http://{self.host}:{self.port}/bot{{0}}/{{1}}"
+
+    async def _read_params(self, request: web.Request) -> Dict[str, Any]:
+        if request.content_type == "application/json":
+            return await request.json()
+        params = dict(await request.post())
+        params.update(request.query)
+        return params
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        params = await self._read_params(request)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        self.methods[method] += 1
+        if self.throttle_every and self.methods[method] % self.throttle_every == 0:
+            return web.json_response({
+                "ok": False, "error_code": 429,
+                "description": f"Too Many Requests: retry after {self.retry_after}",
+                "parameters": {"retry_after": self.retry_after}
+            }, status=429)
+
+        self.calls.append({"method": method, "params": params, "at": time.perf_counter()})
+        result = self.result_for(method, params)
+        self.notify(params.get("chat_id"))
+        return web.json_response({"ok": True, "result": result})
+
+    def result_for(self, method: str, params: Dict[str, Any]) -> Any:
+        if method == "getMe":
+            return BOT_USER
+        if method in ("sendMessage", "editMessageText", "sendDocument"):
+            chat_id = int(params.get("chat_id") or 0)
+            return {
+                "message_id": int(params.get("message_id") or next(self._message_ids)),
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "from": BOT_USER,
+                "text": params.get("text", ""),
+            }
+        return True
+
+    def notify(self, chat_id: Any) -> None:
+        """Будит того, кто ждёт ответа в этот чат"""
+        if chat_id is None:
+            return
+        waiter = self.waiters.pop(int(chat_id), None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(time.perf_counter())
+
+    def wait_for_reply(self, chat_id: int) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self.waiters[chat_id] = future
+        return future
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_route("*", "/bot{token}/{method}", self.handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        # Все запросы telebot теперь идут сюда
+        asyncio_helper.API_URL = self.api_url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+_update_ids = itertools.count(1)
+
+
+def make_text_update(user_id: int, text: str) -> Dict[str, Any]:
+    """JSON входящего обновления с текстовым сообщением от пользователя"""
+    update_id = next(_update_ids)
+    user = {"id": user_id, "is_bot": False, "first_name": f"Студент{user_id}", "username": f"student{user_id}"}
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private", "first_name": user["first_name"]},
+            "from": user,
+            "text": text,
+            **({"entities": [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]}
+               if text.startswith("/") else {}),
+        },
+    }
+
+
+def make_callback_update(user_id: int, data: str, message_id: int = 1) -> Dict[str, Any]:
+    """JSON нажатия inline-кнопки под сообщением бота"""
+    update_id = next(_update_ids)
+    user = {"id": user_id, "is_bot": False, "first_name": f"Студент{user_id}", "username": f"student{user_id}"}
+    return {
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "from": user,
+            "chat_instance": str(user_id),
+            "data": data,
+            "message": {
+                "message_id": message_id,
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private", "first_name": user["first_name"]},
+                "from": BOT_USER,
+                "text": "…",
+            },
+        },
+    }
+
+
+def reply_in_body(body: bytes) -> bool:
+    """Есть ли в ответе на webhook встроенный вызов метода"""
+    if not body:
+        return False
+    try:
+        return "method" in json.loads(body)
+    except ValueError:
+        return False
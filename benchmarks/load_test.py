@@ -0,0 +1,289 @@
+"""
+Нагрузочный прогон: синтетические студенты проходят сценарии через настоящие хендлеры.
+
+Обновления подаются в bot.process_new_updates, ответы принимает поддельный
+Telegram API, расписания всех групп заранее лежат в SQLite. Сценарии стартуют
+с заданной частотой (открытая модель нагрузки) и идут параллельно. Отчёт —
+пропускная способность, p50/p95/p99 и ошибки по хендлерам; его можно сохранить
+как базовый и сравнивать с ним следующие прогоны.
+
+    python -m benchmarks.load_test --rate 20 --duration 30 --save baseline.json
+    python -m benchmarks.load_test --rate 20 --duration 30 --baseline baseline.json
+"""
+import os
+import tempfile
+
+API_PORT = 8092
+os.environ.setdefault("BOT_TOKEN", "123456:bench")
+os.environ.setdefault("STORAGE_BACKEND", "sqlite")
+os.environ.setdefault("DATABASE_PATH", os.path.join(tempfile.mkdtemp(prefix="load_test_"), "load.db"))
+os.environ["TELEGRAM_API_URL"] = f"http://127.0.0.1:{API_PORT}/bot{{0}}/{{1}}"
+os.environ.setdefault("OUTBOX_GLOBAL_RATE", "100000")  # общий лимит Telegram здесь не измеряем
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import Counter
+from datetime import date, timedelta
+from typing import Any, Dict, List, Tuple
+
+from telebot.types import Update
+
+from benchmarks.common import DAY_KEYS, fake_schedule, make_teachers, percentile, report
+from benchmarks.fake_telegram import FakeTelegramAPI, make_callback_update, make_text_update
+from src.bot.constants import ALL_GROUPS, DAYS_MAPPING, GROUPS_BY_COURSE
+from src.bot.core import bot
+from src.bot.fetcher import schedule_fetcher
+from src.bot.metrics import HANDLER_ERRORS
+from src.bot.outbox import outbox
+from src.bot.rooms import room_index
+from src.bot.schedule_cache import schedule_cache
+from src.bot.teachers import teacher_index
+from src.database.db import db
+
+import src.bot.handlers  # noqa: F401 — регистрация хендлеров
+
+# Шаг сценария: (text | callback, текст или callback_data, хендлер, который его обработает)
+Step = Tuple[str, str, str]
+
+JOURNEYS: Dict[str, List[Step]] = {
+    # Главное меню -> курс -> группа -> день обычными кнопками
+    "menu": [
+        ("text", "/start", "send_welcome"),
+        ("text", "{course}", "handle_course_selection"),
+        ("text", "{group}", "handle_group_selection"),
+        ("text", "{day}", "send_schedule"),
+    ],
+    "week": [
+        ("text", "/start", "send_welcome"),
+        ("text", "{group}", "handle_group_selection"),
+        ("text", "Вся неделя", "send_schedule"),
+    ],
+    # Та же навигация inline-кнопками в одном сообщении
+    "inline": [
+        ("text", "/start", "send_welcome"),
+        ("text", "📅 Расписание", "main_schedule"),
+        ("callback", "c:{course_index}", "show_groups"),
+        ("callback", "g:{group}", "choose_group"),
+        ("callback", "d:{group}:{day_key}", "show_day"),
+    ],
+    "teacher": [
+        ("text", "/start", "send_welcome"),
+        ("text", "🔍 Поиск по преподавателю", "search_teacher_start"),
+        ("text", "{surname}", "handle_teacher_search_input"),
+    ],
+}
+DEFAULT_MIX = "menu=4,week=2,inline=3,teacher=1"
+DAY_TITLES = {day_key: title for title, day_key in DAYS_MAPPING.items()}
+COURSES = list(GROUPS_BY_COURSE)
+NOISE_MS = 1.0  # разница p95 меньше миллисекунды — шум, а не регрессия
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        if name.strip() not in JOURNEYS:
+            raise SystemExit(f"неизвестный сценарий: {name} (есть: {', '.join(JOURNEYS)})")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+async def seed(rng: random.Random) -> List[str]:
+    """Расписания всех групп в БД и в памяти, свежие — чтобы сайт ни разу не запрашивался"""
+    await db.connect()
+    teachers = make_teachers(rng)
+    monday = date.today() - timedelta(days=date.today().weekday())
+    for group in ALL_GROUPS:
+        schedule = fake_schedule(rng, monday, teachers)
+        await db.save_schedule(group, schedule, monday.isoformat())
+        await db.save_to_cache(group, schedule)
+        schedule_fetcher.mark_fresh(group)
+    await schedule_cache.reload()
+    teacher_index()
+    room_index()
+    return sorted({teacher.split()[0] for teacher in teachers})
+
+
+class LoadTest:
+    def __init__(self, api: FakeTelegramAPI, rng: random.Random, surnames: List[str], think: float) -> None:
+        self.api = api
+        self.rng = rng
+        self.surnames = surnames
+        self.think = think
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Counter = Counter()
+        self.journeys: Counter = Counter()
+        self.updates = 0
+        self.dropped = 0
+
+    def _params(self) -> Dict[str, Any]:
+        course_index = self.rng.randrange(len(COURSES))
+        course = COURSES[course_index]
+        day_key = self.rng.choice(DAY_KEYS)
+        return {
+            "course": course,
+            "course_index": course_index,
+            "group": self.rng.choice(GROUPS_BY_COURSE[course]),
+            "day": DAY_TITLES[day_key],
+            "day_key": day_key,
+            "surname": self.rng.choice(self.surnames),
+        }
+
+    async def step(self, user_id: int, kind: str, payload: str, handler: str) -> None:
+        raw = make_text_update(user_id, payload) if kind == "text" else make_callback_update(user_id, payload)
+        update = Update.de_json(raw)
+        waiter = self.api.wait_for_reply(user_id)
+        started = time.perf_counter()
+        try:
+            await bot.process_new_updates([update])
+        except Exception:
+            self.errors[handler] += 1
+            return
+        finally:
+            self.updates += 1
+        elapsed = time.perf_counter() - started
+        if waiter.done():
+            self.samples.setdefault(handler, []).append(elapsed)
+        else:
+            # Хендлер ничего не отправил в чат — упал внутри telebot или ответил не туда
+            self.api.waiters.pop(user_id, None)
+            self.errors[handler] += 1
+
+    async def journey(self, user_id: int, name: str) -> None:
+        params = self._params()
+        for i, (kind, template, handler) in enumerate(JOURNEYS[name]):
+            if i and self.think:
+                await asyncio.sleep(self.rng.uniform(0.5, 1.5) * self.think)
+            await self.step(user_id, kind, template.format(**params), handler)
+        self.journeys[name] += 1
+
+    async def run(self, rate: float, duration: float, users: int, mix: Dict[str, float]) -> float:
+        """Запускает rate сценариев в секунду в течение duration секунд и ждёт их завершения"""
+        free = list(range(1, users + 1))
+        self.rng.shuffle(free)
+        tasks = set()
+        names, weights = list(mix), list(mix.values())
+        started = next_at = time.perf_counter()
+        while next_at < started + duration:
+            if free:
+                user_id = free.pop()
+                task = asyncio.create_task(self.journey(user_id, self.rng.choices(names, weights)[0]))
+                tasks.add(task)
+                # Пользователь проходит один сценарий за раз, иначе его состояние перемешается
+                task.add_done_callback(lambda t, u=user_id: (free.append(u), tasks.discard(t)))
+            else:
+                self.dropped += 1
+            next_at += 1 / rate
+            await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+        if tasks:
+            await asyncio.gather(*tasks)
+        return time.perf_counter() - started
+
+
+def summarize(test: LoadTest, elapsed: float) -> Dict[str, Any]:
+    handlers = {}
+    for handler in sorted(set(test.samples) | set(test.errors)):
+        ordered = sorted(test.samples.get(handler, []))
+        handlers[handler] = {
+            "n": len(ordered),
+            "errors": test.errors[handler],
+            "exceptions": int(HANDLER_ERRORS.value(handler=handler)),
+            "p50_ms": percentile(ordered, 50) * 1000,
+            "p95_ms": percentile(ordered, 95) * 1000,
+            "p99_ms": percentile(ordered, 99) * 1000,
+        }
+    return {
+        "elapsed_sec": elapsed,
+        "updates": test.updates,
+        "throughput": test.updates / elapsed if elapsed else 0.0,
+        "journeys": dict(test.journeys),
+        "dropped": test.dropped,
+        "handlers": handlers,
+    }
+
+
+def compare(summary: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Печатает сравнение с базовым прогоном и возвращает список регрессий"""
+    regressions = []
+    print(f"\nсравнение с базовым прогоном (допуск {tolerance:.0%})")
+    print(f"{'хендлер':<32}{'p95 было':>10}{'p95 стало':>11}{'изм.':>9}{'ошибки':>10}")
+    for handler, now in summary["handlers"].items():
+        before = baseline["handlers"].get(handler)
+        if before is None:
+            print(f"{handler:<32}{'—':>10}{now['p95_ms']:>11.2f}{'новый':>9}{now['errors']:>10}")
+            continue
+        change = (now["p95_ms"] - before["p95_ms"]) / before["p95_ms"] if before["p95_ms"] else 0.0
+        print(f"{handler:<32}{before['p95_ms']:>10.2f}{now['p95_ms']:>11.2f}{change:>+9.0%}"
+              f"{before['errors']:>5} -> {now['errors']}")
+        if change > tolerance and now["p95_ms"] - before["p95_ms"] > NOISE_MS:
+            regressions.append(f"{handler}: p95 {before['p95_ms']:.2f} -> {now['p95_ms']:.2f} мс")
+        if now["errors"] > before["errors"]:
+            regressions.append(f"{handler}: ошибок {before['errors']} -> {now['errors']}")
+    if summary["throughput"] < baseline["throughput"] * (1 - tolerance):
+        regressions.append(f"пропускная способность {baseline['throughput']:.0f} -> {summary['throughput']:.0f} обн./с")
+    return regressions
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=20, help="новых сценариев в секунду")
+    parser.add_argument("--duration", type=float, default=30, help="сколько секунд запускать сценарии")
+    parser.add_argument("--users", type=int, default=2000, help="размер пула синтетических пользователей")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"веса сценариев ({', '.join(JOURNEYS)})")
+    parser.add_argument("--think", type=float, default=1.0, help="средняя пауза между шагами сценария, с")
+    parser.add_argument("--api-latency", type=float, default=0.02, help="задержка поддельного API, с")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", help="сохранить итоги в JSON как базовый прогон")
+    parser.add_argument("--baseline", help="сравнить с сохранённым базовым прогоном")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="допустимый рост p95 и падение пропускной способности")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    surnames = await seed(rng)
+    api = FakeTelegramAPI(port=API_PORT, latency=args.api_latency)
+    await api.start()
+    await outbox.start(bot)
+
+    test = LoadTest(api, rng, surnames, args.think)
+    try:
+        elapsed = await test.run(args.rate, args.duration, args.users, parse_mix(args.mix))
+    finally:
+        await outbox.stop()
+        await bot.close_session()
+        await api.stop()
+        await db.close()
+
+    summary = summarize(test, elapsed)
+    print(f"сценариев: {sum(test.journeys.values())} ({', '.join(f'{k}: {v}' for k, v in test.journeys.items())}), "
+          f"не запущено из-за нехватки пользователей: {test.dropped}")
+    print(f"обновлений: {test.updates} за {elapsed:.1f} с, пропускная способность: {summary['throughput']:.1f} обновлений/с")
+    report("обработка обновления до ответа API по хендлерам, мс", test.samples)
+    failed = {name: h for name, h in summary["handlers"].items() if h["errors"] or h["exceptions"]}
+    if failed:
+        print("\nошибки по хендлерам:")
+        for name, h in failed.items():
+            print(f"  {name}: без ответа {h['errors']}, исключений {h['exceptions']}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"\nитоги сохранены в {args.save}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(summary, json.load(f), args.tolerance)
+        if regressions:
+            print("\nрегрессии:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nрегрессий нет")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
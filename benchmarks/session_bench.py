@@ -0,0 +1,86 @@
+"""
+Память и скорость хранения состояния пользователей: четыре словаря против SessionStore.
+
+    python -m benchmarks.session_bench --users 100000
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from src.bot.constants import ALL_GROUPS
+from src.bot.sessions import SessionStore, State
+
+
+def measure(build) -> tuple[int, object]:
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, result
+
+
+def build_legacy(users: int, rng: random.Random):
+    # Так росли словари до SessionStore: каждый /start записывал все три режима
+    search_mode: dict[int, bool] = {}
+    admin_mode: dict[int, bool] = {}
+    admin_password_mode: dict[int, bool] = {}
+    user_groups: dict[int, str] = {}
+    for user_id in range(1, users + 1):
+        search_mode[user_id] = False
+        admin_mode[user_id] = False
+        admin_password_mode[user_id] = False
+        user_groups[user_id] = rng.choice(ALL_GROUPS)
+    return search_mode, admin_mode, admin_password_mode, user_groups
+
+
+def build_store(users: int, rng: random.Random) -> SessionStore:
+    store = SessionStore()
+    for user_id in range(1, users + 1):
+        store.set_group(user_id, rng.choice(ALL_GROUPS))
+    return store
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    legacy_bytes, legacy = measure(lambda: build_legacy(args.users, random.Random(args.seed)))
+    store_bytes, store = measure(lambda: build_store(args.users, random.Random(args.seed)))
+
+    print(f"пользователей: {args.users}")
+    print(f"четыре словаря: {legacy_bytes / 1024 / 1024:8.2f} МБ ({legacy_bytes / args.users:.0f} байт/пользователь)")
+    print(f"SessionStore:   {store_bytes / 1024 / 1024:8.2f} МБ ({store_bytes / args.users:.0f} байт/пользователь)")
+
+    rng = random.Random(args.seed)
+    ids = [rng.randint(1, args.users) for _ in range(args.lookups)]
+    search_mode, _, admin_password_mode, _ = legacy
+
+    started = time.perf_counter()
+    for user_id in ids:
+        (user_id in search_mode and search_mode[user_id]) or \
+            (user_id in admin_password_mode and admin_password_mode[user_id])
+    legacy_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for user_id in ids:
+        store.state(user_id) in (State.TEACHER_SEARCH, State.ADMIN_PASSWORD)
+    store_time = time.perf_counter() - started
+
+    print(f"проверка режимов, старые словари: {legacy_time / args.lookups * 1e9:6.0f} нс")
+    print(f"проверка режимов, SessionStore:   {store_time / args.lookups * 1e9:6.0f} нс")
+
+    store.ttl = 0
+    started = time.perf_counter()
+    evicted = store.evict_idle()
+    print(f"вытеснение {evicted} сессий: {(time.perf_counter() - started) * 1000:.1f} мс")
+
+
+if __name__ == "__main__":
+    main()
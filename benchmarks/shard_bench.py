@@ -0,0 +1,112 @@
+"""
+Пропускная способность шардированного бота: 1, 2, 4 процесса-обработчика.
+
+Фронт раздаёт синтетические обновления шардам (ShardPool), ответы ловит
+поддельный Telegram API. Сценарий пользователя — поиск по преподавателю.
+
+    python -m benchmarks.shard_bench --users 400 --workers 1 2 4
+"""
+import os
+import tempfile
+
+API_PORT = 8091
+os.environ.setdefault("BOT_TOKEN", "123456:bench")
+os.environ["STORAGE_BACKEND"] = "sqlite"
+os.environ.setdefault("DATABASE_PATH", os.path.join(tempfile.mkdtemp(prefix="shard_bench_"), "bench.db"))
+os.environ["TELEGRAM_API_URL"] = f"http://127.0.0.1:{API_PORT}/bot{{0}}/{{1}}"
+os.environ.setdefault("OUTBOX_GLOBAL_RATE", "100000")  # лимит Telegram здесь не измеряем
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+from typing import Dict, List
+
+from benchmarks.common import SURNAMES, fake_schedule, make_teachers, report
+from src.bot.constants import ALL_GROUPS
+from benchmarks.fake_telegram import FakeTelegramAPI, make_text_update
+from src.bot.sharding import ShardPool
+from src.database.db import db
+
+JOURNEY = ["🔍 Поиск по преподавателю", "{surname}"]
+WARMUP_TIMEOUT = 60
+
+
+async def seed_schedules(rng: random.Random) -> None:
+    await db.connect()
+    teachers = make_teachers(rng)
+    monday = date.today() - timedelta(days=date.today().weekday())
+    for group in ALL_GROUPS:
+        await db.save_schedule(group, fake_schedule(rng, monday, teachers), monday.isoformat())
+    await db.close()
+
+
+async def warm_up(pool: ShardPool, api: FakeTelegramAPI) -> None:
+    """Ждёт, пока каждый шард ответит хотя бы раз (процессы стартуют не мгновенно)"""
+    chat_ids = range(10_000_000, 10_000_000 + pool.count)  # подряд идущие id покрывают все шарды
+    waiters = [api.wait_for_reply(chat_id) for chat_id in chat_ids]
+    for chat_id in chat_ids:
+        pool.dispatch(make_text_update(chat_id, "🔍 Поиск по преподавателю"))
+    await asyncio.wait_for(asyncio.gather(*waiters), WARMUP_TIMEOUT)
+
+
+async def run_user(pool: ShardPool, api: FakeTelegramAPI, user_id: int, surname: str,
+                   results: Dict[str, List[float]], errors: List[str]) -> None:
+    for step in JOURNEY:
+        text = step.format(surname=surname)
+        waiter = api.wait_for_reply(user_id)
+        started = time.perf_counter()
+        pool.dispatch(make_text_update(user_id, text))
+        try:
+            replied_at = await asyncio.wait_for(waiter, 30)
+            results.setdefault(f"{pool.count} шард(а)", []).append(replied_at - started)
+        except asyncio.TimeoutError:
+            errors.append(f"{user_id} {text}: нет ответа")
+
+
+async def run_round(api: FakeTelegramAPI, workers: int, users: int, rng: random.Random,
+                    results: Dict[str, List[float]]) -> None:
+    pool = ShardPool(workers)
+    pool.start()
+    try:
+        await warm_up(pool, api)
+        errors: List[str] = []
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            run_user(pool, api, user_id, rng.choice(SURNAMES), results, errors)
+            for user_id in range(1, users + 1)
+        ))
+        elapsed = time.perf_counter() - started
+        updates = users * len(JOURNEY)
+        print(f"шардов: {workers}, обновлений: {updates}, ошибок: {len(errors)}, "
+              f"время: {elapsed:.2f} с, пропускная способность: {updates / elapsed:.0f} обновлений/с")
+        for error in errors[:5]:
+            print(f"  ошибка: {error}")
+    finally:
+        await pool.stop()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=400)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--api-latency", type=float, default=0.0, help="задержка поддельного API, с")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    await seed_schedules(rng)
+    api = FakeTelegramAPI(port=API_PORT, latency=args.api_latency)
+    await api.start()
+
+    results: Dict[str, List[float]] = {}
+    for workers in args.workers:
+        await run_round(api, workers, args.users, rng, results)
+    report("латентность до первого ответа, мс", results)
+
+    await api.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
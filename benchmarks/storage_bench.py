@@ -0,0 +1,164 @@
+"""
+Бенчмарк хранилищ: SQLite против памяти на реалистичных объёмах.
+
+    python -m benchmarks.storage_bench --engine all
+    python -m benchmarks.storage_bench --engine memory --users 100000 --logs 10000000 --weeks 52
+"""
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.common import DAY_NAMES, Timer, fake_schedule, make_teachers, report
+from src.bot.constants import ALL_GROUPS
+from src.database.base import ScheduleStorage
+from src.database.db import SQLiteDatabase
+from src.database.memory import MemoryDatabase
+
+LOG_CHUNK = 200_000
+
+
+def week_starts(weeks: int) -> List[str]:
+    monday = date.today() - timedelta(days=date.today().weekday())
+    return [(monday - timedelta(weeks=i)).isoformat() for i in range(weeks)]
+
+
+async def seed_sqlite(engine: SQLiteDatabase, args, rng: random.Random) -> None:
+    conn = engine._ensure_connected()
+    teachers = make_teachers(rng)
+    now = datetime.utcnow()
+
+    rows = []
+    for week in week_starts(args.weeks):
+        monday = date.fromisoformat(week)
+        for group in ALL_GROUPS:
+            data = json.dumps(fake_schedule(rng, monday, teachers), ensure_ascii=False)
+            rows.append((group, week, data, datetime.combine(monday, datetime.min.time())))
+    await conn.executemany(
+        'INSERT OR REPLACE INTO schedules (group_name, week_start, schedule_data, updated_at, is_active) '
+        'VALUES (?, ?, ?, ?, 1)', rows
+    )
+
+    await conn.executemany(
+        'INSERT OR REPLACE INTO users (user_id, group_name, last_activity, updated_at) VALUES (?, ?, ?, ?)',
+        ((user_id, rng.choice(ALL_GROUPS), now, now) for user_id in range(1, args.users + 1))
+    )
+
+    span = 30 * 86400
+    for start in range(0, args.logs, LOG_CHUNK):
+        size = min(LOG_CHUNK, args.logs - start)
+        await conn.executemany(
+            'INSERT INTO logs (user_id, group_name, day, timestamp) VALUES (?, ?, ?, ?)',
+            ((rng.randint(1, args.users), rng.choice(ALL_GROUPS), rng.choice(DAY_NAMES),
+              now - timedelta(seconds=span * (args.logs - start - i) / args.logs))
+             for i in range(size))
+        )
+        await conn.commit()
+    await conn.commit()
+
+
+async def seed_memory(engine: MemoryDatabase, args, rng: random.Random) -> None:
+    teachers = make_teachers(rng)
+    # Старые недели первыми, чтобы последняя сохранённая была самой свежей
+    for week in reversed(week_starts(args.weeks)):
+        monday = date.fromisoformat(week)
+        for group in ALL_GROUPS:
+            await engine.save_schedule(group, fake_schedule(rng, monday, teachers), week)
+
+    for user_id in range(1, args.users + 1):
+        await engine.save_user_preference(user_id, rng.choice(ALL_GROUPS))
+
+    span = 30 * 86400
+    now = time.time()
+    for i in range(args.logs):
+        engine.append_log(rng.randint(1, args.users), rng.choice(ALL_GROUPS), rng.choice(DAY_NAMES),
+                          now - span * (args.logs - i) / args.logs)
+
+
+async def run_operations(engine: ScheduleStorage, args, rng: random.Random) -> Dict[str, List[float]]:
+    results: Dict[str, List[float]] = {}
+    weeks = week_starts(args.weeks)
+    teachers = make_teachers(rng)
+
+    def samples(name: str) -> List[float]:
+        return results.setdefault(name, [])
+
+    for _ in range(args.ops):
+        with Timer(samples("get_schedule")):
+            await engine.get_schedule(rng.choice(ALL_GROUPS))
+    for _ in range(args.ops):
+        with Timer(samples("get_schedule(week_start)")):
+            await engine.get_schedule(rng.choice(ALL_GROUPS), rng.choice(weeks))
+    for _ in range(args.ops):
+        with Timer(samples("get_user_group")):
+            await engine.get_user_group(rng.randint(1, args.users))
+    for _ in range(args.ops):
+        with Timer(samples("save_user_preference")):
+            await engine.save_user_preference(rng.randint(1, args.users), rng.choice(ALL_GROUPS))
+    for _ in range(args.ops):
+        with Timer(samples("log_request")):
+            await engine.log_request(rng.randint(1, args.users), rng.choice(ALL_GROUPS), rng.choice(DAY_NAMES))
+    for _ in range(min(args.ops, 100)):
+        with Timer(samples("save_schedule")):
+            await engine.save_schedule(rng.choice(ALL_GROUPS), fake_schedule(rng, date.today(), teachers),
+                                       date.today().isoformat())
+    for _ in range(min(args.ops, args.heavy_ops)):
+        with Timer(samples("get_statistics")):
+            await engine.get_statistics()
+    for _ in range(min(args.ops, args.heavy_ops)):
+        with Timer(samples("get_all_schedules")):
+            await engine.get_all_schedules()
+    for _ in range(min(args.ops, args.heavy_ops)):
+        with Timer(samples("get_database_info")):
+            await engine.get_database_info()
+    with Timer(samples("cleanup_old_data(days_old=7)")):
+        await engine.cleanup_old_data(days_old=7)
+    return results
+
+
+async def bench_engine(name: str, args) -> None:
+    rng = random.Random(args.seed)
+
+    if name == "sqlite":
+        engine = SQLiteDatabase()
+        db_path = args.db_path or str(Path(tempfile.mkdtemp()) / "bench.db")
+        await engine.connect(db_path)
+        seed = seed_sqlite
+    else:
+        engine = MemoryDatabase()
+        seed = seed_memory
+
+    started = time.perf_counter()
+    await seed(engine, args, rng)
+    print(f"[{name}] заполнение: {time.perf_counter() - started:.1f} с "
+          f"({args.users} пользователей, {args.logs} логов, {args.weeks} недель)")
+
+    results = await run_operations(engine, args, rng)
+    report(f"[{name}] латентность операций, мс", results)
+    await engine.close()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engine", choices=["sqlite", "memory", "all"], default="all")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--logs", type=int, default=10_000_000)
+    parser.add_argument("--weeks", type=int, default=52)
+    parser.add_argument("--ops", type=int, default=2000, help="итераций на лёгкую операцию")
+    parser.add_argument("--heavy-ops", type=int, default=10, help="итераций на тяжёлую операцию")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db-path", default=None, help="файл SQLite (по умолчанию временный)")
+    args = parser.parse_args()
+
+    engines = ["sqlite", "memory"] if args.engine == "all" else [args.engine]
+    for name in engines:
+        await bench_engine(name, args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,83 @@
+"""
+Поиск преподавателя: прежний перебор всех пар регуляркой против индекса и триграммных подсказок.
+
+    python -m benchmarks.teacher_search_bench --queries 2000
+"""
+import os
+
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+
+import argparse
+import random
+import re
+from datetime import date, timedelta
+from typing import Dict, List
+
+from benchmarks.common import DAY_KEYS, Timer, fake_schedule, make_teachers, report
+from src.bot.constants import ALL_GROUPS
+from src.bot.schedule_cache import schedule_cache
+from src.bot.teachers import find_teachers, suggest_teachers, teacher_index
+
+
+def legacy_search(schedules: Dict[str, Dict], surname: str) -> List[str]:
+    """Как было в handle_teacher_search_input: регулярка по каждой паре каждой группы"""
+    found = []
+    for group, schedule_data in schedules.items():
+        for day_key in DAY_KEYS:
+            for lesson in schedule_data.get(day_key, {}).get('lessons', []):
+                if re.search(rf'\b{re.escape(surname)}\b', lesson, re.IGNORECASE):
+                    found.append(f"{group} {lesson}")
+    return found
+
+
+def with_typo(rng: random.Random, surname: str) -> str:
+    """Пропущенная буква, «е» вместо «ё» или латинская «о»"""
+    kind = rng.randrange(3)
+    if kind == 0 and len(surname) > 4:
+        i = rng.randrange(1, len(surname) - 1)
+        return surname[:i] + surname[i + 1:]
+    if kind == 1 and "ё" in surname:
+        return surname.replace("ё", "е")
+    return surname.replace("о", "o", 1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    teachers = make_teachers(rng)
+    monday = date.today() - timedelta(days=date.today().weekday())
+    schedules = {group: fake_schedule(rng, monday, teachers) for group in ALL_GROUPS}
+    schedule_cache._schedules = schedules
+
+    results: Dict[str, List[float]] = {}
+    with Timer(results.setdefault("построение индекса", [])):
+        teacher_index()
+
+    surnames = [rng.choice(teachers).split()[0] for _ in range(args.queries)]
+    typos = [with_typo(rng, surname) for surname in surnames]
+
+    for surname in surnames:
+        with Timer(results.setdefault("прежний перебор", [])):
+            legacy_search(schedules, surname)
+    for surname in surnames:
+        with Timer(results.setdefault("индекс, точная фамилия", [])):
+            find_teachers(surname)
+
+    legacy_found = suggested = 0
+    for surname, typo in zip(surnames, typos):
+        legacy_found += bool(legacy_search(schedules, typo.title()))
+        with Timer(results.setdefault("триграммы, с опечаткой", [])):
+            suggestions = suggest_teachers(typo)
+        suggested += any(teacher.split()[0] == surname for teacher, _ in suggestions)
+
+    report("поиск преподавателя, мс", results)
+    print(f"\nзапросов с опечаткой: {len(typos)}; прежний поиск нашёл: {legacy_found}, "
+          f"нужный преподаватель среди подсказок: {suggested}")
+
+
+if __name__ == "__main__":
+    main()
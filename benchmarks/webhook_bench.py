@@ -0,0 +1,109 @@
+"""
+Бенчмарк webhook-режима против локального поддельного Telegram API.
+
+    python -m benchmarks.webhook_bench --users 200 --concurrency 50
+"""
+import os
+
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("BOT_MODE", "webhook")
+os.environ.setdefault("WEBHOOK_SECRET", "bench_secret")
+os.environ.setdefault("WEBHOOK_URL", "")
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+from typing import Dict, List
+
+import aiohttp
+from aiohttp import web
+
+from benchmarks.common import fake_schedule, make_teachers, report
+from src.bot.constants import ALL_GROUPS
+from benchmarks.fake_telegram import FakeTelegramAPI, make_text_update, reply_in_body
+from src.config.settings import WEBHOOK_PATH, WEBHOOK_SECRET
+from src.database.db import db
+import src.bot.handlers  # noqa: F401 — регистрация хендлеров
+from src.bot.webhook import SECRET_HEADER, create_app
+
+JOURNEY = ["{group}", "Понедельник", "Вторник", "Вся неделя", "📅 Расписание"]
+
+
+async def seed_schedules(rng: random.Random) -> None:
+    teachers = make_teachers(rng)
+    monday = date.today() - timedelta(days=date.today().weekday())
+    for group in ALL_GROUPS:
+        await db.save_schedule(group, fake_schedule(rng, monday, teachers), monday.isoformat())
+
+
+async def run_user(session: aiohttp.ClientSession, url: str, api: FakeTelegramAPI, user_id: int,
+                   group: str, results: Dict[str, List[float]], errors: List[str]) -> None:
+    for step in JOURNEY:
+        text = step.format(group=group)
+        waiter = api.wait_for_reply(user_id)
+        started = time.perf_counter()
+        async with session.post(url, json=make_text_update(user_id, text),
+                                headers={SECRET_HEADER: WEBHOOK_SECRET}) as response:
+            body = await response.read()
+            if response.status != 200:
+                errors.append(f"{text}: HTTP {response.status}")
+                continue
+        if reply_in_body(body):
+            waiter.cancel()
+            results.setdefault("ответ в теле webhook", []).append(time.perf_counter() - started)
+            continue
+        try:
+            replied_at = await asyncio.wait_for(waiter, 10)
+            results.setdefault("ответ через API", []).append(replied_at - started)
+        except asyncio.TimeoutError:
+            errors.append(f"{text}: нет ответа")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--api-latency", type=float, default=0.0, help="задержка поддельного API, с")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    api = FakeTelegramAPI(latency=args.api_latency)
+    await api.start()
+    await seed_schedules(rng)
+
+    runner = web.AppRunner(create_app())
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", args.port).start()
+    url = f"http://127.0.0.1:{args.port}{WEBHOOK_PATH}"
+
+    results: Dict[str, List[float]] = {}
+    errors: List[str] = []
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def limited(user_id: int) -> None:
+        async with semaphore:
+            await run_user(session, url, api, user_id, rng.choice(ALL_GROUPS), results, errors)
+
+    started = time.perf_counter()
+    async with aiohttp.ClientSession() as session:
+        await asyncio.gather(*(limited(user_id) for user_id in range(1, args.users + 1)))
+    elapsed = time.perf_counter() - started
+
+    updates = args.users * len(JOURNEY)
+    print(f"обновлений: {updates}, ошибок: {len(errors)}, время: {elapsed:.2f} с, "
+          f"пропускная способность: {updates / elapsed:.0f} обновлений/с")
+    print(f"вызовов API: {dict(api.methods)}")
+    report("латентность до ответа пользователю, мс", results)
+    for error in errors[:10]:
+        print(f"  ошибка: {error}")
+
+    await runner.cleanup()
+    await api.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,177 @@
+import gzip
+import json
+from typing import Any, Callable, Dict, NamedTuple, Tuple
+
+from aiohttp import web
+
+from src.bot.constants import PAIR_TIMES
+from src.bot.ics import TeacherLesson, handle_calendar, teacher_lessons
+from src.bot.schedule_cache import schedule_cache
+from src.bot.teachers import WEEKDAY_KEYS
+from src.utils.logger import log
+from src.utils.metrics import registry
+
+API_PREFIX = "/api"
+CACHE_CONTROL = "public, max-age=60"
+
+API_REQUESTS = registry.counter("api_requests_total", "Запросы к HTTP API", ["route", "status"])
+API_BUILDS = registry.counter("api_builds_total", "Сборки ответов API (после смены версии расписания)", ["route"])
+
+
+class PreparedBody(NamedTuple):
+    """JSON-ответ, заранее сериализованный и сжатый; ETag — версия содержимого"""
+    etag: str
+    raw: bytes
+    gzipped: bytes
+
+
+def prepare(payload: Any, version: str) -> PreparedBody:
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    # mtime=0 — одинаковое содержимое даёт одинаковые байты
+    return PreparedBody(f'"{version}"', raw, gzip.compress(raw, compresslevel=9, mtime=0))
+
+
+def lesson_payload(item: TeacherLesson) -> Dict:
+    start, end = PAIR_TIMES.get(item.pair, (None, None))
+    return {
+        'day': item.day_key, 'date': item.day.isoformat() if item.day else None, 'pair': item.pair,
+        'start': start, 'end': end, 'group': item.group, 'lesson': item.lesson,
+    }
+
+
+class ResponseCache:
+    """
+    Готовые тела ответов по ключу; пересобираются, только когда меняется
+    версия содержимого (хеш расписания группы, пар преподавателя или всех групп).
+    """
+
+    def __init__(self) -> None:
+        self._bodies: Dict[Tuple[str, str], PreparedBody] = {}
+
+    def get(self, route: str, key: str, version: str, build: Callable[[], Any]) -> PreparedBody:
+        cached = self._bodies.get((route, key))
+        if cached is not None and cached.etag == f'"{version}"':
+            return cached
+        API_BUILDS.inc(route=route)
+        body = self._bodies[(route, key)] = prepare(build(), version)
+        return body
+
+
+responses = ResponseCache()
+
+
+def _accepts_gzip(request: web.Request) -> bool:
+    for item in request.headers.get("Accept-Encoding", "").split(","):
+        coding, _, params = item.strip().partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def _not_modified(request: web.Request, etag: str) -> bool:
+    header = request.headers.get("If-None-Match", "")
+    if header.strip() == "*":
+        return True
+    # If-None-Match сравнивается слабо (RFC 9110): префикс W/ не важен.
+    # Сжатый вариант помечен суффиксом -gz — для сравнения он та же версия
+    tags = {tag.strip().removeprefix("W/").replace('-gz"', '"') for tag in header.split(",")}
+    return etag in tags
+
+
+def reply(request: web.Request, route: str, body: PreparedBody) -> web.Response:
+    """Ответ из готового тела: 304 по If-None-Match, gzip — если клиент его принимает"""
+    gzipped = _accepts_gzip(request)
+    etag = body.etag[:-1] + '-gz"' if gzipped else body.etag
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding",
+               "Access-Control-Allow-Origin": "*"}
+    if _not_modified(request, body.etag):
+        API_REQUESTS.inc(route=route, status="304")
+        return web.Response(status=304, headers=headers)
+    API_REQUESTS.inc(route=route, status="200")
+    if gzipped:
+        headers["Content-Encoding"] = "gzip"
+    return web.Response(body=body.gzipped if gzipped else body.raw, content_type="application/json",
+                        charset="utf-8", headers=headers)
+
+
+def not_found(route: str, message: str) -> web.Response:
+    API_REQUESTS.inc(route=route, status="404")
+    return web.json_response({'error': message}, status=404, headers={"Access-Control-Allow-Origin": "*"})
+
+
+# === GET /api/groups — список групп с версиями их расписаний ===
+async def handle_groups(request: web.Request) -> web.Response:
+    def build() -> Dict:
+        return {
+            'version': schedule_cache.version,
+            'groups': [{'name': group, 'version': schedule_cache.group_version(group)}
+                       for group in schedule_cache.groups()],
+        }
+
+    return reply(request, "groups", responses.get("groups", "", schedule_cache.version, build))
+
+
+# === GET /api/groups/{group}/week — расписание группы на неделю ===
+async def handle_group_week(request: web.Request) -> web.Response:
+    group = schedule_cache.find_group(request.match_info["group"])
+    if group is None:
+        return not_found("group_week", "Группа не найдена")
+    version = schedule_cache.group_version(group)
+
+    def build() -> Dict:
+        schedule_data = schedule_cache.get(group)
+        return {
+            'group': group,
+            'version': version,
+            'date_range': schedule_data.get('date_range', ''),
+            'days': {day_key: schedule_data.get(day_key, {'lessons': [], 'date': ''}) for day_key in WEEKDAY_KEYS},
+        }
+
+    return reply(request, "group_week", responses.get("group_week", group, version, build))
+
+
+# === GET /api/teachers — все преподаватели; /api/teachers/{name} — пары преподавателя ===
+async def handle_teachers(request: web.Request) -> web.Response:
+    return reply(request, "teachers", responses.get(
+        "teachers", "", schedule_cache.version,
+        lambda: {'version': schedule_cache.version, 'teachers': sorted(teacher_lessons())},
+    ))
+
+
+async def handle_teacher(request: web.Request) -> web.Response:
+    teacher = request.match_info["name"]
+    entry = teacher_lessons().get(teacher)
+    if entry is None:
+        return not_found("teacher", "Преподаватель не найден")
+    version, lessons = entry
+    return reply(request, "teacher", responses.get(
+        "teacher", teacher, version,
+        lambda: {'teacher': teacher, 'version': version, 'lessons': [lesson_payload(item) for item in lessons]},
+    ))
+
+
+def add_api_routes(app: web.Application) -> None:
+    """Маршруты API только для чтения и подписки на календари"""
+    app.router.add_get(f"{API_PREFIX}/groups", handle_groups)
+    app.router.add_get(f"{API_PREFIX}/groups/{{group}}/week", handle_group_week)
+    app.router.add_get(f"{API_PREFIX}/teachers", handle_teachers)
+    app.router.add_get(f"{API_PREFIX}/teachers/{{name}}", handle_teacher)
+    # Подписка на календарь: приложения опрашивают этот адрес сами, а не бота
+    app.router.add_get("/calendar/{kind}/{owner}.ics", handle_calendar)
+
+
+async def start_api_server(host: str, port: int) -> web.AppRunner:
+    """
+    Отдельный HTTP-сервер API для режима polling (в режиме webhook маршруты
+    добавляются в приложение webhook).
+
+    Returns:
+        web.AppRunner: Остановить сервер — await runner.cleanup()
+    """
+    app = web.Application()
+    add_api_routes(app)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    log.info(f"🌍 API расписаний: http://{host}:{port}{API_PREFIX}/groups")
+    return runner
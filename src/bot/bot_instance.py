@@ -1,10 +1,24 @@
 import asyncio
 from telebot.async_telebot import AsyncTeleBot
-from src.config.settings import TOKEN
+from src.config.settings import (
+    TOKEN, BOT_MODE, BOT_WORKERS, METRICS_HOST, METRICS_PORT, API_HOST, API_PORT, SESSION_PERSIST,
+)
 from src.database.db import db
-from src.bot.core import bot, user_groups
-from src.bot.preload import preload_all_schedules
+from src.bot.core import bot
+from src.bot.preload import preload_in_background
+from src.bot.schedule_cache import schedule_cache
+from src.bot.status import status
+from src.bot.webhook import run_webhook
+from src.bot.sharding import run_sharded
+from src.bot.outbox import outbox
+from src.bot.digest import run_digest_scheduler
+from src.bot.metrics import start_metrics_server
+from src.bot.api import start_api_server
+from src.bot.events import publish_stats_periodically
+from src.bot.jobs import jobs
+from src.bot.sessions import sessions
 from src.utils.logger import log
+from src.utils.metrics import monitor_loop_lag
 
 # Импортируем хендлеры — они зарегистрируются при импорте
 import src.bot.handlers
@@ -17,20 +31,72 @@ async def run_bot():
     log.info("=" * 50)
     
     await db.connect()
-    await preload_all_schedules()
-    await db.cleanup_old_data(days_old=1)
+    # При BOT_WORKERS > 1 сессии хранят и сохраняют шарды, у фронта их нет
+    if SESSION_PERSIST and BOT_WORKERS == 1:
+        sessions.load()
+    eviction_task = asyncio.create_task(sessions.run_eviction())
+    # Отвечаем сразу из того, что уже есть в SQLite; сайт опрашивается в фоне
+    status.mark_ready(await schedule_cache.reload())
+    preload_task = asyncio.create_task(preload_in_background())
     
     log.info("🤖 Бот запущен и готов к работе!")
     log.info("Для остановки нажмите Ctrl+C")
     log.info("=" * 50)
     
+    digest_task = None
+    if BOT_WORKERS == 1:
+        # Очередь отправки запускается до webhook, чтобы прямые ответы шли поверх неё
+        await outbox.start(bot)
+        digest_task = asyncio.create_task(run_digest_scheduler())
+    # При BOT_WORKERS > 1 фронт ничего не отправляет: весь лимит Telegram делят шарды,
+    # рассылку ведёт шард 0
+    lag_task = asyncio.create_task(monitor_loop_lag())
+    metrics_runner = None
+    events_task = None
+    if METRICS_PORT:
+        try:
+            metrics_runner = await start_metrics_server(METRICS_HOST, METRICS_PORT)
+            events_task = asyncio.create_task(publish_stats_periodically())
+        except OSError as e:
+            log.warning(f"⚠️ Сервер метрик не запущен: {e}")
+    api_runner = None
+    if API_PORT and BOT_MODE != "webhook":
+        # В режиме webhook API отвечает на порту webhook-сервера
+        try:
+            api_runner = await start_api_server(API_HOST, API_PORT)
+        except OSError as e:
+            log.warning(f"⚠️ HTTP API не запущен: {e}")
+    
     try:
-        await bot.polling(none_stop=False, interval=0, timeout=20)
-    except KeyboardInterrupt:
+        if BOT_WORKERS > 1:
+            # Обновления раздаются процессам-шардам, этот процесс только принимает их
+            await run_sharded(BOT_WORKERS)
+        elif BOT_MODE == "webhook":
+            await run_webhook()
+        else:
+            await bot.polling(none_stop=False, interval=0, timeout=20)
+    except (KeyboardInterrupt, asyncio.CancelledError):
         log.info("⏳ Получен Ctrl+C — останавливаем бота...")
     except Exception as e:
         log.error(f"💥 Неожиданная ошибка при polling: {e}")
     finally:
+        preload_task.cancel()
+        eviction_task.cancel()
+        if digest_task is not None:
+            digest_task.cancel()
+        lag_task.cancel()
+        if events_task is not None:
+            events_task.cancel()
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
+        if api_runner is not None:
+            await api_runner.cleanup()
+        # Фоновые задачи админки не переживут закрытие БД — отменяем их заранее
+        for job in jobs.active():
+            jobs.cancel(job.id)
+        if SESSION_PERSIST and BOT_WORKERS == 1:
+            sessions.save()
+        await outbox.stop()
         log.info("🔄 Закрываем соединение с базой данных...")
         await db.close()
         log.info("👋 Бот корректно остановлен. До свидания!")
@@ -19,6 +19,8 @@ GROUPS_BY_COURSE = {
     ]
 }
 
+ALL_GROUPS = [g for groups in GROUPS_BY_COURSE.values() for g in groups]
+
 DAYS_MAPPING = {
     "Понедельник": "monday",
     "Вторник": "tuesday",
@@ -30,4 +32,14 @@ DAYS_MAPPING = {
     "Сменить группу": "change_group"
 }
 
+# Звонки: номер пары -> (начало, конец)
+PAIR_TIMES = {
+    1: ("08:30", "10:00"),
+    2: ("10:10", "11:40"),
+    3: ("12:20", "13:50"),
+    4: ("14:00", "15:30"),
+    5: ("15:40", "17:10"),
+    6: ("17:20", "18:50"),
+}
+
 ADMIN_PASSWORD = "12345"
\ No newline at end of file
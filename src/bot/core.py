@@ -1,8 +1,13 @@
+from telebot import asyncio_helper
 from telebot.async_telebot import AsyncTeleBot
-from src.config.settings import TOKEN
+from src.bot.metrics import instrument_updates
+from src.config.settings import TOKEN, TELEGRAM_API_URL
 
 assert TOKEN is not None
 
-bot = AsyncTeleBot(TOKEN)
+if TELEGRAM_API_URL:
+    # Формат как у telebot: https://host/bot{0}/{1}
+    asyncio_helper.API_URL = TELEGRAM_API_URL
 
-user_groups: dict[int, str] = {}
\ No newline at end of file
+bot = AsyncTeleBot(TOKEN)
+instrument_updates(bot)
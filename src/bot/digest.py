@@ -0,0 +1,156 @@
+import asyncio
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from telebot.asyncio_helper import ApiTelegramException
+
+from src.bot.core import bot
+from src.bot.outbox import outbox, BROADCAST
+from src.bot.schedule_cache import schedule_cache, DAY_TITLES
+from src.config.settings import DIGEST_TIME
+from src.database.db import db
+from src.parser.parser import format_date_russian
+from src.utils.clock import college_now, college_today
+from src.utils.formatting import format_daily_schedule
+from src.utils.logger import log
+
+WEEKDAY_KEYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday']
+BATCH_SIZE = 500  # столько сообщений держим в очереди одновременно — память не растёт с числом подписчиков
+
+last_report: Optional[Dict[str, Any]] = None
+last_sent_date: Optional[date] = None  # на эту дату рассылка уже запускалась — второй раз не шлём
+_sending = asyncio.Lock()  # ручной запуск и расписание не идут одновременно
+
+
+def seconds_until(hhmm: str, now: Optional[datetime] = None) -> float:
+    """Секунд до ближайшего наступления времени ЧЧ:ММ по часам колледжа"""
+    now = now or college_now()
+    hour, minute = map(int, hhmm.split(":"))
+    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+def render_digest(group: str, day_key: str, target_date: date) -> Optional[str]:
+    """
+    Текст рассылки для группы — один на всех её подписчиков.
+
+    Returns:
+        Optional[str]: Текст или None, если в кэше нет расписания на эту дату
+    """
+    schedule_data = schedule_cache.get(group)
+    if not schedule_data:
+        return None
+    day_date = schedule_data.get(day_key, {}).get('date', '')
+    if day_date and day_date != format_date_russian(target_date):
+        # В кэше ещё прошлая неделя — лучше промолчать, чем прислать не то
+        return None
+    return "🔔 <b>Расписание на завтра</b>\n\n" + format_daily_schedule(
+        schedule_data, day_key, DAY_TITLES[day_key], group
+    )
+
+
+async def _deliver(send, batch: List[Tuple[int, str]]) -> Tuple[int, List[int]]:
+    """Отправляет пачку через очередь с низким приоритетом; возвращает (отправлено, заблокировавшие)"""
+    futures = [outbox.submit(send, user_id, text, parse_mode="HTML", priority=BROADCAST) for user_id, text in batch]
+    results = await asyncio.gather(*futures, return_exceptions=True)
+    sent, blocked = 0, []
+    for (user_id, _), result in zip(batch, results):
+        if not isinstance(result, Exception):
+            sent += 1
+        elif isinstance(result, ApiTelegramException) and result.error_code == 403:
+            blocked.append(user_id)
+    return sent, blocked
+
+
+async def send_digest(target_date: Optional[date] = None,
+                      progress: Optional[Callable[[int, int, str], None]] = None) -> Dict[str, Any]:
+    """
+    Рассылает подписчикам расписание на target_date (по умолчанию — на завтра).
+
+    Рассылка на одну дату уходит один раз: если она уже запускалась
+    (вручную или по расписанию), повторный вызов ничего не отправляет.
+
+    Args:
+        target_date (date, optional): Дата, расписание на которую рассылается
+        progress: progress(обработано, всего подписчиков, группа) — для фоновых задач админки
+
+    Returns:
+        Dict: groups, recipients, sent, failed, unsubscribed, duration, per_sec;
+        already_sent=True, если рассылка на эту дату уже была
+    """
+    global last_sent_date
+    target_date = target_date or college_today() + timedelta(days=1)
+    async with _sending:
+        if target_date == last_sent_date:
+            log.info(f"🔔 Рассылка на {target_date} уже была — повторно не отправляем")
+            return {**(last_report or {'date': target_date.isoformat()}), 'already_sent': True}
+        # Отмечаем до отправки: если рассылка оборвётся, повтор не продублирует уже доставленное
+        last_sent_date = target_date
+        return await _send_digest(target_date, progress)
+
+
+async def _send_digest(target_date: date, progress: Optional[Callable[[int, int, str], None]]) -> Dict[str, Any]:
+    global last_report
+    started = time.perf_counter()
+    report = {'date': target_date.isoformat(), 'groups': 0, 'recipients': 0, 'sent': 0,
+              'failed': 0, 'unsubscribed': 0, 'skipped_groups': 0, 'duration': 0.0, 'per_sec': 0.0}
+
+    if target_date.weekday() >= len(WEEKDAY_KEYS):
+        log.info(f"🔔 Рассылка на {target_date} не нужна — воскресенье")
+        last_report = report
+        return report
+    day_key = WEEKDAY_KEYS[target_date.weekday()]
+
+    subscribers = await db.get_digest_subscribers()
+    total = sum(len(user_ids) for user_ids in subscribers.values())
+    send = outbox.original(bot, "send_message")
+    batch: List[Tuple[int, str]] = []
+
+    async def flush() -> None:
+        sent, blocked = await _deliver(send, batch)
+        report['sent'] += sent
+        report['failed'] += len(batch) - sent
+        for user_id in blocked:
+            # Пользователь заблокировал бота — больше не пытаемся
+            await db.set_digest_subscription(user_id, False)
+        report['unsubscribed'] += len(blocked)
+        batch.clear()
+
+    for group, user_ids in subscribers.items():
+        text = render_digest(group, day_key, target_date)
+        if text is None:
+            report['skipped_groups'] += 1
+            continue
+        report['groups'] += 1
+        report['recipients'] += len(user_ids)
+        for user_id in user_ids:
+            batch.append((user_id, text))
+            if len(batch) >= BATCH_SIZE:
+                await flush()
+                if progress is not None:
+                    progress(report['sent'] + report['failed'], total, group)
+    if batch:
+        await flush()
+
+    report['duration'] = time.perf_counter() - started
+    report['per_sec'] = report['sent'] / report['duration'] if report['duration'] else 0.0
+    last_report = report
+    log.info(f"🔔 Рассылка на {target_date}: {report['sent']}/{report['recipients']} сообщений "
+             f"в {report['groups']} групп за {report['duration']:.1f} с ({report['per_sec']:.1f} сообщ./с), "
+             f"ошибок {report['failed']}, пропущено групп {report['skipped_groups']}")
+    return report
+
+
+async def run_digest_scheduler(at: str = DIGEST_TIME) -> None:
+    """Фоновая задача: каждый день в at рассылает расписание на завтра"""
+    log.info(f"🔔 Ежедневная рассылка запланирована на {at}")
+    while True:
+        await asyncio.sleep(seconds_until(at))
+        try:
+            await send_digest()
+        except Exception as e:
+            log.error(f"💥 Ошибка рассылки: {e}")
+        await asyncio.sleep(60)  # не запускаться дважды в ту же минуту
@@ -0,0 +1,66 @@
+import asyncio
+import contextlib
+from typing import Any, Dict
+
+from aiohttp import WSMsgType, web
+
+from src.bot.outbox import outbox
+from src.bot.schedule_cache import schedule_cache
+from src.bot.status import status
+from src.config.settings import EVENTS_STATS_INTERVAL
+from src.utils.events import events
+from src.utils.logger import log
+
+
+def live_stats() -> Dict[str, Any]:
+    """Счётчики из памяти процесса — без запросов к SQLite"""
+    lookups = schedule_cache.hits + schedule_cache.misses
+    return {
+        'cache': {
+            'groups': len(schedule_cache.all()),
+            'hits': schedule_cache.hits,
+            'misses': schedule_cache.misses,
+            'hit_ratio': schedule_cache.hits / max(1, lookups),
+        },
+        'outbox': outbox.stats(),
+    }
+
+
+async def publish_stats_periodically(interval: float = EVENTS_STATS_INTERVAL) -> None:
+    """Раз в interval секунд публикует сводку, если кто-то подписан"""
+    while True:
+        await asyncio.sleep(interval)
+        if events.subscribers:
+            events.publish("stats", **live_stats())
+
+
+async def handle_events(request: web.Request) -> web.WebSocketResponse:
+    """
+    GET /events — WebSocket с потоком событий в JSON.
+
+    Первым сообщением приходит snapshot с текущим состоянием, дальше —
+    события по мере появления: request, preload, error, stats.
+    """
+    ws = web.WebSocketResponse(heartbeat=30)
+    await ws.prepare(request)
+    queue = events.subscribe()
+    log.info(f"📡 Подписчик событий подключился ({events.subscribers} всего)")
+
+    async def pump() -> None:
+        await ws.send_json({'type': 'snapshot', 'status': status.as_dict(), **live_stats()})
+        while True:
+            await ws.send_json(await queue.get())
+
+    sender = asyncio.create_task(pump())
+    try:
+        # Клиент ничего не присылает; читаем, чтобы заметить закрытие и отвечать на ping
+        async for message in ws:
+            if message.type == WSMsgType.ERROR:
+                break
+    finally:
+        events.unsubscribe(queue)
+        sender.cancel()
+        with contextlib.suppress(asyncio.CancelledError, ConnectionError):
+            await sender
+        log.info(f"📡 Подписчик событий отключился ({events.subscribers} осталось)")
+    return ws
@@ -0,0 +1,144 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from src.bot.constants import ALL_GROUPS
+from src.bot.schedule_cache import schedule_cache
+from src.config.settings import BASE_URL
+from src.database.db import db
+from src.parser.parser import get_info
+from src.utils.logger import log
+from src.utils.metrics import registry
+
+FRESH_TTL = 3600       # секунд: столько расписание с сайта считается свежим (как TTL кэша в БД)
+RECHECK_TTL = 300      # после рестарта свежесть неизвестна — проверяем кэш БД не чаще раза в 5 минут
+FAILURE_BACKOFF = 60   # после неудачной загрузки не трогаем сайт минуту
+
+KNOWN_GROUPS = frozenset(ALL_GROUPS)
+
+
+class ScheduleFetcher:
+    """
+    Загрузка расписаний с сайта по требованию.
+
+    Одновременные запросы одной группы ждут одну и ту же загрузку
+    (single-flight). Устаревшее расписание отдаётся сразу, а обновление
+    идёт в фоне — не больше одного на группу (stale-while-revalidate).
+    """
+
+    def __init__(self) -> None:
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._fresh_until: Dict[str, float] = {}
+        self.fetches = 0
+        self.coalesced = 0
+        self.revalidations = 0
+        self.failures = 0
+
+    def is_fresh(self, group: str) -> bool:
+        return time.monotonic() < self._fresh_until.get(group, 0.0)
+
+    def mark_fresh(self, group: str, ttl: float = FRESH_TTL) -> None:
+        self._fresh_until[group] = time.monotonic() + ttl
+
+    async def _scrape(self, group: str) -> Optional[Dict]:
+        self.fetches += 1
+        started = time.perf_counter()
+        try:
+            data = await get_info(f"{BASE_URL}?group={group}")
+        except Exception as e:
+            data = None
+            log.error(f"💥 Ошибка загрузки расписания {group}: {e}")
+        if not data:
+            # Пустой ответ не затирает то, что уже есть
+            self.failures += 1
+            self.mark_fresh(group, FAILURE_BACKOFF)
+            return None
+
+        # save_schedule пишет расписание и его копию в таблицу кэша БД;
+        # кэш в памяти процесса (schedule_cache.put ниже) обновляем сами
+        await db.save_schedule(group, data, datetime.now().strftime("%Y-%m-%d"))
+        schedule_cache.put(group, data)
+        self.mark_fresh(group)
+        log.info(f"🌐 {group}: расписание загружено с сайта за {time.perf_counter() - started:.2f} с")
+        return data
+
+    def fetch(self, group: str) -> "asyncio.Future[Optional[Dict]]":
+        """
+        Загрузка группы с сайта; повторный вызов во время загрузки вернёт ту же задачу.
+
+        Returns:
+            Future: Завершится расписанием или None, если сайт ничего не отдал
+        """
+        task = self._inflight.get(group)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = self._inflight[group] = asyncio.create_task(self._scrape(group))
+            task.add_done_callback(lambda _: self._inflight.pop(group, None))
+        # shield: отмена одного ожидающего не отменяет загрузку для остальных
+        return asyncio.shield(task)
+
+    async def _revalidate(self, group: str) -> None:
+        try:
+            if await db.get_from_cache(group) is not None:
+                # Кэш в БД ещё жив (например, после рестарта) — сайт не трогаем
+                self.mark_fresh(group, RECHECK_TTL)
+                return
+            await self.fetch(group)
+        except Exception as e:
+            log.error(f"💥 Ошибка фонового обновления {group}: {e}")
+
+    def refresh_if_stale(self, group: str) -> None:
+        """Запускает фоновое обновление группы, если оно нужно и ещё не идёт"""
+        if group not in KNOWN_GROUPS or self.is_fresh(group) or group in self._inflight:
+            return
+        # Помечаем сразу, чтобы проверка в БД тоже шла не больше одного раза
+        self.mark_fresh(group, RECHECK_TTL)
+        self.revalidations += 1
+        asyncio.create_task(self._revalidate(group))
+
+    async def get_schedule(self, group: str) -> Optional[Dict]:
+        """
+        Расписание группы: из памяти или БД сразу, с сайта — только если его нигде нет.
+        """
+        schedule_data = schedule_cache.get(group)
+        if schedule_data is None:
+            schedule_data = await db.get_schedule(group)
+            if schedule_data:
+                schedule_cache.put(group, schedule_data)
+        if schedule_data:
+            self.refresh_if_stale(group)
+            return schedule_data
+        if group not in KNOWN_GROUPS or (self.is_fresh(group) and group not in self._inflight):
+            # Неизвестная группа или сайт недавно ничего не отдал — не дёргаем его на каждый запрос
+            return None
+        return await self.fetch(group)
+
+    async def render(self, group: str, day_key: str) -> Optional[str]:
+        """Готовый текст расписания; группа, которой нет нигде, загружается с сайта"""
+        text = schedule_cache.render(group, day_key)
+        if text is not None:
+            self.refresh_if_stale(group)
+            return text
+        if await self.get_schedule(group) is None:
+            return None
+        return schedule_cache.render(group, day_key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'fetches': self.fetches,
+            'coalesced': self.coalesced,
+            'revalidations': self.revalidations,
+            'failures': self.failures,
+            'inflight': len(self._inflight),
+        }
+
+
+schedule_fetcher = ScheduleFetcher()
+
+registry.gauge("schedule_fetcher_events_total", "Загрузки с сайта по требованию", ["event"],
+               lambda: {(event,): value for event, value in schedule_fetcher.stats().items() if event != 'inflight'},
+               kind="counter")
+registry.gauge("schedule_fetcher_inflight", "Загрузок с сайта в процессе",
+               function=lambda: schedule_fetcher.stats()['inflight'])
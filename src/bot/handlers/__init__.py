@@ -1,33 +1,53 @@
-import re
-from telebot.types import Message, ReplyKeyboardMarkup, KeyboardButton, ReplyKeyboardRemove
-from src.bot.core import bot, user_groups
+import asyncio
+import html
+import io
+from datetime import datetime
+
+from telebot.asyncio_helper import ApiTelegramException
+from telebot.types import Message, ReplyKeyboardMarkup, KeyboardButton, ReplyKeyboardRemove, InputFile
+from src.bot.core import bot
 from src.bot.preload import preload_all_schedules
-from src.bot.constants import GROUPS_BY_COURSE, DAYS_MAPPING
+from src.bot.router import router
+from src.bot.metrics import timed_handler
+from src.bot.outbox import outbox
+from src.bot.sessions import sessions, State
+from src.bot.fetcher import schedule_fetcher
+from src.bot.schedule_cache import schedule_cache
+from src.bot.pagination import send_paged
+from src.bot import digest
+from src.bot.status import status
+from src.bot.ics import send_calendar, GROUP
+from src.bot.jobs import jobs, Job, QUEUED, RUNNING, DONE, FAILED, CANCELLED
+from src.bot.webhook import send_message_now
+from src.bot.teachers import teacher_index, find_teachers, suggest_teachers
+from src.bot.rooms import rooms_reply, current_slot
+from src.bot.constants import GROUPS_BY_COURSE, ALL_GROUPS, DAYS_MAPPING
 from src.bot.keyboards import (
     create_courses_keyboard,
     create_groups_keyboard,
     create_schedule_keyboard,
     create_main_menu_keyboard,
     create_back_to_main_keyboard,
+    create_courses_inline_keyboard,
+    create_days_inline_keyboard,
+    create_teacher_suggestions_keyboard,
+    create_job_cancel_keyboard,
+    create_calendar_keyboard,
 )
 from src.database.db import db
-from src.utils.formatting import format_daily_schedule, format_weekly_schedule
-from src.config.settings import ADMIN_PASSWORD
-
-search_mode: dict[int, bool] = {}
-admin_mode: dict[int, bool] = {}          
-admin_password_mode: dict[int, bool] = {} 
+from src.config.settings import ADMIN_PASSWORD, DIGEST_TIME, PROFILE_SECONDS, PROFILE_TOP
+from src.utils.profiler import profiler
+from src.utils.logger import log
 
 
 # === /start — главное меню ===
 @bot.message_handler(commands=['start'])
+@timed_handler
 async def send_welcome(message: Message):
     user_id = message.from_user.id
     username = message.from_user.username or message.from_user.first_name or "друг"
     
-    search_mode[user_id] = False
-    admin_mode[user_id] = False
-    admin_password_mode[user_id] = False
+    sessions.reset(user_id)
     
     await bot.send_message(
         message.chat.id,
@@ -38,16 +58,14 @@ async def send_welcome(message: Message):
 
 
 # === Универсальная кнопка "🏠 Главное меню" ===
-@bot.message_handler(func=lambda m: m.text and m.text.strip() == "🏠 Главное меню")
+@router.exact("🏠 Главное меню")
 async def back_to_main_menu(message: Message):
     user_id = message.from_user.id
-    search_mode[user_id] = False
-    admin_mode[user_id] = False
-    admin_password_mode[user_id] = False
+    sessions.reset(user_id)
     await send_welcome(message)
 
 # === Кнопка "Информация о проекте" ===
-@bot.message_handler(func=lambda m: m.text == "ℹ️ Информация о проекте")
+@router.exact("ℹ️ Информация о проекте")
 async def project_info(message: Message):
     info_text = (
         "<b>Информация о курсовом проекте</b>\n\n"
@@ -86,34 +104,35 @@ async def project_info(message: Message):
     )
     
 # === Главное меню: Расписание ===
-@bot.message_handler(func=lambda m: m.text == "📅 Расписание")
+@router.exact("📅 Расписание")
 async def main_schedule(message: Message):
     user_id = message.from_user.id
-    search_mode[user_id] = False
+    sessions.exit_state(user_id, State.TEACHER_SEARCH)
     
     saved_group = await db.get_user_group(user_id)
     
+    # Дальше навигация идёт inline-кнопками в этом же сообщении (см. navigation.py)
     if saved_group:
-        user_groups[user_id] = saved_group
+        sessions.set_group(user_id, saved_group)
         await bot.send_message(
             message.chat.id,
             f"Ваша группа: <b>{saved_group}</b>\nВыберите день:",
-            reply_markup=create_schedule_keyboard(),
+            reply_markup=create_days_inline_keyboard(saved_group),
             parse_mode="HTML"
         )
     else:
         await bot.send_message(
             message.chat.id,
             "Выберите свой курс:",
-            reply_markup=create_courses_keyboard()
+            reply_markup=create_courses_inline_keyboard()
         )
 
 
 # === Главное меню: Поиск по преподавателю ===
-@bot.message_handler(func=lambda m: m.text == "🔍 Поиск по преподавателю")
+@router.exact("🔍 Поиск по преподавателю")
 async def search_teacher_start(message: Message):
     user_id = message.from_user.id
-    search_mode[user_id] = True
+    sessions.set_state(user_id, State.TEACHER_SEARCH)
 
     await bot.send_message(
         message.chat.id,
@@ -125,63 +144,102 @@ async def search_teacher_start(message: Message):
 
 
 # === Главное меню: Все преподаватели на неделю ===
-@bot.message_handler(func=lambda m: m.text == "👨‍🏫 Все преподаватели на неделю")
+@router.exact("👨‍🏫 Все преподаватели на неделю")
 async def list_all_teachers(message: Message):
     user_id = message.from_user.id
-    search_mode[user_id] = False
+    sessions.exit_state(user_id, State.TEACHER_SEARCH)
     
-    await bot.send_message(message.chat.id, "🔄 Собираю список всех преподавателей...")
+    # Главное меню показываем сразу: к длинному списку со страницами его не прикрепить
+    await bot.send_message(
+        message.chat.id,
+        "🔄 Собираю список всех преподавателей...",
+        reply_markup=create_main_menu_keyboard()
+    )
 
-    all_schedules = await db.get_all_schedules()
+    if not schedule_cache.all():
+        await schedule_cache.reload()
+    teachers_list = teacher_index().names
 
-    if not all_schedules:
+    if not teachers_list:
         await bot.send_message(
             message.chat.id,
-            "❌ Расписания не загружены. Обновите через админ-панель.",
+            "😔 Преподаватели не найдены. Возможно, расписания не загружены — обновите через админ-панель.",
             reply_markup=create_main_menu_keyboard()
         )
         return
 
-    teachers = set()
-    pattern = re.compile(r'\b([А-ЯЁ][а-яё]+(?:-[А-ЯЁ][а-яё]+)?\s+[А-ЯЁ]\.[А-ЯЁ]\.)')
+    response = "👨‍🏫 <b>Все преподаватели на этой неделе:</b>\n\n"
+    for i, teacher in enumerate(teachers_list, 1):
+        response += f"{i}. {teacher}\n"
+    response += f"\nВсего: <b>{len(teachers_list)}</b> уникальных."
 
-    for group, schedule_data in all_schedules.items():
-        for day_key in ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday']:
-            day_data = schedule_data.get(day_key, {})
-            for lesson in day_data.get('lessons', []):
-                matches = pattern.findall(lesson)
-                for match in matches:
-                    teachers.add(match.strip())
+    await send_paged(message.chat.id, response, parse_mode="HTML")
 
-    if not teachers:
+
+# === Главное меню: Свободные кабинеты ===
+@router.exact("🚪 Свободные кабинеты")
+async def show_free_rooms(message: Message):
+    sessions.exit_state(message.from_user.id, State.TEACHER_SEARCH)
+    if not schedule_cache.all():
+        await schedule_cache.reload()
+
+    # Текущая или ближайшая пара; вечером и в воскресенье — первая пара понедельника
+    day_key, pair = current_slot() or ("monday", 1)
+    text, markup = rooms_reply(day_key, pair)
+    await bot.send_message(message.chat.id, text, parse_mode="HTML", reply_markup=markup)
+
+
+# === Главное меню: подписка на ежедневную рассылку ===
+@router.exact("🔔 Рассылка на завтра")
+async def toggle_digest(message: Message):
+    user_id = message.from_user.id
+    sessions.exit_state(user_id, State.TEACHER_SEARCH)
+
+    group = sessions.group(user_id) or await db.get_user_group(user_id)
+    if group is None:
         await bot.send_message(
             message.chat.id,
-            "😔 Преподаватели не найдены.",
+            "Сначала выберите группу в разделе «📅 Расписание» — рассылка приходит по ней.",
             reply_markup=create_main_menu_keyboard()
         )
         return
 
-    teachers_list = sorted(teachers)
-    response = "👨‍🏫 <b>Все преподаватели на этой неделе:</b>\n\n"
-    for i, teacher in enumerate(teachers_list, 1):
-        response += f"{i}. {teacher}\n"
-    response += f"\nВсего: <b>{len(teachers_list)}</b> уникальных."
+    subscribed = not await db.is_digest_subscribed(user_id)
+    await db.set_digest_subscription(user_id, subscribed)
+    if subscribed:
+        text = (f"🔔 Подписка включена: каждый день в {DIGEST_TIME} пришлю расписание "
+                f"группы <b>{group}</b> на завтра.\n\nЧтобы отписаться, нажмите кнопку ещё раз.")
+    else:
+        text = "🔕 Подписка на рассылку выключена."
+    await bot.send_message(message.chat.id, text, parse_mode="HTML", reply_markup=create_main_menu_keyboard())
 
-    await bot.send_message(
-        message.chat.id,
-        response,
-        parse_mode="HTML",
-        reply_markup=create_main_menu_keyboard()
-    )
+
+# === /calendar — расписание группы файлом .ics ===
+@bot.message_handler(commands=['calendar'])
+@timed_handler
+async def send_group_calendar(message: Message):
+    user_id = message.from_user.id
+    group = sessions.group(user_id) or await db.get_user_group(user_id)
+    if group is None:
+        await bot.send_message(message.chat.id, "Сначала выберите группу:", reply_markup=create_courses_keyboard())
+        return
+    if schedule_cache.get(group) is None:
+        # Группы нет в памяти — fetcher подтянет её из БД или с сайта
+        await schedule_fetcher.render(group, "week")
+    if not await send_calendar(message.chat.id, GROUP, group):
+        await bot.send_message(message.chat.id, f"❌ Расписание для <b>{group}</b> не найдено.", parse_mode="HTML")
 
 
 # === Обработка поиска по преподавателю ===
-@bot.message_handler(func=lambda m: m.text and m.from_user.id in search_mode and search_mode[m.from_user.id])
+MAX_TEACHER_TIMETABLES = 3  # больше совпадений — просим уточнить фамилию
+
+
+@router.fallback(lambda m: sessions.state(m.from_user.id) == State.TEACHER_SEARCH)
 async def handle_teacher_search_input(message: Message):
     user_id = message.from_user.id
 
     if message.text == "🔙 В главное меню":
-        search_mode[user_id] = False
+        sessions.exit_state(user_id, State.TEACHER_SEARCH)
         await send_welcome(message)
         return
 
@@ -197,55 +255,60 @@ async def handle_teacher_search_input(message: Message):
         )
         return
 
-    await bot.send_message(message.chat.id, f"🔄 Ищу пары у <b>{surname}</b>...", parse_mode="HTML")
+    await bot.send_message(
+        message.chat.id,
+        f"🔄 Ищу пары у <b>{surname}</b>...",
+        parse_mode="HTML",
+        reply_markup=create_main_menu_keyboard()
+    )
 
-    all_schedules = await db.get_all_schedules()
-    if not all_schedules:
+    if not schedule_cache.all():
+        await schedule_cache.reload()
+    if not schedule_cache.all():
         await bot.send_message(
             message.chat.id,
             "❌ Расписания не загружены.",
             reply_markup=create_main_menu_keyboard()
         )
-        search_mode[user_id] = False
+        sessions.exit_state(user_id, State.TEACHER_SEARCH)
         return
 
-    found_lessons = []
-    days_russian = {
-        'monday': 'Понедельник', 'tuesday': 'Вторник', 'wednesday': 'Среда',
-        'thursday': 'Четверг', 'friday': 'Пятница', 'saturday': 'Суббота',
-    }
-
-    for group, schedule_data in all_schedules.items():
-        for day_key, day_data in schedule_data.items():
-            if day_key not in days_russian:
-                continue
-            date_str = day_data.get('date', '')
-            full_day = f"{days_russian[day_key]} ({date_str})" if date_str else days_russian[day_key]
-            for lesson in day_data.get('lessons', []):
-                if re.search(rf'\b{re.escape(surname)}\b', lesson, re.IGNORECASE):
-                    found_lessons.append(f"<b>{full_day}</b> | <i>{group}</i>\n{lesson}")
-
-    response_text = (
-        f"🔍 Найдено у <b>{surname}</b>:\n\n" + "\n\n".join(found_lessons)
-        if found_lessons
-        else f"😔 На этой неделе у <b>{surname}</b> пар не найдено."
-    )
-
-    await bot.send_message(
-        message.chat.id,
-        response_text,
-        parse_mode="HTML",
-        reply_markup=create_main_menu_keyboard()
-    )
-    search_mode[user_id] = False
+    # Расписания преподавателей собраны заранее для текущей версии расписаний
+    teachers = find_teachers(surname)
+    suggestions = [] if teachers else suggest_teachers(surname)
+    if suggestions:
+        # Опечатка, «е» вместо «ё» или латинская буква — предлагаем похожих, выбор одной кнопкой
+        await bot.send_message(
+            message.chat.id,
+            f"🤔 Точного совпадения для <b>{surname}</b> нет. Возможно, вы имели в виду:",
+            parse_mode="HTML",
+            reply_markup=create_teacher_suggestions_keyboard([teacher for teacher, _ in suggestions])
+        )
+    elif not teachers:
+        await bot.send_message(message.chat.id, f"😔 На этой неделе у <b>{surname}</b> пар не найдено.", parse_mode="HTML")
+    elif len(teachers) > MAX_TEACHER_TIMETABLES:
+        names = "\n".join(f"• {teacher}" for teacher in teachers)
+        await send_paged(
+            message.chat.id,
+            f"🔍 Под запрос <b>{surname}</b> подходит {len(teachers)} преподавателей — уточните фамилию:\n\n{names}",
+            parse_mode="HTML"
+        )
+    else:
+        timetables = teacher_index().timetables
+        for teacher in teachers:
+            await send_paged(message.chat.id, timetables[teacher], parse_mode="HTML",
+                             reply_markup=create_calendar_keyboard("t", teacher))
+    sessions.exit_state(user_id, State.TEACHER_SEARCH)
 
 
 # === Админ-панель ===
 @bot.message_handler(commands=['admin'])
+@timed_handler
 async def admin_login(message: Message):
     user_id = message.from_user.id
-    admin_mode[user_id] = False
-    admin_password_mode[user_id] = True
+    session = sessions.ensure(user_id)
+    session.is_admin = False
+    session.state = State.ADMIN_PASSWORD
 
     await bot.send_message(
         message.chat.id,
@@ -255,13 +318,14 @@ async def admin_login(message: Message):
 
 
 # === Обработка ввода пароля ===
-@bot.message_handler(func=lambda m: m.from_user.id in admin_password_mode and admin_password_mode[m.from_user.id])
+@router.fallback(lambda m: sessions.state(m.from_user.id) == State.ADMIN_PASSWORD)
 async def handle_admin_password(message: Message):
     user_id = message.from_user.id
-    admin_password_mode[user_id] = False  # выключаем режим
+    session = sessions.ensure(user_id)
+    session.state = State.IDLE  # выключаем режим
 
     if message.text == ADMIN_PASSWORD:  # ← теперь берётся из settings.py (а settings.py — из .env)
-        admin_mode[user_id] = True
+        session.is_admin = True
         await bot.send_message(
             message.chat.id,
             "✅ Доступ разрешён!\n\nАдмин-панель:",
@@ -276,21 +340,32 @@ async def handle_admin_password(message: Message):
 
 
 # === Клавиатура админ-панели ===
-def create_admin_keyboard():
+def _build_admin_keyboard():
     markup = ReplyKeyboardMarkup(resize_keyboard=True)
     markup.add("📊 Статистика")
     markup.add("🗑 Очистить кэш")
     markup.add("🗃 Инфо о БД")
     markup.add("🔄 Обновить расписания")
+    markup.add("💾 Резервная копия")
+    markup.add("🔔 Разослать на завтра")
+    markup.add("🔬 Профилировщик")
+    markup.add("📋 Задачи")
     markup.row("🚪 Выйти из админ-панели")
     return markup
 
 
+ADMIN_KEYBOARD = _build_admin_keyboard().to_json()
+
+
+def create_admin_keyboard():
+    return ADMIN_KEYBOARD
+
+
 # === Выход из админ-панели ===
-@bot.message_handler(func=lambda m: m.text == "🚪 Выйти из админ-панели")
+@router.exact("🚪 Выйти из админ-панели")
 async def admin_logout(message: Message):
     user_id = message.from_user.id
-    admin_mode[user_id] = False
+    sessions.reset(user_id)
     await bot.send_message(
         message.chat.id,
         "🚪 Вы вышли из админ-панели.",
@@ -299,10 +374,11 @@ async def admin_logout(message: Message):
 
 
 # === Админ-функции по кнопкам ===
-@bot.message_handler(func=lambda m: m.text in ["📊 Статистика", "🗑 Очистить кэш", "🗃 Инфо о БД", "🔄 Обновить расписания"])
+@router.exact("📊 Статистика", "🗑 Очистить кэш", "🗃 Инфо о БД", "🔄 Обновить расписания", "💾 Резервная копия",
+              "🔔 Разослать на завтра", "🔬 Профилировщик", "📋 Задачи")
 async def admin_commands_by_button(message: Message):
     user_id = message.from_user.id
-    if not admin_mode.get(user_id, False):
+    if not sessions.is_admin(user_id):
         await bot.send_message(message.chat.id, "❌ Доступ запрещён.")
         return
 
@@ -318,11 +394,24 @@ async def admin_commands_by_button(message: Message):
             response += "\n🏆 <b>Популярные группы:</b>\n"
             for g in popular:
                 response += f"  • <code>{g['_id']}</code>: {g['count']} запросов\n"
+        sending = outbox.stats()
+        response += "\n📤 <b>Очередь отправки:</b>\n"
+        response += f"  • В очереди: {sending['queue_depth']['interactive']} ответов, {sending['queue_depth']['broadcast']} рассылок\n"
+        response += f"  • Отправлено: {sending['sent']}, ошибок: {sending['failed']}, повторов после 429: {sending['retries_429']}\n"
+        response += f"  • Задержка p50/p95/p99: {sending['latency_ms']['p50']:.0f}/{sending['latency_ms']['p95']:.0f}/{sending['latency_ms']['p99']:.0f} мс\n"
+        loading = schedule_fetcher.stats()
+        response += "\n🌐 <b>Загрузка с сайта по запросу:</b>\n"
+        response += f"  • Загрузок: {loading['fetches']}, объединено повторных: {loading['coalesced']}, ошибок: {loading['failures']}\n"
+        response += f"  • Фоновых проверок свежести: {loading['revalidations']}\n"
+        response += "\n🚦 <b>Запуск:</b>\n"
+        response += f"  • Ответы через {status.ready_after or 0:.1f} с после старта, {status.cached_groups} групп из БД\n"
+        response += f"  • {format_preload_progress()}\n"
+        if digest.last_report:
+            response += "\n" + format_digest_report(digest.last_report)
         await bot.send_message(message.chat.id, response, parse_mode='HTML')
 
     elif text == "🗑 Очистить кэш":
-        await db.cleanup_old_data(days_old=1)
-        await bot.send_message(message.chat.id, "✅ Кэш очищен!")
+        await start_job(message.chat.id, "cleanup", "Очистка кэша", cleanup_job)
 
     elif text == "🗃 Инфо о БД":
         info = await db.get_database_info()
@@ -336,15 +425,171 @@ async def admin_commands_by_button(message: Message):
         await bot.send_message(message.chat.id, response, parse_mode='HTML')
 
     elif text == "🔄 Обновить расписания":
-        await bot.send_message(message.chat.id, "🔄 Начинаем обновление всех расписаний...")
-        count = await preload_all_schedules()
-        await bot.send_message(message.chat.id, f"✅ Обновление завершено! Загружено: <b>{count}</b> групп", parse_mode='HTML')
+        if status.preload_running and jobs.find_active("refresh") is None:
+            # Идёт предзагрузка после запуска бота — вторую параллельно не начинаем
+            await bot.send_message(message.chat.id, f"⏳ Обновление уже идёт: {format_preload_progress()}")
+            return
+        await start_job(message.chat.id, "refresh", "Обновление расписаний", refresh_job)
+
+    elif text == "💾 Резервная копия":
+        await start_job(message.chat.id, "backup", "Резервная копия БД", backup_job)
+
+    elif text == "🔔 Разослать на завтра":
+        await start_job(message.chat.id, "digest", "Рассылка на завтра", digest_job)
+
+    elif text == "🔬 Профилировщик":
+        if profiler.running:
+            profiler.request_stop()
+            await bot.send_message(message.chat.id, "⏹ Останавливаю профилировщик, отчёт придёт файлом...")
+            return
+        profiler.start()
+        asyncio.create_task(profile_and_send(message.chat.id))
+        await bot.send_message(
+            message.chat.id,
+            f"🔬 Профилирую {PROFILE_SECONDS} с, затем пришлю {PROFILE_TOP} самых горячих функций файлом.\n"
+            "Нажмите кнопку ещё раз, чтобы остановить раньше."
+        )
+
+    elif text == "📋 Задачи":
+        await bot.send_message(message.chat.id, format_jobs_overview(), parse_mode='HTML')
+
+
+# === Фоновые задачи админки: обновление, очистка, резервная копия, рассылка ===
+JOB_STATE_TITLES = {
+    QUEUED: "⏳ В очереди",
+    RUNNING: "🔄 Выполняется",
+    DONE: "✅ Готово",
+    FAILED: "❌ Ошибка",
+    CANCELLED: "⏹ Отменена",
+}
+
+
+async def refresh_job(job: Job) -> str:
+    count = await preload_all_schedules(progress=job.report)
+    return f"Загружено: <b>{count}</b> групп"
+
+
+async def cleanup_job(job: Job) -> str:
+    await db.cleanup_old_data(days_old=1)
+    return "Кэш очищен"
+
+
+async def backup_job(job: Job) -> str:
+    result = await db.backup()
+    response = f"📁 Файл: <code>{result['path']}</code>\n"
+    response += f"📦 Размер: <b>{result['size_bytes'] / 1024:.1f}</b> КБ\n"
+    response += f"⚡ Скорость: <b>{result['pages_per_sec']:.0f}</b> стр/с ({result['pages']} стр.)"
+    if result.get('restarts'):
+        response += f"\n🔁 Перезапусков из-за записи в базу: <b>{result['restarts']}</b>"
+    return response
+
+
+async def digest_job(job: Job) -> str:
+    report = await digest.send_digest(progress=job.report)
+    if report.get('already_sent'):
+        return f"Рассылка на {report['date']} уже отправлялась — повторно не отправляю"
+    return format_digest_report(report)
+
+
+def format_job(job: Job) -> str:
+    response = f"{JOB_STATE_TITLES[job.state]}: <b>{job.title}</b> (#{job.id})\n"
+    if job.state == RUNNING and job.total:
+        response += f"Прогресс: <b>{job.done}/{job.total}</b> ({job.done / job.total:.0%})"
+        if job.note:
+            response += f", сейчас <code>{html.escape(job.note)}</code>"
+        response += "\n"
+    elif job.state == DONE and job.result:
+        response += job.result + "\n"
+    elif job.state == FAILED:
+        response += f"<code>{html.escape(job.error or '')}</code>\n"
+    if job.state != QUEUED:
+        response += f"⏱ {job.duration:.0f} с"
+    return response
+
+
+async def show_job(chat_id: int, message_id: int, job: Job) -> None:
+    """Перерисовывает сообщение о задаче; кнопка отмены — пока задача не завершилась"""
+    try:
+        await bot.edit_message_text(
+            format_job(job),
+            chat_id=chat_id,
+            message_id=message_id,
+            reply_markup=create_job_cancel_keyboard(job.id) if job.active else None,
+            parse_mode='HTML'
+        )
+    except ApiTelegramException as e:
+        if "message is not modified" not in str(e):
+            raise
+
+
+async def start_job(chat_id: int, kind: str, title: str, work) -> None:
+    """
+    Запускает задачу в фоне (или подключается к уже идущей такой же)
+    и показывает её ход в одном сообщении, которое правится по мере работы.
+    """
+    job, created = jobs.submit(kind, title, work)
+    text = format_job(job)
+    if not created:
+        text = "ℹ️ Такая задача уже запущена — показываю её ход\n\n" + text
+    # Сообщение о задаче потом правится — нужен настоящий Message, а не ответ в теле webhook
+    message = await send_message_now(bot, chat_id, text, parse_mode='HTML',
+                                     reply_markup=create_job_cancel_keyboard(job.id))
+    if message is None:
+        log.warning(f"⚠️ Задача #{job.id}: сообщение о ходе не отправлено, прогресс не будет показан")
+        return
+    job.watch(lambda job: show_job(chat_id, message.message_id, job))
+
+
+def format_jobs_overview() -> str:
+    active = jobs.active()
+    response = "📋 <b>Фоновые задачи</b>\n\n"
+    if active:
+        response += "\n".join(format_job(job) for job in active) + "\n\n"
+    else:
+        response += "Сейчас ничего не выполняется\n\n"
+    if jobs.history:
+        response += "<b>Последние завершённые:</b>\n"
+        for job in list(jobs.history)[:10]:
+            finished = datetime.fromtimestamp(job.finished).strftime("%d.%m %H:%M")
+            response += f"  • {finished} {JOB_STATE_TITLES[job.state]}: {job.title} (#{job.id}, {job.duration:.0f} с)\n"
+    return response
+
+
+async def profile_and_send(chat_id: int) -> None:
+    """Выборочное профилирование цикла событий и отправка отчёта файлом"""
+    try:
+        await profiler.run(PROFILE_SECONDS)
+        report = profiler.report(PROFILE_TOP)
+        document = InputFile(io.BytesIO(report.encode("utf-8")),
+                             file_name=f"profile_{datetime.now():%Y%m%d_%H%M%S}.txt")
+        await bot.send_document(chat_id, document, caption="🔬 " + report.split("\n", 1)[0])
+    except Exception as e:
+        # Задача запущена через create_task — без этого ошибка потерялась бы молча
+        log.exception("💥 Профилировщик: не удалось снять или отправить отчёт")
+        await bot.send_message(chat_id, f"❌ Профилирование не удалось: {e}")
+
+
+def format_preload_progress() -> str:
+    if status.preload_running:
+        return f"Предзагрузка: {status.preload_done}/{status.preload_total} групп, ошибок {status.preload_failed}"
+    if status.preload_duration is not None:
+        return f"Предзагрузка завершена за {status.preload_duration:.0f} с, ошибок {status.preload_failed}"
+    return "Предзагрузка ещё не запускалась"
+
+
+def format_digest_report(report: dict) -> str:
+    response = f"🔔 <b>Рассылка на {report['date']}:</b>\n"
+    response += f"  • Доставлено: <b>{report['sent']}</b> из {report['recipients']} ({report['groups']} групп)\n"
+    response += f"  • Ошибок: {report['failed']}, отписано заблокировавших: {report['unsubscribed']}\n"
+    response += f"  • Пропущено групп без расписания: {report['skipped_groups']}\n"
+    response += f"  • Время: {report['duration']:.1f} с, {report['per_sec']:.1f} сообщ./с\n"
+    return response
 
 
 # === Выбор курса ===
-@bot.message_handler(func=lambda m: m.text in GROUPS_BY_COURSE.keys())
+@router.exact(*GROUPS_BY_COURSE.keys())
 async def handle_course_selection(message: Message):
-    search_mode[message.from_user.id] = False
+    sessions.exit_state(message.from_user.id, State.TEACHER_SEARCH)
     course = message.text
     await bot.send_message(
         message.chat.id,
@@ -355,9 +600,9 @@ async def handle_course_selection(message: Message):
 
 
 # === Назад к курсам ===
-@bot.message_handler(func=lambda m: m.text == "Назад к курсам")
+@router.exact("Назад к курсам")
 async def handle_back_to_courses(message: Message):
-    search_mode[message.from_user.id] = False
+    sessions.exit_state(message.from_user.id, State.TEACHER_SEARCH)
     await bot.send_message(
         message.chat.id,
         "Выберите свой курс:",
@@ -366,12 +611,12 @@ async def handle_back_to_courses(message: Message):
 
 
 # === Выбор группы ===
-@bot.message_handler(func=lambda m: any(m.text in groups for groups in GROUPS_BY_COURSE.values()))
+@router.exact(*ALL_GROUPS)
 async def handle_group_selection(message: Message):
-    search_mode[message.from_user.id] = False
+    sessions.exit_state(message.from_user.id, State.TEACHER_SEARCH)
     group = message.text.strip()
     user_id = message.from_user.id
-    user_groups[user_id] = group
+    sessions.set_group(user_id, group)
     await db.save_user_preference(user_id, group)
     
     await bot.send_message(
@@ -383,48 +628,52 @@ async def handle_group_selection(message: Message):
 
 
 # === Расписание по дням ===
-@bot.message_handler(func=lambda m: m.text in DAYS_MAPPING.keys())
+@router.exact(*DAYS_MAPPING.keys())
 async def send_schedule(message: Message):
-    search_mode[message.from_user.id] = False
+    sessions.exit_state(message.from_user.id, State.TEACHER_SEARCH)
     day_text = message.text.strip()
     day_key = DAYS_MAPPING[day_text]
     
     user_id = message.from_user.id
     
-    if user_id not in user_groups:
-        await bot.send_message(message.chat.id, "Сначала выберите группу:", reply_markup=create_courses_keyboard())
-        return
+    group = sessions.group(user_id)
+    if group is None:
+        # Сессия могла быть вытеснена или бот перезапущен — группа хранится в БД
+        group = await db.get_user_group(user_id)
+        if group is None:
+            await bot.send_message(message.chat.id, "Сначала выберите группу:", reply_markup=create_courses_keyboard())
+            return
+        sessions.set_group(user_id, group)
     
     if day_key == "change_group":
         await bot.send_message(message.chat.id, "Выберите новый курс:", reply_markup=create_courses_keyboard())
         return
     
-    group = user_groups[user_id]
-    schedule_data = await db.get_schedule(group)
-    
-    if not schedule_data:
+    # Группы может не быть в кэше — тогда она берётся из БД, а если нет и там, загружается с сайта
+    response = await schedule_fetcher.render(group, day_key)
+    if response is None:
         await bot.send_message(message.chat.id, f"❌ Расписание для <b>{group}</b> не найдено.", parse_mode="HTML")
         return
     
     await db.log_request(user_id, group, day_text)
     
-    response = format_weekly_schedule(schedule_data, group) if day_key == "week" else format_daily_schedule(schedule_data, day_key, day_text, group)
-    
-    await bot.send_message(message.chat.id, response, parse_mode="HTML")
+    # К неделе — кнопка, чтобы забрать её в календарь телефона
+    markup = create_calendar_keyboard("g", group) if day_key == "week" else None
+    await send_paged(message.chat.id, response, parse_mode="HTML", reply_markup=markup)
 
 
 # === Ловец остальных сообщений ===
-@bot.message_handler(func=lambda m: True)
+@router.fallback(lambda m: True)
 async def handle_other(message: Message):
     user_id = message.from_user.id
-    search_mode[user_id] = False
+    sessions.exit_state(user_id, State.TEACHER_SEARCH)
     
     # Не трогаем, если пользователь в админ-режиме или вводит пароль
-    if admin_mode.get(user_id, False) or admin_password_mode.get(user_id, False):
+    if sessions.is_admin(user_id) or sessions.state(user_id) == State.ADMIN_PASSWORD:
         return
     
-    if user_id in user_groups:
-        group = user_groups[user_id]
+    group = sessions.group(user_id)
+    if group is not None:
         await bot.send_message(
             message.chat.id,
             f"🤔 Не понял команду.\n\n"
@@ -438,4 +687,12 @@ async def handle_other(message: Message):
             "🤔 Не понял команду.\n\n"
             "Давайте начнём сначала:",
             reply_markup=create_main_menu_keyboard()
-        )
\ No newline at end of file
+        )
+
+
+# === Единая точка входа для текстовых сообщений ===
+# Регистрируется последней: команды /start и /admin обрабатываются раньше
+bot.register_message_handler(router.dispatch, func=lambda m: True)
+
+# Inline-режим (@bot 4пк2 вторник) и навигация inline-кнопками
+from src.bot.handlers import inline, navigation  # noqa: E402,F401
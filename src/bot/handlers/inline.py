@@ -0,0 +1,118 @@
+from bisect import bisect_left
+from datetime import timedelta
+from typing import List, Optional
+
+from telebot.types import (
+    InlineQuery,
+    InlineQueryResultArticle,
+    InlineQueryResultsButton,
+    InputTextMessageContent,
+)
+
+from src.bot.core import bot
+from src.bot.metrics import timed_handler
+from src.bot.constants import ALL_GROUPS
+from src.bot.pagination import split_pages
+from src.utils.clock import college_now
+from src.bot.schedule_cache import schedule_cache, DAY_TITLES
+from src.bot.sessions import sessions
+from src.database.db import db
+
+INLINE_CACHE_TIME = 300   # секунд, Telegram кэширует ответ на одинаковый запрос
+MAX_RESULTS = 20
+WEEKDAY_KEYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday']
+
+# Группы в нижнем регистре, отсортированные — для поиска по префиксу бинарным поиском
+_GROUPS_LOWER = sorted((group.lower(), group) for group in ALL_GROUPS)
+_GROUP_KEYS = [lower for lower, _ in _GROUPS_LOWER]
+
+DAY_ALIASES = {
+    "пн": "monday", "вт": "tuesday", "ср": "wednesday",
+    "чт": "thursday", "пт": "friday", "сб": "saturday",
+    "неделя": "week", "вся": "week",
+}
+
+
+def match_groups(prefix: str) -> List[str]:
+    """Группы, начинающиеся с prefix (без учёта регистра)"""
+    prefix = prefix.lower()
+    start = bisect_left(_GROUP_KEYS, prefix)
+    matches = []
+    for lower, group in _GROUPS_LOWER[start:]:
+        if not lower.startswith(prefix) or len(matches) >= MAX_RESULTS:
+            break
+        matches.append(group)
+    return matches
+
+
+def match_day(word: str) -> Optional[str]:
+    word = word.lower()
+    if word == "сегодня":
+        weekday = college_now().weekday()
+        return WEEKDAY_KEYS[weekday] if weekday < 6 else "week"
+    if word == "завтра":
+        weekday = (college_now() + timedelta(days=1)).weekday()
+        return WEEKDAY_KEYS[weekday] if weekday < 6 else "week"
+    if word in DAY_ALIASES:
+        return DAY_ALIASES[word]
+    for day_key, title in DAY_TITLES.items():
+        if len(word) >= 2 and title.lower().startswith(word):
+            return day_key
+    return None
+
+
+def make_article(group: str, day_key: str) -> Optional[InlineQueryResultArticle]:
+    text = schedule_cache.render(group, day_key)
+    if text is None:
+        return None
+    schedule = schedule_cache.get(group) or {}
+    date = schedule.get(day_key, {}).get('date', '') if day_key != "week" else schedule.get('date_range', '')
+    pages = split_pages(text)
+    if len(pages) > 1:
+        # В inline-режиме листать нечем — отправляем первую страницу
+        text = pages[0] + "\n\n…"
+    return InlineQueryResultArticle(
+        id=f"{group}:{day_key}:{schedule_cache.group_version(group)}",
+        title=f"{group} — {DAY_TITLES[day_key]}",
+        description=date or None,
+        input_message_content=InputTextMessageContent(text, parse_mode="HTML"),
+    )
+
+
+def build_results(groups: List[str], day_key: Optional[str]) -> List[InlineQueryResultArticle]:
+    if day_key is not None:
+        keys_per_group = [day_key]
+    elif len(groups) == 1:
+        keys_per_group = WEEKDAY_KEYS + ["week"]
+    else:
+        keys_per_group = ["week"]
+
+    results = []
+    for group in groups:
+        for key in keys_per_group:
+            article = make_article(group, key)
+            if article is not None:
+                results.append(article)
+    return results[:MAX_RESULTS]
+
+
+# === Inline-режим: @bot 4пк2 вторник ===
+@bot.inline_handler(func=lambda query: True)
+@timed_handler
+async def inline_schedule(query: InlineQuery):
+    words = query.query.split()
+    hint = InlineQueryResultsButton(text="Введите группу, например 4пк2 вторник", start_parameter="inline")
+
+    if not words:
+        # Пустой запрос — расписание своей группы, ответ у каждого свой
+        group = sessions.group(query.from_user.id) or await db.get_user_group(query.from_user.id)
+        results = build_results([group], None) if group else []
+        await bot.answer_inline_query(query.id, results, cache_time=INLINE_CACHE_TIME, is_personal=True, button=hint)
+        return
+
+    groups = match_groups(words[0])
+    exact = [group for group in groups if group.lower() == words[0].lower()]
+    groups = exact or groups
+    day_key = next((key for key in map(match_day, words[1:]) if key), None)
+    results = build_results(groups, day_key)
+    await bot.answer_inline_query(query.id, results, cache_time=INLINE_CACHE_TIME, button=hint)
@@ -0,0 +1,173 @@
+from typing import Optional
+
+from telebot.asyncio_helper import ApiTelegramException
+from telebot.types import CallbackQuery
+
+from src.bot.constants import PAIR_TIMES
+from src.bot.core import bot
+from src.bot.metrics import handler_timer
+from src.bot.keyboards import (
+    COURSES,
+    create_courses_inline_keyboard,
+    create_groups_inline_keyboard,
+    create_days_inline_keyboard,
+    create_calendar_keyboard,
+)
+from src.bot.pagination import paginator, first_page
+from src.bot.rooms import rooms_reply
+from src.bot.teachers import teacher_index, WEEKDAY_KEYS
+from src.bot.fetcher import schedule_fetcher
+from src.bot.schedule_cache import DAY_TITLES, is_known_group
+from src.bot.sessions import sessions
+from src.bot.jobs import jobs
+from src.bot.ics import send_calendar, KIND_CODES
+from src.database.db import db
+
+
+async def edit_in_place(call: CallbackQuery, text: str, reply_markup, parse_mode=None) -> None:
+    """Заменяет текст и клавиатуру сообщения, к которому привязана кнопка"""
+    try:
+        await bot.edit_message_text(
+            text,
+            chat_id=call.message.chat.id,
+            message_id=call.message.message_id,
+            reply_markup=reply_markup,
+            parse_mode=parse_mode
+        )
+    except ApiTelegramException as e:
+        # Повторное нажатие той же кнопки — сообщение не изменилось, это не ошибка
+        if "message is not modified" not in str(e):
+            raise
+
+
+async def show_courses(call: CallbackQuery, _: str) -> None:
+    await edit_in_place(call, "Выберите свой курс:", create_courses_inline_keyboard())
+
+
+async def show_groups(call: CallbackQuery, payload: str) -> Optional[str]:
+    # callback_data приходит от клиента — номер курса проверяем, а не верим ему
+    if not payload.isdigit() or int(payload) >= len(COURSES):
+        return "Курс не найден"
+    course = COURSES[int(payload)]
+    await edit_in_place(
+        call,
+        f"Выбран курс: <b>{course}</b>. Теперь выберите группу:",
+        create_groups_inline_keyboard(course),
+        parse_mode="HTML"
+    )
+
+
+async def choose_group(call: CallbackQuery, group: str) -> Optional[str]:
+    # Название группы из callback_data сохраняется в профиль — только известные группы
+    if not is_known_group(group):
+        return "Группа не найдена"
+    user_id = call.from_user.id
+    sessions.set_group(user_id, group)
+    await db.save_user_preference(user_id, group)
+    await edit_in_place(
+        call,
+        f"✅ Выбрана группа: <b>{group}</b>\nВыберите день:",
+        create_days_inline_keyboard(group),
+        parse_mode="HTML"
+    )
+
+
+async def show_day(call: CallbackQuery, payload: str) -> Optional[str]:
+    group, _, day_key = payload.rpartition(":")
+    if day_key not in DAY_TITLES or not is_known_group(group):
+        return "Кнопка устарела — выберите группу заново"
+    text = await schedule_fetcher.render(group, day_key)
+    if text is None:
+        text = f"❌ Расписание для <b>{group}</b> не найдено."
+    else:
+        await db.log_request(call.from_user.id, group, DAY_TITLES[day_key])
+    text, markup = first_page(text, create_days_inline_keyboard(group))
+    await edit_in_place(call, text, markup, parse_mode="HTML")
+
+
+async def show_page(call: CallbackQuery, payload: str) -> Optional[str]:
+    key, _, index = payload.rpartition(":")
+    if not index.isdigit():
+        return "Страница устарела — запросите ответ заново"
+    # Номер за пределами ответа paginator.page() прижимает к первой или последней странице
+    page = paginator.page(key, int(index))
+    if page is None:
+        # Страницы вытеснены из кэша или бот перезапускался
+        return "Ответ устарел — запросите его заново"
+    text, markup = page
+    await edit_in_place(call, text, markup, parse_mode="HTML")
+
+
+async def show_rooms(call: CallbackQuery, payload: str) -> Optional[str]:
+    day_key, _, pair = payload.partition(":")
+    # Кабинеты — только по учебным дням (без «всей недели») и парам из расписания звонков
+    if day_key not in WEEKDAY_KEYS or not pair.isdigit() or int(pair) not in PAIR_TIMES:
+        return "Кнопка устарела — откройте свободные кабинеты заново"
+    text, markup = rooms_reply(day_key, int(pair))
+    await edit_in_place(call, text, markup, parse_mode="HTML")
+
+
+async def show_teacher(call: CallbackQuery, teacher: str) -> Optional[str]:
+    timetable = teacher_index().timetables.get(teacher)
+    if timetable is None:
+        return "Расписание обновилось — повторите поиск"
+    text, markup = first_page(timetable, create_calendar_keyboard("t", teacher))
+    await edit_in_place(call, text, markup, parse_mode="HTML")
+
+
+async def send_ics(call: CallbackQuery, payload: str) -> Optional[str]:
+    code, _, owner = payload.partition(":")
+    kind = KIND_CODES.get(code)
+    if kind is None:
+        return "❌ Неизвестный календарь"
+    if not await send_calendar(call.message.chat.id, kind, owner):
+        return "Расписание не найдено — запросите его заново"
+    return "📅 Календарь отправлен"
+
+
+async def cancel_job(call: CallbackQuery, payload: str) -> Optional[str]:
+    if not sessions.is_admin(call.from_user.id):
+        return "❌ Доступ запрещён"
+    try:
+        job_id = int(payload)
+    except ValueError:
+        return "Задача не найдена"
+    if jobs.get(job_id) is None:
+        return "Задача не найдена"
+    # Сообщение о задаче обновит её наблюдатель, когда отмена дойдёт до задачи
+    if jobs.cancel(job_id):
+        return "⏹ Отменяю задачу..."
+    return "Задача уже завершена"
+
+
+# Префикс callback_data -> обработчик: один поиск в словаре на нажатие
+CALLBACK_ROUTES = {
+    "m": show_courses,
+    "c": show_groups,
+    "g": choose_group,
+    "d": show_day,
+    "p": show_page,
+    "r": show_rooms,
+    "t": show_teacher,
+    "j": cancel_job,
+    "i": send_ics,
+}
+CALLBACK_PREFIXES = {f"{prefix}:" for prefix in CALLBACK_ROUTES}
+
+
+# === Навигация inline-кнопками: курс -> группа -> день в одном сообщении ===
+# Листание страниц длинных ответов: p:<ключ>:<страница>; свободные кабинеты: r:<день>:<пара>;
+# подсказки поиска преподавателя: t:<ФИО>; отмена фоновой задачи админки: j:<номер>;
+# календарь .ics: i:g:<группа> или i:t:<ФИО>
+@bot.callback_query_handler(func=lambda call: call.data and call.data[:2] in CALLBACK_PREFIXES)
+async def handle_navigation(call: CallbackQuery):
+    prefix, payload = call.data.split(":", 1)
+    route = CALLBACK_ROUTES[prefix]
+    notice = None
+    try:
+        # Обработчик может вернуть короткое уведомление для всплывающей подсказки
+        with handler_timer(route.__name__):
+            notice = await route(call, payload)
+    finally:
+        # Убираем «часики» на кнопке в любом случае
+        await bot.answer_callback_query(call.id, text=notice)
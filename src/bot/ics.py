@@ -0,0 +1,311 @@
+import hashlib
+import io
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import quote
+
+from aiohttp import web
+from telebot.asyncio_helper import ApiTelegramException
+from telebot.types import InputFile
+
+from src.bot.constants import PAIR_TIMES
+from src.bot.core import bot
+from src.bot.rooms import ROOM_PATTERN
+from src.bot.schedule_cache import schedule_cache
+from src.bot.teachers import TEACHER_PATTERN, WEEKDAY_KEYS, pair_number
+from src.config.settings import API_PUBLIC_URL, WEBHOOK_URL
+from src.utils.clock import to_utc
+from src.utils.metrics import registry
+
+GROUP, TEACHER = "group", "teacher"
+KIND_CODES = {"g": GROUP, "t": TEACHER}  # в callback_data вид календаря — одна буква
+PRODID = "-//OKEI schedule bot//RU"
+LESSON_PREFIX = re.compile(r'^\s*\d+\s*[.)]?\s*')
+MAX_LINE_OCTETS = 75  # RFC 5545: длиннее — переносим строку
+
+ICS_BUILDS = registry.counter("ics_builds_total", "Сборки календарей (после смены версии расписания)", ["kind"])
+ICS_SENT = registry.counter("ics_sent_total", "Отправленные календари: file_id или новая загрузка", ["kind", "source"])
+
+
+class CalendarEvent(NamedTuple):
+    day: date
+    pair: int
+    summary: str
+    location: str
+    description: str
+
+
+class TeacherLesson(NamedTuple):
+    """Пара преподавателя в одной из групп — общая основа для API и календаря"""
+    day_key: str
+    day: Optional[date]   # None, если неделя расписания не распознана
+    pair: Optional[int]   # None, если у номера пары нет времени в PAIR_TIMES
+    group: str
+    lesson: str           # текст пары как на сайте
+
+
+def week_monday(date_range: str) -> Optional[date]:
+    """Понедельник недели из date_range «01.09.2025-06.09.2025»"""
+    try:
+        start = datetime.strptime(date_range.split('-')[0], '%d.%m.%Y').date()
+    except (ValueError, IndexError):
+        return None
+    return start - timedelta(days=start.weekday())
+
+
+def _week(schedule_data: Dict):
+    """(день, дата или None, номер пары, текст пары как на сайте) для всех пар недели"""
+    monday = week_monday(schedule_data.get('date_range', ''))
+    for offset, day_key in enumerate(WEEKDAY_KEYS):
+        day = monday + timedelta(days=offset) if monday is not None else None
+        for lesson in schedule_data.get(day_key, {}).get('lessons', []):
+            yield day_key, day, pair_number(lesson), lesson
+
+
+def _lessons(schedule_data: Dict):
+    """(дата, номер пары, текст пары без номера) для пар с известными датой и временем"""
+    for _, day, pair, lesson in _week(schedule_data):
+        if day is not None and pair in PAIR_TIMES and lesson.strip():
+            yield day, pair, LESSON_PREFIX.sub('', lesson)
+
+
+def _location(text: str) -> str:
+    rooms = ROOM_PATTERN.findall(text)
+    return ", ".join(f"каб. {room}" for room in rooms)
+
+
+def group_events(group: str, schedule_data: Dict) -> List[CalendarEvent]:
+    return [
+        CalendarEvent(day, pair, text, _location(text), f"Группа {group}")
+        for day, pair, text in _lessons(schedule_data)
+    ]
+
+
+def build_teacher_lessons(schedules: Dict[str, Dict]) -> Dict[str, Tuple[str, List[TeacherLesson]]]:
+    """
+    ФИО -> (версия, пары преподавателя во всех группах по дням и парам).
+
+    Из этого индекса строятся и ответ API, и календарь преподавателя.
+    Версия — хеш самих пар: расписание преподавателя считается изменившимся,
+    только если поменялись его пары, а не расписание любой группы.
+    """
+    lessons: Dict[str, List[TeacherLesson]] = {}
+    for group, schedule_data in schedules.items():
+        for day_key, day, pair, lesson in _week(schedule_data):
+            for teacher in set(TEACHER_PATTERN.findall(lesson)):
+                lessons.setdefault(teacher, []).append(
+                    TeacherLesson(day_key, day, pair if pair in PAIR_TIMES else None, group, lesson)
+                )
+    result = {}
+    for teacher, items in lessons.items():
+        items.sort(key=lambda item: (WEEKDAY_KEYS.index(item.day_key), item.pair or 99, item.group))
+        result[teacher] = (hashlib.sha1(repr(items).encode("utf-8")).hexdigest()[:16], items)
+    return result
+
+
+def teacher_lessons() -> Dict[str, Tuple[str, List[TeacherLesson]]]:
+    return schedule_cache.derived("teacher_lessons", build_teacher_lessons)
+
+
+def teacher_events(teacher: str, lessons: List[TeacherLesson]) -> List[CalendarEvent]:
+    """События календаря из пар преподавателя с известными датой и временем"""
+    events = []
+    for item in lessons:
+        if item.day is None or item.pair is None:
+            continue
+        text = LESSON_PREFIX.sub('', item.lesson)
+        summary = " ".join(text.replace(teacher, "").split())
+        events.append(CalendarEvent(item.day, item.pair, f"{summary} ({item.group})",
+                                    _location(text), f"Группа {item.group}"))
+    return events
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _fold(line: str) -> str:
+    """Переносит строку по 75 байт, не разрывая символы UTF-8"""
+    if len(line.encode("utf-8")) <= MAX_LINE_OCTETS:
+        return line
+    parts, current, size = [], "", 0
+    for char in line:
+        width = len(char.encode("utf-8"))
+        if size + width > MAX_LINE_OCTETS:
+            parts.append(current)
+            current, size = " ", 1
+        current += char
+        size += width
+    parts.append(current)
+    return "\r\n".join(parts)
+
+
+def _utc(day: date, hhmm: str) -> str:
+    hour, minute = map(int, hhmm.split(":"))
+    return to_utc(datetime(day.year, day.month, day.day, hour, minute)).strftime("%Y%m%dT%H%M%SZ")
+
+
+def render_calendar(title: str, events: List[CalendarEvent], version: str) -> bytes:
+    """
+    Календарь в формате iCalendar (RFC 5545).
+
+    UID пары зависит только от её содержимого — приложение календаря при
+    обновлении заменяет изменившиеся пары, а не дублирует их.
+    """
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape(title)}",
+        "X-PUBLISHED-TTL:PT6H",
+        "REFRESH-INTERVAL;VALUE=DURATION:PT6H",
+        f"X-SCHEDULE-VERSION:{version}",
+    ]
+    for event in sorted(events):
+        start, end = PAIR_TIMES[event.pair]
+        uid = hashlib.sha1(f"{title}|{event.day}|{event.pair}|{event.summary}".encode("utf-8")).hexdigest()[:20]
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:{uid}@okei-schedule-bot",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART:{_utc(event.day, start)}",
+            f"DTEND:{_utc(event.day, end)}",
+            f"SUMMARY:{_escape(f'{event.pair} пара: {event.summary}')}",
+            f"DESCRIPTION:{_escape(event.description)}",
+        ]
+        if event.location:
+            lines.append(f"LOCATION:{_escape(event.location)}")
+        lines.append("END:VEVENT")
+    lines.append("END:VCALENDAR")
+    return ("\r\n".join(_fold(line) for line in lines) + "\r\n").encode("utf-8")
+
+
+def file_name(kind: str, owner: str) -> str:
+    safe = re.sub(r'[^\w.-]+', '_', owner).strip('_')
+    return f"{'raspisanie' if kind == GROUP else 'prepodavatel'}_{safe}.ics"
+
+
+def feed_url(kind: str, owner: str) -> Optional[str]:
+    """Публичный адрес для подписки в приложении календаря, если он известен"""
+    base = API_PUBLIC_URL or WEBHOOK_URL
+    if not base:
+        return None
+    return f"{base.rstrip('/')}/calendar/{kind}/{quote(owner)}.ics"
+
+
+class IcsFeeds:
+    """
+    Готовые .ics для групп и преподавателей, привязанные к версии расписания.
+
+    Календарь пересобирается только при изменении расписания группы или
+    пар преподавателя. Для каждой версии запоминается
+    file_id отправленного в Telegram документа: повторная отправка не
+    загружает файл заново, пока расписание не изменится.
+    """
+
+    def __init__(self) -> None:
+        self._feeds: Dict[Tuple[str, str], Tuple[str, bytes]] = {}
+        self._file_ids: Dict[Tuple[str, str], Tuple[str, str]] = {}
+
+    def version(self, kind: str, owner: str) -> Optional[str]:
+        if kind == GROUP:
+            return schedule_cache.group_version(owner)
+        entry = teacher_lessons().get(owner)
+        return entry[0] if entry is not None else None
+
+    def feed(self, kind: str, owner: str) -> Optional[Tuple[str, bytes]]:
+        """
+        Календарь для текущей версии расписания.
+
+        Returns:
+            Optional[Tuple[str, bytes]]: (версия, содержимое .ics) или None, если расписания нет
+        """
+        version = self.version(kind, owner)
+        if version is None:
+            return None
+        cached = self._feeds.get((kind, owner))
+        if cached is not None and cached[0] == version:
+            return cached
+        if kind == GROUP:
+            events = group_events(owner, schedule_cache.get(owner))
+            title = f"Расписание {owner}"
+        else:
+            events = teacher_events(owner, teacher_lessons()[owner][1])
+            title = f"Расписание: {owner}"
+        ICS_BUILDS.inc(kind=kind)
+        cached = self._feeds[(kind, owner)] = (version, render_calendar(title, events, version))
+        return cached
+
+    def file_id(self, kind: str, owner: str, version: str) -> Optional[str]:
+        cached = self._file_ids.get((kind, owner))
+        return cached[1] if cached is not None and cached[0] == version else None
+
+    def remember_file_id(self, kind: str, owner: str, version: str, file_id: str) -> None:
+        self._file_ids[(kind, owner)] = (version, file_id)
+
+    def forget_file_id(self, kind: str, owner: str) -> None:
+        self._file_ids.pop((kind, owner), None)
+
+
+ics_feeds = IcsFeeds()
+
+
+async def send_calendar(chat_id: int, kind: str, owner: str) -> bool:
+    """
+    Отправляет .ics документом: по сохранённому file_id, а если расписание
+    изменилось или файла ещё не было — загружает новый и запоминает его file_id.
+
+    Returns:
+        bool: False, если расписания для календаря нет
+    """
+    feed = ics_feeds.feed(kind, owner)
+    if feed is None:
+        return False
+    version, body = feed
+    caption = "📅 Откройте файл, чтобы добавить пары недели в календарь"
+    url = feed_url(kind, owner)
+    if url:
+        caption += f"\nПодписка с автообновлением: {url}"
+
+    file_id = ics_feeds.file_id(kind, owner, version)
+    if file_id is not None:
+        try:
+            await bot.send_document(chat_id, file_id, caption=caption)
+            ICS_SENT.inc(kind=kind, source="file_id")
+            return True
+        except ApiTelegramException as e:
+            if e.error_code != 400:
+                raise
+            # Telegram больше не знает этот file_id — загрузим файл заново
+            ics_feeds.forget_file_id(kind, owner)
+
+    document = InputFile(io.BytesIO(body), file_name=file_name(kind, owner))
+    message = await bot.send_document(chat_id, document, caption=caption)
+    ics_feeds.remember_file_id(kind, owner, version, message.document.file_id)
+    ICS_SENT.inc(kind=kind, source="upload")
+    return True
+
+
+async def handle_calendar(request: web.Request) -> web.Response:
+    """GET /calendar/{kind}/{owner}.ics — подписка из приложения календаря, с ETag по версии"""
+    kind, owner = request.match_info["kind"], request.match_info["owner"]
+    if kind not in (GROUP, TEACHER):
+        raise web.HTTPNotFound()
+    if kind == GROUP:
+        # Как и в API, группа находится и по названию в нижнем регистре
+        owner = schedule_cache.find_group(owner)
+        if owner is None:
+            raise web.HTTPNotFound()
+    feed = ics_feeds.feed(kind, owner)
+    if feed is None:
+        raise web.HTTPNotFound()
+    version, body = feed
+    etag = f'"{version}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=3600"}
+    if etag in request.headers.get("If-None-Match", ""):
+        return web.Response(status=304, headers=headers)
+    return web.Response(body=body, content_type="text/calendar", charset="utf-8", headers=headers)
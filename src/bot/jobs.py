@@ -0,0 +1,172 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from src.config.settings import JOBS_CONCURRENCY, JOBS_HISTORY
+from src.utils.events import events
+from src.utils.logger import log
+from src.utils.metrics import registry
+
+PROGRESS_INTERVAL = 2.0  # не чаще раза в 2 с зовём наблюдателей: правка сообщения — запрос к Telegram
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINISHED = {DONE, FAILED, CANCELLED}
+
+JOBS_TOTAL = registry.counter("jobs_total", "Завершённые фоновые задачи", ["kind", "state"])
+JOBS_SECONDS = registry.histogram("job_seconds", "Длительность фоновых задач", ["kind"],
+                                  buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800))
+
+
+class Job:
+    """Одна фоновая задача: состояние, прогресс и кто за ней следит"""
+
+    def __init__(self, job_id: int, kind: str, title: str) -> None:
+        self.id = job_id
+        self.kind = kind
+        self.title = title
+        self.state = QUEUED
+        self.done = 0
+        self.total = 0
+        self.note = ""
+        self.result: Optional[str] = None
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self._watchers: List[Callable[["Job"], Awaitable[None]]] = []
+        self._changed = asyncio.Event()
+
+    @property
+    def active(self) -> bool:
+        return self.state not in FINISHED
+
+    @property
+    def duration(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def report(self, done: int, total: int, note: str = "") -> None:
+        """Прогресс из кода задачи; наблюдатели узнают о нём не чаще PROGRESS_INTERVAL"""
+        self.done, self.total, self.note = done, total, note
+        self._changed.set()
+
+    def watch(self, callback: Callable[["Job"], Awaitable[None]]) -> None:
+        """callback(job) вызывается при смене прогресса и один раз после завершения"""
+        if not self.active:
+            # Задача успела закончиться, пока наблюдатель готовился
+            asyncio.create_task(callback(self))
+            return
+        self._watchers.append(callback)
+        self._changed.set()
+
+    async def _notify(self) -> None:
+        self._changed.clear()
+        events.publish("job", id=self.id, kind=self.kind, state=self.state, done=self.done, total=self.total)
+        for callback in list(self._watchers):
+            try:
+                await callback(self)
+            except Exception as e:
+                log.warning(f"⚠️ Наблюдатель задачи #{self.id} упал: {e}")
+
+
+class JobRunner:
+    """
+    Фоновые задачи админки: обновление расписаний, очистка, резервная копия.
+
+    Одинаковые задачи не дублируются — повторный запуск того же вида
+    возвращает уже идущую. Одновременно выполняется не больше concurrency
+    задач, остальные ждут в очереди; любую можно отменить.
+    """
+
+    def __init__(self, concurrency: int = JOBS_CONCURRENCY, history: int = JOBS_HISTORY) -> None:
+        self._slots = asyncio.Semaphore(concurrency)
+        self._ids = itertools.count(1)
+        self._active: Dict[str, Job] = {}
+        self._by_id: Dict[int, Job] = {}
+        self.history: Deque[Job] = deque(maxlen=history)
+
+    def submit(self, kind: str, title: str, work: Callable[[Job], Awaitable[str]]) -> Tuple[Job, bool]:
+        """
+        Запускает задачу, если такая же ещё не идёт.
+
+        Args:
+            kind (str): Вид задачи — по нему ищутся дубликаты
+            title (str): Название для сообщений
+            work: Корутина work(job) -> текст результата (HTML); прогресс — job.report()
+
+        Returns:
+            Tuple[Job, bool]: (Job, True) для новой задачи или (Job, False) для уже идущей
+        """
+        existing = self._active.get(kind)
+        if existing is not None:
+            return existing, False
+        job = Job(next(self._ids), kind, title)
+        self._active[kind] = job
+        self._by_id[job.id] = job
+        job.task = asyncio.create_task(self._run(job, work))
+        return job, True
+
+    def get(self, job_id: int) -> Optional[Job]:
+        return self._by_id.get(job_id)
+
+    def find_active(self, kind: str) -> Optional[Job]:
+        return self._active.get(kind)
+
+    def active(self) -> List[Job]:
+        return sorted(self._active.values(), key=lambda job: job.id)
+
+    def cancel(self, job_id: int) -> bool:
+        job = self._by_id.get(job_id)
+        if job is None or not job.active or job.task is None:
+            return False
+        job.task.cancel()
+        return True
+
+    async def _run(self, job: Job, work: Callable[[Job], Awaitable[str]]) -> None:
+        notifier = asyncio.create_task(self._notify_periodically(job))
+        try:
+            async with self._slots:
+                job.state = RUNNING
+                job.started = time.time()
+                job._changed.set()
+                log.info(f"🛠 Задача #{job.id} «{job.title}» запущена")
+                job.result = await work(job)
+                job.state = DONE
+        except asyncio.CancelledError:
+            job.state = CANCELLED
+        except Exception as e:
+            job.state = FAILED
+            job.error = str(e) or type(e).__name__
+            log.exception(f"💥 Задача #{job.id} «{job.title}» упала")
+        finally:
+            job.finished = time.time()
+            if job.started is None:
+                job.started = job.finished
+            del self._active[job.kind]
+            self._remember(job)
+            JOBS_TOTAL.inc(kind=job.kind, state=job.state)
+            JOBS_SECONDS.observe(job.duration, kind=job.kind)
+            log.info(f"🛠 Задача #{job.id} «{job.title}»: {job.state} за {job.duration:.1f} с")
+            notifier.cancel()
+            await job._notify()
+
+    def _remember(self, job: Job) -> None:
+        if len(self.history) == self.history.maxlen:
+            self._by_id.pop(self.history[-1].id, None)
+        self.history.appendleft(job)
+
+    @staticmethod
+    async def _notify_periodically(job: Job) -> None:
+        while True:
+            await job._changed.wait()
+            await job._notify()
+            await asyncio.sleep(PROGRESS_INTERVAL)
+
+
+jobs = JobRunner()
+
+registry.gauge("jobs_active", "Фоновые задачи в очереди и в работе", function=lambda: len(jobs.active()))
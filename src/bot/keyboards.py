@@ -1,8 +1,18 @@
-from telebot.types import ReplyKeyboardMarkup, KeyboardButton
-from .constants import GROUPS_BY_COURSE
+from telebot.types import ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardMarkup, InlineKeyboardButton
+from .constants import GROUPS_BY_COURSE, ALL_GROUPS, PAIR_TIMES
 
+# Все клавиатуры строятся один раз при импорте и хранятся уже в JSON:
+# telebot передаёт строку в reply_markup как есть, без повторной сериализации.
 
-def create_courses_keyboard():
+COURSES = list(GROUPS_BY_COURSE.keys())
+INLINE_DAYS = [
+    [("Пн", "monday"), ("Вт", "tuesday"), ("Ср", "wednesday")],
+    [("Чт", "thursday"), ("Пт", "friday"), ("Сб", "saturday")],
+    [("Вся неделя", "week")],
+]
+
+
+def _build_courses_keyboard():
     markup = ReplyKeyboardMarkup(row_width=2, resize_keyboard=True)
     for course in GROUPS_BY_COURSE.keys():
         markup.add(KeyboardButton(course))
@@ -11,7 +21,7 @@ def create_courses_keyboard():
     return markup
 
 
-def create_groups_keyboard(course: str):
+def _build_groups_keyboard(course: str):
     markup = ReplyKeyboardMarkup(row_width=2, resize_keyboard=True)
     groups = GROUPS_BY_COURSE.get(course, [])
     for i in range(0, len(groups), 2):
@@ -27,27 +37,153 @@ def create_groups_keyboard(course: str):
     return markup
 
 
-def create_schedule_keyboard():
+def _build_schedule_keyboard():
     markup = ReplyKeyboardMarkup(row_width=3, resize_keyboard=True)
     markup.add("Понедельник", "Вторник", "Среда")
     markup.add("Четверг", "Пятница", "Суббота")
     markup.add("Вся неделя", "Сменить группу")
-    markup.row(KeyboardButton("🏠 Главное меню"))  
+    markup.row(KeyboardButton("🏠 Главное меню"))
     return markup
 
 
-def create_main_menu_keyboard():
+def _build_main_menu_keyboard():
     markup = ReplyKeyboardMarkup(row_width=2, resize_keyboard=True)
     markup.add(
         KeyboardButton("📅 Расписание"),
         KeyboardButton("🔍 Поиск по преподавателю")
     )
     markup.add(KeyboardButton("👨‍🏫 Все преподаватели на неделю"))
-    markup.add(KeyboardButton("ℹ️ Информация о проекте"))  
+    markup.add(KeyboardButton("🚪 Свободные кабинеты"), KeyboardButton("🔔 Рассылка на завтра"))
+    markup.add(KeyboardButton("ℹ️ Информация о проекте"))
     return markup
 
 
-def create_back_to_main_keyboard():
+def _build_back_to_main_keyboard():
     markup = ReplyKeyboardMarkup(row_width=1, resize_keyboard=True)
     markup.add(KeyboardButton("🔙 В главное меню"))
-    return markup
\ No newline at end of file
+    return markup
+
+
+# === Inline-клавиатуры для навигации с редактированием сообщения ===
+# callback_data: "c:<номер курса>", "g:<группа>", "d:<группа>:<день>", "m:courses", "i:g:<группа>" (календарь)
+
+def _build_courses_inline():
+    markup = InlineKeyboardMarkup(row_width=2)
+    markup.add(*(InlineKeyboardButton(course, callback_data=f"c:{i}") for i, course in enumerate(COURSES)))
+    return markup
+
+
+def _build_groups_inline(course: str):
+    markup = InlineKeyboardMarkup(row_width=3)
+    markup.add(*(InlineKeyboardButton(group, callback_data=f"g:{group}") for group in GROUPS_BY_COURSE[course]))
+    markup.row(InlineKeyboardButton("◀ К курсам", callback_data="m:courses"))
+    return markup
+
+
+def _build_days_inline(group: str):
+    markup = InlineKeyboardMarkup()
+    for row in INLINE_DAYS:
+        markup.row(*(InlineKeyboardButton(title, callback_data=f"d:{group}:{day_key}") for title, day_key in row))
+    markup.row(InlineKeyboardButton("📅 В календарь (.ics)", callback_data=f"i:g:{group}"))
+    markup.row(InlineKeyboardButton("🔄 Сменить группу", callback_data="m:courses"))
+    return markup
+
+
+def _build_rooms_inline(day_key: str, pair: int):
+    # callback_data: "r:<день>:<пара>"; выбранные день и пара отмечены точкой
+    markup = InlineKeyboardMarkup()
+    markup.row(*(
+        InlineKeyboardButton(f"• {p}" if p == pair else str(p), callback_data=f"r:{day_key}:{p}")
+        for p in PAIR_TIMES
+    ))
+    for row in INLINE_DAYS[:2]:
+        markup.row(*(
+            InlineKeyboardButton(f"• {title}" if key == day_key else title, callback_data=f"r:{key}:{pair}")
+            for title, key in row
+        ))
+    return markup
+
+
+COURSES_KEYBOARD = _build_courses_keyboard().to_json()
+GROUPS_KEYBOARDS = {course: _build_groups_keyboard(course).to_json() for course in COURSES}
+EMPTY_GROUPS_KEYBOARD = _build_groups_keyboard("").to_json()
+SCHEDULE_KEYBOARD = _build_schedule_keyboard().to_json()
+MAIN_MENU_KEYBOARD = _build_main_menu_keyboard().to_json()
+BACK_TO_MAIN_KEYBOARD = _build_back_to_main_keyboard().to_json()
+
+COURSES_INLINE = _build_courses_inline().to_json()
+GROUPS_INLINE = {course: _build_groups_inline(course).to_json() for course in COURSES}
+DAYS_INLINE = {group: _build_days_inline(group).to_json() for group in ALL_GROUPS}
+ROOMS_INLINE = {
+    (day_key, pair): _build_rooms_inline(day_key, pair).to_json()
+    for row in INLINE_DAYS[:2] for _, day_key in row for pair in PAIR_TIMES
+}
+
+
+def create_courses_keyboard():
+    return COURSES_KEYBOARD
+
+
+def create_groups_keyboard(course: str):
+    return GROUPS_KEYBOARDS.get(course, EMPTY_GROUPS_KEYBOARD)
+
+
+def create_schedule_keyboard():
+    return SCHEDULE_KEYBOARD
+
+
+def create_main_menu_keyboard():
+    return MAIN_MENU_KEYBOARD
+
+
+def create_back_to_main_keyboard():
+    return BACK_TO_MAIN_KEYBOARD
+
+
+def create_courses_inline_keyboard():
+    return COURSES_INLINE
+
+
+def create_groups_inline_keyboard(course: str):
+    return GROUPS_INLINE[course]
+
+
+def create_days_inline_keyboard(group: str):
+    # Группа могла быть добавлена вручную через админку — тогда строим на лету.
+    # Такие клавиатуры не кэшируем: название группы приходит и из callback_data,
+    # и кэш рос бы на каждой подделанной кнопке
+    markup = DAYS_INLINE.get(group)
+    if markup is None:
+        markup = _build_days_inline(group).to_json()
+    return markup
+
+
+def create_rooms_inline_keyboard(day_key: str, pair: int):
+    return ROOMS_INLINE[(day_key, pair)]
+
+
+def create_teacher_suggestions_keyboard(teachers):
+    # callback_data: "t:<ФИО>"; не больше 64 байт по правилам Telegram
+    markup = InlineKeyboardMarkup(row_width=1)
+    markup.add(*(
+        InlineKeyboardButton(teacher, callback_data=f"t:{teacher}")
+        for teacher in teachers if len(f"t:{teacher}".encode("utf-8")) <= 64
+    ))
+    return markup.to_json()
+
+
+def create_job_cancel_keyboard(job_id: int):
+    # callback_data: "j:<номер задачи>"
+    markup = InlineKeyboardMarkup()
+    markup.add(InlineKeyboardButton("⏹ Отменить", callback_data=f"j:{job_id}"))
+    return markup.to_json()
+
+
+def create_calendar_keyboard(kind_code: str, owner: str):
+    # callback_data: "i:g:<группа>" или "i:t:<ФИО>"; слишком длинное ФИО — без кнопки
+    data = f"i:{kind_code}:{owner}"
+    if len(data.encode("utf-8")) > 64:
+        return None
+    markup = InlineKeyboardMarkup()
+    markup.add(InlineKeyboardButton("📅 В календарь (.ics)", callback_data=data))
+    return markup.to_json()
@@ -0,0 +1,96 @@
+import asyncio
+import functools
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from aiohttp import web
+from telebot.async_telebot import AsyncTeleBot
+
+from src.bot.events import handle_events
+from src.utils.events import events
+from src.utils.logger import log
+from src.utils.metrics import registry
+from src.utils.tracing import run_traced, span
+
+HANDLER_SECONDS = registry.histogram("bot_handler_seconds", "Длительность обработки по хендлерам", ["handler"])
+HANDLER_ERRORS = registry.counter("bot_handler_errors_total", "Исключения в хендлерах", ["handler"])
+UPDATES_TOTAL = registry.counter("bot_updates_total", "Полученные обновления по типам", ["type"])
+
+# Поля Update в порядке проверки: первое заполненное — тип обновления
+UPDATE_TYPES = ("message", "edited_message", "callback_query", "inline_query", "chosen_inline_result",
+                "my_chat_member", "chat_member", "channel_post", "pre_checkout_query", "shipping_query")
+
+
+@contextmanager
+def handler_timer(name: str) -> Iterator[None]:
+    """with handler_timer("send_schedule"): ... — время хендлера, его исключения и отрезок в трассе"""
+    started = time.perf_counter()
+    try:
+        with span(f"handler.{name}"):
+            yield
+    except Exception as e:
+        HANDLER_ERRORS.inc(handler=name)
+        events.publish("error", handler=name, error=f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        HANDLER_SECONDS.observe(time.perf_counter() - started, handler=name)
+
+
+def timed_handler(handler):
+    """Декоратор для хендлеров, которые telebot вызывает напрямую (команды, inline)"""
+    # wraps нужен и telebot: по сигнатуре хендлера он решает, какие аргументы передать
+    @functools.wraps(handler)
+    async def wrapper(*args, **kwargs):
+        with handler_timer(handler.__name__):
+            return await handler(*args, **kwargs)
+    return wrapper
+
+
+def update_type(update) -> str:
+    return next((name for name in UPDATE_TYPES if getattr(update, name, None) is not None), "other")
+
+
+def instrument_updates(target: AsyncTeleBot) -> None:
+    """
+    Оборачивает process_new_updates (polling, webhook и шарды): считает обновления
+    по типам и обрабатывает каждое в своей трассе, чтобы медленные попадали в лог.
+    """
+    original = target.process_new_updates
+
+    async def process_one(update) -> None:
+        kind = update_type(update)
+        UPDATES_TOTAL.inc(type=kind)
+        await run_traced(f"{kind}:{update.update_id}", original([update]))
+
+    async def process_new_updates(updates):
+        if len(updates) == 1:
+            await process_one(updates[0])
+        else:
+            # Пачка из polling: у каждого обновления своя трасса, обрабатываются параллельно, как в telebot
+            await asyncio.gather(*(process_one(update) for update in updates))
+
+    target.process_new_updates = process_new_updates
+
+
+async def handle_metrics(request: web.Request) -> web.Response:
+    return web.Response(text=registry.render(), content_type="text/plain", charset="utf-8",
+                        headers={"X-Content-Type-Options": "nosniff"})
+
+
+async def start_metrics_server(host: str, port: int) -> web.AppRunner:
+    """
+    Поднимает отдельный HTTP-сервер с GET /metrics в формате Prometheus
+    и WebSocket GET /events с потоком событий для админ-панели.
+
+    Returns:
+        web.AppRunner: Остановить сервер — await runner.cleanup()
+    """
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    app.router.add_get("/events", handle_events)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    log.info(f"📈 Метрики: http://{host}:{port}/metrics, события: ws://{host}:{port}/events")
+    return runner
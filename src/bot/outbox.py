@@ -0,0 +1,324 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from telebot.async_telebot import AsyncTeleBot
+from telebot.asyncio_helper import ApiTelegramException
+
+from src.config.settings import OUTBOX_GLOBAL_RATE
+from src.utils.logger import log
+from src.utils.metrics import registry
+from src.utils.tracing import current_trace, span
+
+# Приоритеты: меньше — раньше
+INTERACTIVE = 0
+BROADCAST = 1
+LANE_NAMES = {INTERACTIVE: "interactive", BROADCAST: "broadcast"}
+
+CHAT_RATE = 1.0       # сообщений в секунду в один чат
+CHAT_BURST = 3        # сколько сообщений подряд можно отправить в чат без паузы
+WORKERS = 8           # одновременных запросов к API
+MAX_RETRIES = 5
+LATENCY_SAMPLES = 2000
+
+API_SECONDS = registry.histogram("telegram_api_seconds", "Длительность запроса к Telegram API", ["method", "lane"])
+DELIVERY_SECONDS = registry.histogram("outbox_delivery_seconds", "От постановки в очередь до ответа API", ["lane"])
+
+
+class TokenBucket:
+    """Классическое ведро токенов: rate токенов в секунду, не больше capacity"""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Сколько секунд ждать до следующего токена (0 — можно сейчас)"""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def consume(self) -> None:
+        self.tokens -= 1
+
+    def give_back(self) -> None:
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+class _Job:
+    __slots__ = ("func", "chat_id", "args", "kwargs", "future", "enqueued_at", "attempts", "trace")
+
+    def __init__(self, func, chat_id, args, kwargs, future) -> None:
+        self.func = func
+        self.chat_id = chat_id
+        self.args = args
+        self.kwargs = kwargs
+        self.future = future
+        self.enqueued_at = time.perf_counter()
+        self.attempts = 0
+        # Воркеры очереди живут вне обработки обновления — трассу запоминаем при постановке
+        self.trace = current_trace()
+
+
+class Outbox:
+    """
+    Очередь исходящих запросов к Telegram API.
+
+    Соблюдает общий лимит бота и темп отправки в каждый чат, пропускает
+    интерактивные ответы раньше рассылок и сама повторяет запросы после
+    429 с учётом retry_after.
+    """
+
+    def __init__(self) -> None:
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._seq = itertools.count()
+        self._global = TokenBucket(OUTBOX_GLOBAL_RATE, OUTBOX_GLOBAL_RATE)
+        self._chats: Dict[int, TokenBucket] = {}
+        self._busy: Dict[int, _Job] = {}      # чат -> задача, которая сейчас в него отправляет
+        self._parked: Dict[int, deque] = {}   # чат -> задачи, ждущие своей очереди
+        self._paused_until = 0.0
+        self._workers: list[asyncio.Task] = []
+        self._originals: Dict[str, Callable[..., Awaitable[Any]]] = {}
+        self._depth = {INTERACTIVE: 0, BROADCAST: 0}
+        self._latencies: deque = deque(maxlen=LATENCY_SAMPLES)
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self, bot: AsyncTeleBot, global_rate: Optional[float] = None) -> None:
+        """
+        Запускает воркеры и направляет отправку и редактирование сообщений через очередь.
+
+        Args:
+            bot (AsyncTeleBot): Бот, методы которого оборачиваются
+            global_rate (float, optional): Свой общий лимит (например, доля лимита на шард)
+        """
+        if self.running:
+            return
+        if global_rate is not None:
+            self._global = TokenBucket(global_rate, max(global_rate, 1))
+        self._queue = asyncio.PriorityQueue()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(WORKERS)]
+
+        for name in ("send_message", "send_document"):
+            original = self._originals[name] = getattr(bot, name)
+
+            async def queued(chat_id, *args, _original=original, **kwargs):
+                return await self.submit(_original, chat_id, *args, **kwargs)
+
+            setattr(bot, name, queued)
+
+        # У edit_message_text чат передаётся не первым аргументом
+        original_edit = bot.edit_message_text
+
+        async def edit(chat_id, text, message_id, **kwargs):
+            return await original_edit(text, chat_id=chat_id, message_id=message_id, **kwargs)
+
+        async def queued_edit(text, chat_id=None, message_id=None, **kwargs):
+            return await self.submit(edit, chat_id, text, message_id, **kwargs)
+
+        bot.edit_message_text = queued_edit
+        log.info(f"📤 Очередь отправки запущена: {WORKERS} воркеров, {self._global.rate:g} сообщений/с")
+
+    async def stop(self, timeout: float = 10) -> None:
+        """Дожидается отправки оставшихся сообщений и останавливает воркеры"""
+        if not self.running:
+            return
+        deadline = time.monotonic() + timeout
+        while sum(self._depth.values()) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        if sum(self._depth.values()):
+            log.warning(f"⚠️ В очереди отправки осталось {sum(self._depth.values())} сообщений")
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def original(self, bot: AsyncTeleBot, name: str) -> Callable[..., Awaitable[Any]]:
+        """Метод бота без обёртки очереди — для submit с приоритетом BROADCAST"""
+        return self._originals.get(name) or getattr(bot, name)
+
+    def submit(self, func: Callable[..., Awaitable[Any]], chat_id: int, *args,
+               priority: int = INTERACTIVE, **kwargs) -> asyncio.Future:
+        """
+        Ставит вызов API в очередь.
+
+        Args:
+            func: Метод бота, который нужно вызвать (например, исходный send_message)
+            chat_id (int): Чат получателя — по нему идёт темп отправки
+            priority (int): INTERACTIVE или BROADCAST
+
+        Returns:
+            asyncio.Future: Завершится результатом вызова API
+        """
+        future = asyncio.get_running_loop().create_future()
+        if not self.running:
+            # Очередь не запущена (например, в скриптах) — вызываем напрямую
+            task = asyncio.ensure_future(func(chat_id, *args, **kwargs))
+            task.add_done_callback(lambda t: _copy_result(t, future))
+            return future
+
+        self._enqueue(priority, next(self._seq), _Job(func, chat_id, args, kwargs, future))
+        return future
+
+    def _enqueue(self, priority: int, seq: int, job: _Job) -> None:
+        self._depth[priority] += 1
+        self._queue.put_nowait((priority, seq, job))
+
+    def _requeue_later(self, delay: float, priority: int, seq: int, job: _Job) -> None:
+        self._depth[priority] += 1
+        asyncio.get_running_loop().call_later(delay, self._queue.put_nowait, (priority, seq, job))
+
+    def _chat_bucket(self, chat_id: int, now: float) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) > 10_000:
+                # Полные вёдра ничего не помнят — их можно выбросить
+                self._chats = {cid: b for cid, b in self._chats.items() if not b.is_full(now)}
+            bucket = self._chats[chat_id] = TokenBucket(CHAT_RATE, CHAT_BURST)
+        return bucket
+
+    async def _acquire_global(self) -> None:
+        while True:
+            now = time.monotonic()
+            wait = max(self._paused_until - now, self._global.delay(now))
+            if wait <= 0:
+                self._global.consume()
+                return
+            await asyncio.sleep(wait)
+
+    async def _worker(self) -> None:
+        while True:
+            # Сначала токен, потом задача: так берём самую приоритетную на момент отправки
+            await self._acquire_global()
+            priority, seq, job = await self._queue.get()
+            self._depth[priority] -= 1
+            await self._run(priority, seq, job)
+
+    def _park(self, priority: int, seq: int, job: _Job) -> None:
+        self._depth[priority] += 1
+        self._parked.setdefault(job.chat_id, deque()).append((priority, seq, job))
+
+    def _release(self, chat_id: int) -> None:
+        """Освобождает чат и возвращает в очередь следующую задачу для него"""
+        self._busy.pop(chat_id, None)
+        parked = self._parked.get(chat_id)
+        if parked:
+            self._queue.put_nowait(parked.popleft())
+            if not parked:
+                del self._parked[chat_id]
+
+    async def _run(self, priority: int, seq: int, job: _Job) -> None:
+        # В один чат — не больше одного запроса одновременно, иначе порядок не гарантирован
+        owner = self._busy.get(job.chat_id)
+        if owner is not None and owner is not job:
+            self._global.give_back()
+            self._park(priority, seq, job)
+            return
+
+        if job.future.cancelled():
+            self._global.give_back()
+            self._release(job.chat_id)
+            return
+
+        self._busy[job.chat_id] = job
+        now = time.monotonic()
+        chat_bucket = self._chat_bucket(job.chat_id, now)
+        chat_wait = chat_bucket.delay(now)
+        if chat_wait > 0:
+            self._global.give_back()
+            self._requeue_later(chat_wait, priority, seq, job)
+            return
+        chat_bucket.consume()
+
+        started = time.perf_counter()
+        method = getattr(job.func, "__name__", "call")
+        if job.trace is not None:
+            job.trace.add(f"outbox.wait.{method}", job.enqueued_at, started)
+        try:
+            with span(f"telegram.{method}", job.trace):
+                result = await job.func(job.chat_id, *job.args, **job.kwargs)
+        except ApiTelegramException as e:
+            if e.error_code == 429 and job.attempts < MAX_RETRIES:
+                retry_after = (e.result_json or {}).get("parameters", {}).get("retry_after", 1)
+                job.attempts += 1
+                self.retries += 1
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+                log.warning(f"⏳ 429 от Telegram: пауза {retry_after} с (чат {job.chat_id}, попытка {job.attempts})")
+                self._requeue_later(retry_after, priority, seq, job)
+                return
+            self._release(job.chat_id)
+            self._fail(job, e)
+            return
+        except Exception as e:
+            self._release(job.chat_id)
+            self._fail(job, e)
+            return
+        finally:
+            API_SECONDS.observe(time.perf_counter() - started, method=method, lane=LANE_NAMES[priority])
+
+        self._release(job.chat_id)
+        self.sent += 1
+        self._latencies.append(time.perf_counter() - job.enqueued_at)
+        DELIVERY_SECONDS.observe(self._latencies[-1], lane=LANE_NAMES[priority])
+        if not job.future.done():
+            job.future.set_result(result)
+
+    def _fail(self, job: _Job, error: Exception) -> None:
+        self.failed += 1
+        if not job.future.done():
+            job.future.set_exception(error)
+
+    def stats(self) -> Dict[str, Any]:
+        """Глубина очередей, счётчики и перцентили задержки отправки (мс)"""
+        ordered = sorted(self._latencies)
+
+        def pct(q: float) -> float:
+            if not ordered:
+                return 0.0
+            return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))] * 1000
+
+        return {
+            'queue_depth': {LANE_NAMES[p]: depth for p, depth in self._depth.items()},
+            'sent': self.sent,
+            'failed': self.failed,
+            'retries_429': self.retries,
+            'latency_ms': {'p50': pct(50), 'p95': pct(95), 'p99': pct(99)},
+        }
+
+
+def _copy_result(task: asyncio.Future, future: asyncio.Future) -> None:
+    if future.done():
+        return
+    if task.cancelled():
+        future.cancel()
+    elif task.exception() is not None:
+        future.set_exception(task.exception())
+    else:
+        future.set_result(task.result())
+
+
+outbox = Outbox()
+
+registry.gauge("outbox_queue_depth", "Задачи в очереди отправки", ["lane"],
+               lambda: {(LANE_NAMES[p],): depth for p, depth in outbox._depth.items()})
+registry.gauge("outbox_sent_total", "Отправлено запросов через очередь", function=lambda: outbox.sent, kind="counter")
+registry.gauge("outbox_failed_total", "Запросов, завершившихся ошибкой", function=lambda: outbox.failed, kind="counter")
+registry.gauge("outbox_retries_total", "Повторов после 429", function=lambda: outbox.retries, kind="counter")
@@ -0,0 +1,145 @@
+import hashlib
+import json
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from telebot.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+from src.bot.core import bot
+
+MESSAGE_LIMIT = 4096   # лимит Telegram на текст сообщения
+PAGE_LIMIT = 3500      # с запасом: эмодзи считаются Telegram за два символа
+MAX_PAGED_TEXTS = 2048
+SEPARATORS = ("\n\n", "\n")  # сначала режем между днями/находками, потом между парами
+
+
+def _pieces(text: str, limit: int, separators: Tuple[str, ...] = SEPARATORS) -> List[str]:
+    """Куски не длиннее limit, разрезанные по самой крупной возможной границе"""
+    if len(text) <= limit:
+        return [text]
+    if not separators:
+        return [text[i:i + limit] for i in range(0, len(text), limit)]
+    separator, rest = separators[0], separators[1:]
+    parts = text.split(separator)
+    pieces = []
+    for i, part in enumerate(parts):
+        if i < len(parts) - 1:
+            part += separator
+        pieces.extend(_pieces(part, limit, rest))
+    return pieces
+
+
+def split_pages(text: str, limit: int = PAGE_LIMIT) -> List[str]:
+    """
+    Разбивает готовый текст ответа на страницы по границам дней и пар.
+
+    Args:
+        text (str): Текст ответа (HTML-теги не должны переходить через строку)
+        limit (int): Максимальная длина страницы
+
+    Returns:
+        List[str]: Страницы, минимум одна
+    """
+    pages, current = [], ""
+    for piece in _pieces(text, limit):
+        if current and len(current) + len(piece) > limit:
+            pages.append(current.rstrip())
+            current = ""
+        current += piece
+    if current.strip() or not pages:
+        pages.append(current.rstrip())
+    return pages
+
+
+class Paginator:
+    """
+    Кэш разбитых на страницы ответов и кнопки «◀ ▶» для листания.
+
+    Ключ — хеш текста и прикреплённой inline-клавиатуры, поэтому одинаковые
+    ответы (например, неделя одной группы) разбиваются один раз на всех.
+    """
+
+    def __init__(self, limit: int = PAGE_LIMIT, max_entries: int = MAX_PAGED_TEXTS) -> None:
+        self.limit = limit
+        self.max_entries = max_entries
+        # key -> (страницы, готовые клавиатуры к каждой странице)
+        self._entries: "OrderedDict[str, Tuple[List[str], List[str]]]" = OrderedDict()
+
+    def paginate(self, text: str, extra_markup: Optional[str] = None) -> Tuple[str, List[str]]:
+        """
+        Разбивает текст на страницы (или берёт из кэша).
+
+        Args:
+            text (str): Текст ответа
+            extra_markup (str, optional): Inline-клавиатура в JSON, добавляется под кнопками листания
+
+        Returns:
+            Tuple[str, List[str]]: Ключ для callback_data и страницы
+        """
+        key = hashlib.sha1(f"{text}\0{extra_markup or ''}".encode("utf-8")).hexdigest()[:12]
+        entry = self._entries.get(key)
+        if entry is None:
+            pages = split_pages(text, self.limit)
+            extra_rows = json.loads(extra_markup)["inline_keyboard"] if extra_markup else []
+            markups = [self._build_markup(key, index, len(pages), extra_rows) for index in range(len(pages))]
+            entry = self._entries[key] = (pages, markups)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+        return key, entry[0]
+
+    def page(self, key: str, index: int) -> Optional[Tuple[str, str]]:
+        """
+        Текст страницы и клавиатура к ней; None, если ответ уже вытеснен из кэша.
+        Номер вне диапазона прижимается к ближайшей существующей странице.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        pages, markups = entry
+        index = max(0, min(index, len(pages) - 1))
+        return pages[index], markups[index]
+
+    @staticmethod
+    def _build_markup(key: str, index: int, total: int, extra_rows: list) -> str:
+        markup = InlineKeyboardMarkup()
+        markup.row(
+            InlineKeyboardButton("◀", callback_data=f"p:{key}:{max(index - 1, 0)}"),
+            InlineKeyboardButton(f"{index + 1}/{total}", callback_data=f"p:{key}:{index}"),
+            InlineKeyboardButton("▶", callback_data=f"p:{key}:{min(index + 1, total - 1)}"),
+        )
+        data = markup.to_dict()
+        data["inline_keyboard"].extend(extra_rows)
+        return json.dumps(data, ensure_ascii=False)
+
+
+paginator = Paginator()
+
+
+def _is_inline(reply_markup: Optional[str]) -> bool:
+    return bool(reply_markup) and "inline_keyboard" in reply_markup
+
+
+async def send_paged(chat_id: int, text: str, parse_mode: Optional[str] = None,
+                     reply_markup: Optional[str] = None):
+    """
+    Отправляет ответ целиком или только первую страницу с кнопками листания.
+
+    Inline-клавиатура из reply_markup добавляется под кнопками листания;
+    обычную клавиатуру к странице прикрепить нельзя — её нужно показать
+    отдельным сообщением раньше.
+    """
+    if len(text) <= paginator.limit:
+        return await bot.send_message(chat_id, text, parse_mode=parse_mode, reply_markup=reply_markup)
+    key, _ = paginator.paginate(text, reply_markup if _is_inline(reply_markup) else None)
+    page, markup = paginator.page(key, 0)
+    return await bot.send_message(chat_id, page, parse_mode=parse_mode, reply_markup=markup)
+
+
+def first_page(text: str, extra_markup: Optional[str] = None) -> Tuple[str, Optional[str]]:
+    """Текст и клавиатура для редактирования сообщения: первая страница, если текст длинный"""
+    if len(text) <= paginator.limit:
+        return text, extra_markup
+    key, _ = paginator.paginate(text, extra_markup)
+    return paginator.page(key, 0)
@@ -1,36 +1,68 @@
 from datetime import datetime
+from typing import Callable, Optional
 import asyncio
 
-from src.config.settings import BASE_URL
 from src.database.db import db
-from src.parser.parser import get_info
-from src.bot.constants import GROUPS_BY_COURSE
+from src.bot.fetcher import schedule_fetcher
+from src.bot.constants import ALL_GROUPS
+from src.bot.schedule_cache import schedule_cache
+from src.bot.teachers import teacher_index
+from src.bot.rooms import room_index
+from src.bot.status import status
 from src.utils.logger import log
 
 
-async def preload_all_schedules() -> int:
+async def preload_all_schedules(progress: Optional[Callable[[int, int, str], None]] = None) -> int:
+    """
+    Загружает расписания всех групп с сайта и перестраивает кэш.
+
+    Args:
+        progress: progress(обработано, всего, текущая группа) — для фоновых задач админки
+
+    Returns:
+        int: Сколько групп обработано
+    """
     log.info("🚀 Начинаем предзагрузку расписаний всех групп...")
-    all_groups = [g for groups in GROUPS_BY_COURSE.values() for g in groups]
+    all_groups = ALL_GROUPS
     week_start = datetime.now().strftime("%Y-%m-%d")
-    loaded = 0
+    status.preload_started(len(all_groups))
+    try:
+        loaded = await _preload_groups(all_groups, week_start, progress)
+    finally:
+        status.preload_finished()
+
+    log.info(f"✅ Предзагрузка завершена! Обработано и сохранено: {loaded}/{len(all_groups)} групп")
+    await schedule_cache.reload()
+    # Производные индексы строим сразу, чтобы первый запрос не ждал
+    teacher_index()
+    room_index()
+    return loaded
 
+
+async def _preload_groups(all_groups, week_start: str,
+                          progress: Optional[Callable[[int, int, str], None]] = None) -> int:
+    loaded = 0
     for i, group in enumerate(all_groups, 1):
+        if progress is not None:
+            progress(i - 1, len(all_groups), group)
         # Проверяем, есть ли уже на эту неделю
         existing = await db.get_schedule(group, week_start)
         if existing:
             log.info(f"[{i}/{len(all_groups)}] {group} — уже в БД (пропуск)")
             loaded += 1
+            status.preload_step()
             continue
 
-        url = f"{BASE_URL}?group={group}"
         try:
-            data = await get_info(url)
+            # Через fetcher: если эту группу уже грузят по запросу пользователя, ждём ту же загрузку
+            data = await schedule_fetcher.fetch(group)
 
             if not data:
                 log.warning(f"[{i}/{len(all_groups)}] {group} — данные от парсера пустые (None)")
                 # Всё равно сохраняем пустое расписание
                 await db.save_schedule(group, {}, week_start)
                 loaded += 1
+                status.preload_step(ok=False)
                 continue
 
             # Проверяем, есть ли уроки хотя бы в одном дне
@@ -48,9 +80,9 @@ async def preload_all_schedules() -> int:
                 else:
                     empty_days.append(day)
 
-            # Сохраняем ВСЕГДА (даже пустое)
-            await db.save_schedule(group, data, week_start)
+            # fetcher уже сохранил расписание в БД и сразу отдаёт его пользователям
             loaded += 1
+            status.preload_step()
 
             if has_lessons:
                 log.info(f"[{i}/{len(all_groups)}] {group} — загружено с уроками ({len(filled_days)} дней: {', '.join(filled_days)})")
@@ -62,10 +94,22 @@ async def preload_all_schedules() -> int:
             # При ошибке тоже сохраняем пустое, чтобы группа была в БД
             await db.save_schedule(group, {}, week_start)
             loaded += 1
+            status.preload_step(ok=False)
 
         # Задержка, чтобы не нагружать сайт
         if i % 5 == 0:
             await asyncio.sleep(1)
 
-    log.info(f"✅ Предзагрузка завершена! Обработано и сохранено: {loaded}/{len(all_groups)} групп")
-    return loaded
\ No newline at end of file
+    return loaded
+
+
+async def preload_in_background() -> None:
+    """Предзагрузка и очистка после старта: пока они идут, бот отвечает из БД"""
+    try:
+        await preload_all_schedules()
+        await db.cleanup_old_data(days_old=1)
+        status.cleanup_done = True
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        log.error(f"💥 Ошибка фоновой предзагрузки: {e}")
\ No newline at end of file
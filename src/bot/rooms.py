@@ -0,0 +1,120 @@
+import re
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from src.bot.constants import PAIR_TIMES
+from src.bot.keyboards import create_rooms_inline_keyboard
+from src.bot.schedule_cache import schedule_cache, DAY_TITLES
+from src.bot.teachers import pair_number, WEEKDAY_KEYS
+from src.utils.clock import college_now
+from src.utils.formatting import format_free_rooms
+
+MAX_PAIRS = max(PAIR_TIMES)
+# «каб. 101», «ауд.205а», «кабинет №3»; буква после номера — только если за ней не идёт слово
+ROOM_PATTERN = re.compile(r'(?:каб(?:инет)?|ауд(?:итория)?)\.?\s*№?\s*(\d+(?:[а-яa-z](?![а-яa-z]))?)', re.IGNORECASE)
+
+
+class RoomIndex(NamedTuple):
+    """
+    Занятость кабинетов на неделю в виде битовых масок.
+
+    Слот — (день, пара): бит day_index * MAX_PAIRS + (pair - 1).
+    by_slot[slot] — маска занятых кабинетов (бит i — rooms[i]),
+    by_room[room] — маска занятых слотов кабинета.
+    """
+    rooms: List[str]
+    by_slot: List[int]
+    by_room: Dict[str, int]
+    all_rooms: int
+
+
+def slot(day_key: str, pair: int) -> int:
+    return WEEKDAY_KEYS.index(day_key) * MAX_PAIRS + (pair - 1)
+
+
+def _room_sort_key(room: str) -> Tuple[int, str]:
+    digits = re.match(r'\d+', room)
+    return (int(digits.group()) if digits else 0, room)
+
+
+def build_room_index(schedules: Dict[str, Dict]) -> RoomIndex:
+    """
+    Извлекает номера кабинетов из пар всех групп и строит маски занятости.
+
+    Args:
+        schedules (Dict[str, Dict]): {group_name: schedule_data}
+
+    Returns:
+        RoomIndex: Индекс занятости на текущую неделю
+    """
+    occupied: List[Tuple[str, int]] = []
+    for schedule_data in schedules.values():
+        for day_key in WEEKDAY_KEYS:
+            for lesson in schedule_data.get(day_key, {}).get('lessons', []):
+                pair = pair_number(lesson)
+                if not 1 <= pair <= MAX_PAIRS:
+                    continue
+                for room in ROOM_PATTERN.findall(lesson):
+                    occupied.append((room.lower(), slot(day_key, pair)))
+
+    rooms = sorted({room for room, _ in occupied}, key=_room_sort_key)
+    bit_of = {room: i for i, room in enumerate(rooms)}
+    by_slot = [0] * (len(WEEKDAY_KEYS) * MAX_PAIRS)
+    by_room = dict.fromkeys(rooms, 0)
+    for room, slot_index in occupied:
+        by_slot[slot_index] |= 1 << bit_of[room]
+        by_room[room] |= 1 << slot_index
+    return RoomIndex(rooms, by_slot, by_room, (1 << len(rooms)) - 1)
+
+
+def room_index() -> RoomIndex:
+    """Индекс для текущей версии расписаний (пересобирается только после их изменения)"""
+    return schedule_cache.derived("rooms", build_room_index)
+
+
+def free_rooms(day_key: str, pairs: List[int]) -> List[str]:
+    """
+    Кабинеты, свободные во всех указанных парах дня.
+
+    Args:
+        day_key (str): 'monday' ... 'saturday'
+        pairs (List[int]): Номера пар (например, [3] или [3, 4])
+
+    Returns:
+        List[str]: Номера свободных кабинетов по возрастанию
+    """
+    index = room_index()
+    busy = 0
+    for pair in pairs:
+        busy |= index.by_slot[slot(day_key, pair)]
+    free = index.all_rooms & ~busy
+    result = []
+    while free:
+        lowest = free & -free
+        result.append(index.rooms[lowest.bit_length() - 1])
+        free ^= lowest
+    return result
+
+
+def current_slot(now: Optional[datetime] = None) -> Optional[Tuple[str, int]]:
+    """
+    Текущая пара или ближайшая следующая сегодня — по часам колледжа.
+
+    Returns:
+        Optional[Tuple[str, int]]: (день, номер пары) или None, если пар сегодня больше нет
+    """
+    now = now or college_now()
+    if now.weekday() >= len(WEEKDAY_KEYS):
+        return None
+    current = now.strftime("%H:%M")
+    for pair, (_, end) in sorted(PAIR_TIMES.items()):
+        if current < end:
+            return WEEKDAY_KEYS[now.weekday()], pair
+    return None
+
+
+def rooms_reply(day_key: str, pair: int) -> Tuple[str, str]:
+    """Текст со свободными кабинетами и клавиатура выбора дня и пары"""
+    text = format_free_rooms(DAY_TITLES[day_key], pair, PAIR_TIMES.get(pair), free_rooms(day_key, [pair]),
+                             len(room_index().rooms))
+    return text, create_rooms_inline_keyboard(day_key, pair)
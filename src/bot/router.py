@@ -0,0 +1,68 @@
+from math import inf
+from typing import Awaitable, Callable, Optional
+
+from telebot.types import Message
+
+from src.bot.metrics import handler_timer
+
+Handler = Callable[[Message], Awaitable[None]]
+Predicate = Callable[[Message], bool]
+
+
+class TextRouter:
+    """
+    Маршрутизация текстовых сообщений через одну хеш-таблицу.
+
+    Известные тексты (кнопки, курсы, группы, дни) находятся одним поиском
+    в словаре. Предикаты проверяются только те, что зарегистрированы раньше
+    найденного маршрута, — так сохраняется порядок, как в цепочке telebot.
+    Свободный ввод проходит по всей цепочке предикатов.
+    """
+
+    def __init__(self) -> None:
+        self._routes: dict[str, tuple[int, Handler]] = {}
+        self._fallbacks: list[tuple[int, Predicate, Handler]] = []
+        self._order = 0
+
+    def _next_order(self) -> int:
+        self._order += 1
+        return self._order
+
+    def exact(self, *texts: str):
+        """Регистрирует хендлер для точного совпадения текста"""
+        def decorator(handler: Handler) -> Handler:
+            order = self._next_order()
+            for text in texts:
+                # Как и в telebot, побеждает первый зарегистрированный
+                self._routes.setdefault(text, (order, handler))
+            return handler
+        return decorator
+
+    def fallback(self, func: Predicate):
+        """Регистрирует хендлер с предикатом (для режимов и свободного ввода)"""
+        def decorator(handler: Handler) -> Handler:
+            self._fallbacks.append((self._next_order(), func, handler))
+            return handler
+        return decorator
+
+    def resolve(self, message: Message) -> Optional[Handler]:
+        text = message.text or ""
+        route = self._routes.get(text) or self._routes.get(text.strip())
+        limit = route[0] if route else inf
+
+        for order, func, handler in self._fallbacks:
+            if order > limit:
+                break
+            if func(message):
+                return handler
+
+        return route[1] if route else None
+
+    async def dispatch(self, message: Message) -> None:
+        handler = self.resolve(message)
+        if handler is not None:
+            with handler_timer(handler.__name__):
+                await handler(message)
+
+
+router = TextRouter()
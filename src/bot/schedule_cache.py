@@ -0,0 +1,147 @@
+import hashlib
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.bot.constants import ALL_GROUPS, DAYS_MAPPING
+from src.database.db import db
+from src.utils.formatting import format_daily_schedule, format_weekly_schedule
+from src.utils.logger import log
+from src.utils.metrics import registry
+from src.utils.tracing import span
+
+# 'monday' -> 'Понедельник', 'week' -> 'Вся неделя'
+DAY_TITLES = {key: title for title, key in DAYS_MAPPING.items() if key != "change_group"}
+COLLEGE_GROUPS = frozenset(ALL_GROUPS)
+
+
+def schedule_hash(schedule_data: Dict) -> str:
+    raw = json.dumps(schedule_data, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hashlib.sha1(raw).hexdigest()[:16]
+
+
+class ScheduleCache:
+    """
+    Актуальные расписания всех групп в памяти процесса.
+
+    Хранит готовые тексты ответов и построенные из расписаний структуры
+    (индексы, календари и т.п.). Всё это привязано к version — хешу
+    содержимого, поэтому после изменения расписаний пересобирается само.
+    """
+
+    def __init__(self) -> None:
+        self._schedules: Dict[str, Dict] = {}
+        self._hashes: Dict[str, str] = {}
+        self._rendered: Dict[Tuple[str, str], str] = {}
+        self._derived: Dict[str, Tuple[str, Any]] = {}
+        self.version = ""
+        self.hits = 0
+        self.misses = 0
+
+    def _update_version(self) -> None:
+        joined = "|".join(f"{group}:{self._hashes[group]}" for group in sorted(self._hashes))
+        self.version = hashlib.sha1(joined.encode("utf-8")).hexdigest()[:16]
+
+    async def reload(self) -> int:
+        """Перечитывает все активные расписания из БД"""
+        schedules = await db.get_all_schedules()
+        self._schedules = schedules
+        self._hashes = {group: schedule_hash(data) for group, data in schedules.items()}
+        self._rendered.clear()
+        self._update_version()
+        log.info(f"🗂 Кэш расписаний: {len(schedules)} групп, версия {self.version}")
+        return len(schedules)
+
+    def put(self, group: str, schedule_data: Dict) -> None:
+        """Обновляет одну группу (если содержимое изменилось)"""
+        new_hash = schedule_hash(schedule_data)
+        if self._hashes.get(group) == new_hash:
+            return
+        self._schedules[group] = schedule_data
+        self._hashes[group] = new_hash
+        for key in [key for key in self._rendered if key[0] == group]:
+            del self._rendered[key]
+        self._update_version()
+
+    def get(self, group: str) -> Optional[Dict]:
+        return self._schedules.get(group)
+
+    def find_group(self, name: str) -> Optional[str]:
+        """Название группы как в кэше: точно или в нижнем регистре (из адреса API/календаря)"""
+        if name in self._schedules:
+            return name
+        lowered = name.lower()
+        return lowered if lowered in self._schedules else None
+
+    def groups(self) -> List[str]:
+        return sorted(self._schedules)
+
+    def all(self) -> Dict[str, Dict]:
+        return self._schedules
+
+    def group_version(self, group: str) -> Optional[str]:
+        return self._hashes.get(group)
+
+    def render(self, group: str, day_key: str) -> Optional[str]:
+        """
+        Готовый текст расписания группы на день или неделю.
+
+        Args:
+            group (str): Название группы
+            day_key (str): 'monday' ... 'saturday' или 'week'
+
+        Returns:
+            Optional[str]: Текст ответа или None, если группы нет в кэше
+        """
+        key = (group, day_key)
+        text = self._rendered.get(key)
+        if text is not None:
+            self.hits += 1
+            return text
+
+        schedule_data = self._schedules.get(group)
+        if schedule_data is None:
+            self.misses += 1
+            return None
+
+        self.misses += 1
+        with span("format"):
+            if day_key == "week":
+                text = format_weekly_schedule(schedule_data, group)
+            else:
+                text = format_daily_schedule(schedule_data, day_key, DAY_TITLES[day_key], group)
+        self._rendered[key] = text
+        return text
+
+    def derived(self, name: str, build: Callable[[Dict[str, Dict]], Any]) -> Any:
+        """
+        Структура, построенная из всех расписаний, с пересборкой при смене версии.
+
+        Args:
+            name (str): Имя структуры (ключ кэша)
+            build: Функция {group: schedule_data} -> структура
+        """
+        cached = self._derived.get(name)
+        if cached is not None and cached[0] == self.version:
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        with span(f"build.{name}"):
+            value = build(self._schedules)
+        self._derived[name] = (self.version, value)
+        return value
+
+
+schedule_cache = ScheduleCache()
+
+
+def is_known_group(group: str) -> bool:
+    """Группа из списка колледжа или с расписанием в памяти (например, добавленная через админку)"""
+    return group in COLLEGE_GROUPS or schedule_cache.get(group) is not None
+
+registry.gauge("schedule_cache_hits_total", "Попадания в кэш готовых текстов и индексов",
+               function=lambda: schedule_cache.hits, kind="counter")
+registry.gauge("schedule_cache_misses_total", "Промахи кэша готовых текстов и индексов",
+               function=lambda: schedule_cache.misses, kind="counter")
+registry.gauge("schedule_cache_hit_ratio", "Доля попаданий в кэш с момента запуска",
+               function=lambda: schedule_cache.hits / max(1, schedule_cache.hits + schedule_cache.misses))
+registry.gauge("schedule_cache_groups", "Групп с расписанием в памяти", function=lambda: len(schedule_cache.all()))
@@ -0,0 +1,134 @@
+import asyncio
+import json
+import time
+from enum import IntEnum
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.config.settings import SESSION_TTL
+from src.utils.logger import log
+
+SESSIONS_FILE = Path(__file__).resolve().parent.parent.parent / "data" / "sessions.json"
+
+
+def shard_sessions_file(index: int) -> Path:
+    """Файл сессий шарда: при BOT_WORKERS > 1 сессии живут в процессе, который обрабатывает чат"""
+    return SESSIONS_FILE.with_name(f"sessions.shard{index}.json")
+
+
+class State(IntEnum):
+    """Режим диалога с пользователем — ровно один в каждый момент"""
+    IDLE = 0
+    TEACHER_SEARCH = 1      # ждём фамилию преподавателя
+    ADMIN_PASSWORD = 2      # ждём пароль от админ-панели
+
+
+class Session:
+    __slots__ = ("state", "group", "is_admin", "touched")
+
+    def __init__(self, state: State = State.IDLE, group: Optional[str] = None,
+                 is_admin: bool = False, touched: float = 0.0) -> None:
+        self.state = state
+        self.group = group
+        self.is_admin = is_admin
+        self.touched = touched or time.time()
+
+
+class SessionStore:
+    """
+    Состояние пользователей в одном словаре вместо четырёх.
+    Сессии, к которым не обращались дольше ttl, вытесняются —
+    выбранная группа при этом остаётся в БД (таблица users).
+    """
+
+    def __init__(self, ttl: float = SESSION_TTL) -> None:
+        self.ttl = ttl
+        self._sessions: Dict[int, Session] = {}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, user_id: int) -> Optional[Session]:
+        session = self._sessions.get(user_id)
+        if session is not None:
+            session.touched = time.time()
+        return session
+
+    def ensure(self, user_id: int) -> Session:
+        session = self.get(user_id)
+        if session is None:
+            session = self._sessions[user_id] = Session()
+        return session
+
+    def state(self, user_id: int) -> State:
+        session = self._sessions.get(user_id)
+        return session.state if session is not None else State.IDLE
+
+    def set_state(self, user_id: int, state: State) -> None:
+        self.ensure(user_id).state = state
+
+    def exit_state(self, user_id: int, state: State) -> None:
+        """Возвращает в IDLE, только если пользователь сейчас в state"""
+        session = self.get(user_id)
+        if session is not None and session.state == state:
+            session.state = State.IDLE
+
+    def reset(self, user_id: int) -> None:
+        """Сбрасывает режим и права админа (группа остаётся)"""
+        session = self.get(user_id)
+        if session is not None:
+            session.state = State.IDLE
+            session.is_admin = False
+
+    def is_admin(self, user_id: int) -> bool:
+        session = self._sessions.get(user_id)
+        return session is not None and session.is_admin
+
+    def group(self, user_id: int) -> Optional[str]:
+        session = self.get(user_id)
+        return session.group if session is not None else None
+
+    def set_group(self, user_id: int, group: str) -> None:
+        self.ensure(user_id).group = group
+
+    def evict_idle(self) -> int:
+        deadline = time.time() - self.ttl
+        stale = [user_id for user_id, session in self._sessions.items() if session.touched < deadline]
+        for user_id in stale:
+            del self._sessions[user_id]
+        return len(stale)
+
+    async def run_eviction(self, interval: float = 600) -> None:
+        """Фоновая задача: периодически вытесняет простаивающие сессии"""
+        while True:
+            await asyncio.sleep(interval)
+            evicted = self.evict_idle()
+            if evicted:
+                log.info(f"🧹 Вытеснено {evicted} неактивных сессий, осталось {len(self)}")
+
+    def save(self, path: Path = SESSIONS_FILE) -> None:
+        # Права админа не сохраняем: после перезапуска нужно войти заново
+        data = {
+            str(user_id): [int(session.state), session.group, session.touched]
+            for user_id, session in self._sessions.items()
+        }
+        path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        log.info(f"💾 Сохранено {len(data)} сессий в {path}")
+
+    def load(self, path: Path = SESSIONS_FILE) -> None:
+        if not path.exists():
+            return
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            log.warning(f"⚠️ Не удалось загрузить сессии: {e}")
+            return
+        deadline = time.time() - self.ttl
+        for user_id, (state, group, touched) in data.items():
+            if touched >= deadline:
+                state = State(state) if state != State.ADMIN_PASSWORD else State.IDLE
+                self._sessions[int(user_id)] = Session(state, group, False, touched)
+        log.info(f"📂 Загружено {len(self._sessions)} сессий из {path}")
+
+
+sessions = SessionStore()
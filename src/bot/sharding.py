@@ -0,0 +1,215 @@
+import asyncio
+import multiprocessing
+import queue
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+from telebot import asyncio_helper
+from telebot.types import Update
+
+from src.bot.core import bot
+from src.bot.digest import run_digest_scheduler
+from src.bot.outbox import outbox
+from src.bot.schedule_cache import schedule_cache
+from src.bot.sessions import sessions, shard_sessions_file
+from src.config.settings import (
+    TOKEN, BOT_MODE, WEBHOOK_PATH, WEBHOOK_SECRET, WEBHOOK_HOST, WEBHOOK_PORT, WEBHOOK_URL,
+    OUTBOX_GLOBAL_RATE, SESSION_PERSIST,
+)
+from src.database.db import db
+from src.utils.logger import log
+
+BATCH_SIZE = 100
+CACHE_RELOAD_INTERVAL = 300  # секунд; шарды перечитывают расписания из общей БД
+
+
+def shard_key(raw: Dict[str, Any]) -> int:
+    """
+    Ключ шарда для сырого обновления: chat.id, а если чата нет — id отправителя.
+    Все обновления одного чата попадают в один процесс и идут по порядку.
+    """
+    for field, payload in raw.items():
+        if field == "update_id" or not isinstance(payload, dict):
+            continue
+        chat = payload.get("chat") or (payload.get("message") or {}).get("chat")
+        if chat:
+            return chat["id"]
+        if "from" in payload:
+            return payload["from"]["id"]
+    return raw.get("update_id", 0)
+
+
+def _take_batch(inbox) -> List[Optional[Dict]]:
+    """Блокируется до первого обновления и забирает всё, что уже накопилось"""
+    batch = [inbox.get()]
+    while batch[-1] is not None and len(batch) < BATCH_SIZE:
+        try:
+            batch.append(inbox.get_nowait())
+        except queue.Empty:
+            break
+    return batch
+
+
+async def _reload_periodically() -> None:
+    while True:
+        await asyncio.sleep(CACHE_RELOAD_INTERVAL)
+        await schedule_cache.reload()
+
+
+async def _serve_shard(index: int, count: int, inbox) -> None:
+    import src.bot.handlers  # noqa: F401 — регистрация хендлеров в процессе шарда
+
+    await db.connect()
+    await schedule_cache.reload()
+    if SESSION_PERSIST:
+        sessions.load(shard_sessions_file(index))
+    # Общий лимит Telegram делится между шардами поровну
+    await outbox.start(bot, global_rate=OUTBOX_GLOBAL_RATE / count)
+    background = [
+        asyncio.create_task(_reload_periodically()),
+        asyncio.create_task(sessions.run_eviction()),
+    ]
+    if index == 0:
+        # Рассылка — в одном шарде, в пределах его доли лимита
+        background.append(asyncio.create_task(run_digest_scheduler()))
+    log.info(f"🧩 Шард {index + 1}/{count} готов")
+
+    loop = asyncio.get_running_loop()
+    tails: Dict[int, asyncio.Task] = {}
+
+    async def process_after(previous: Optional[asyncio.Task], update: Update) -> None:
+        if previous is not None:
+            await asyncio.wait([previous])
+        try:
+            await bot.process_new_updates([update])
+        except Exception as e:
+            log.error(f"💥 Шард {index + 1}: ошибка обработки обновления {update.update_id}: {e}")
+
+    def forget(key: int, task: asyncio.Task) -> None:
+        if tails.get(key) is task:
+            del tails[key]
+
+    try:
+        running = True
+        while running:
+            for raw in await loop.run_in_executor(None, _take_batch, inbox):
+                if raw is None:
+                    running = False
+                    break
+                key = shard_key(raw)
+                # Цепочка задач на чат: следующее обновление ждёт предыдущее
+                task = asyncio.create_task(process_after(tails.get(key), Update.de_json(raw)))
+                tails[key] = task
+                task.add_done_callback(lambda t, key=key: forget(key, t))
+        if tails:
+            await asyncio.wait(list(tails.values()))
+    finally:
+        for task in background:
+            task.cancel()
+        if SESSION_PERSIST:
+            sessions.save(shard_sessions_file(index))
+        await outbox.stop()
+        await bot.close_session()
+        await db.close()
+        log.info(f"🧩 Шард {index + 1}/{count} остановлен")
+
+
+def worker_main(index: int, count: int, inbox) -> None:
+    """Точка входа процесса-шарда"""
+    try:
+        asyncio.run(_serve_shard(index, count, inbox))
+    except KeyboardInterrupt:
+        pass  # Ctrl+C получает вся группа процессов — останавливается фронт
+
+
+class ShardPool:
+    """
+    Процессы-обработчики и распределение обновлений между ними по chat.id.
+    Расписания шарды читают из общей SQLite (WAL), только на чтение.
+    """
+
+    def __init__(self, count: int) -> None:
+        self.count = count
+        self._context = multiprocessing.get_context("spawn")
+        self._inboxes = [self._context.Queue() for _ in range(count)]
+        self._processes: List[multiprocessing.Process] = []
+        self.forwarded = 0
+
+    def start(self) -> None:
+        for index, inbox in enumerate(self._inboxes):
+            process = self._context.Process(
+                target=worker_main, args=(index, self.count, inbox), name=f"bot-shard-{index}"
+            )
+            process.start()
+            self._processes.append(process)
+        log.info(f"🧩 Запущено {self.count} шардов")
+
+    def dispatch(self, raw: Dict[str, Any]) -> None:
+        self._inboxes[shard_key(raw) % self.count].put(raw)
+        self.forwarded += 1
+
+    async def stop(self, timeout: float = 15) -> None:
+        for inbox in self._inboxes:
+            inbox.put(None)
+        loop = asyncio.get_running_loop()
+        for process in self._processes:
+            await loop.run_in_executor(None, process.join, timeout)
+            if process.is_alive():
+                log.warning(f"⚠️ {process.name} не остановился вовремя — завершаем принудительно")
+                process.terminate()
+        self._processes = []
+
+
+async def _front_polling(pool: ShardPool) -> None:
+    offset = None
+    while True:
+        try:
+            updates = await asyncio_helper.get_updates(TOKEN, offset=offset, limit=100, timeout=20)
+        except Exception as e:
+            log.error(f"💥 Ошибка получения обновлений: {e}")
+            await asyncio.sleep(3)
+            continue
+        for raw in updates:
+            pool.dispatch(raw)
+            offset = raw["update_id"] + 1
+
+
+async def _front_webhook(pool: ShardPool) -> None:
+    from src.bot.api import add_api_routes
+    from src.bot.webhook import has_valid_secret
+
+    async def handle(request: web.Request) -> web.Response:
+        if not has_valid_secret(request):
+            return web.Response(status=403)
+        try:
+            pool.dispatch(await request.json())
+        except ValueError:
+            return web.Response(status=400)
+        return web.Response(status=200)
+
+    app = web.Application()
+    app.router.add_post(WEBHOOK_PATH, handle)
+    add_api_routes(app)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, WEBHOOK_HOST, WEBHOOK_PORT).start()
+    if WEBHOOK_URL:
+        await bot.set_webhook(url=WEBHOOK_URL.rstrip("/") + WEBHOOK_PATH, secret_token=WEBHOOK_SECRET)
+    log.info(f"🌐 Фронт принимает webhook на {WEBHOOK_HOST}:{WEBHOOK_PORT}{WEBHOOK_PATH}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+async def run_sharded(count: int) -> None:
+    """Фронт-процесс: получает обновления и раздаёт их count шардам"""
+    pool = ShardPool(count)
+    pool.start()
+    try:
+        if BOT_MODE == "webhook":
+            await _front_webhook(pool)
+        else:
+            await _front_polling(pool)
+    finally:
+        await pool.stop()
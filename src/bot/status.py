@@ -0,0 +1,79 @@
+import time
+from typing import Any, Dict, Optional
+
+from src.utils.events import events
+from src.utils.logger import log
+
+
+class BotStatus:
+    """
+    Готовность бота и ход фоновой предзагрузки расписаний.
+
+    Бот начинает отвечать сразу после подключения к БД и загрузки кэша
+    из SQLite; предзагрузка с сайта и очистка идут в фоне.
+    """
+
+    def __init__(self) -> None:
+        self.started_at = time.monotonic()
+        self.ready_after: Optional[float] = None
+        self.cached_groups = 0
+        self.preload_running = False
+        self.preload_total = 0
+        self.preload_done = 0
+        self.preload_failed = 0
+        self.preload_duration: Optional[float] = None
+        self._preload_started = 0.0
+        self.cleanup_done = False
+
+    @property
+    def ready(self) -> bool:
+        return self.ready_after is not None
+
+    def mark_ready(self, cached_groups: int) -> None:
+        self.ready_after = time.monotonic() - self.started_at
+        self.cached_groups = cached_groups
+        log.info(f"⏱ Бот отвечает через {self.ready_after:.2f} с после запуска "
+                 f"({cached_groups} групп в кэше из БД)")
+
+    def preload_started(self, total: int) -> None:
+        self.preload_running = True
+        self.preload_total = total
+        self.preload_done = 0
+        self.preload_failed = 0
+        self.preload_duration = None
+        self._preload_started = time.monotonic()
+        self._publish_preload()
+
+    def preload_step(self, ok: bool = True) -> None:
+        self.preload_done += 1
+        if not ok:
+            self.preload_failed += 1
+        self._publish_preload()
+
+    def preload_finished(self) -> None:
+        self.preload_running = False
+        self.preload_duration = time.monotonic() - self._preload_started
+        self._publish_preload()
+
+    def _publish_preload(self) -> None:
+        events.publish("preload", running=self.preload_running, done=self.preload_done,
+                       total=self.preload_total, failed=self.preload_failed)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'ready': self.ready,
+            'ready_after_sec': self.ready_after,
+            'uptime_sec': time.monotonic() - self.started_at,
+            'cached_groups': self.cached_groups,
+            'preload': {
+                'running': self.preload_running,
+                'done': self.preload_done,
+                'total': self.preload_total,
+                'failed': self.preload_failed,
+                'duration_sec': self.preload_duration,
+            },
+            'cleanup_done': self.cleanup_done,
+        }
+
+
+status = BotStatus()
@@ -0,0 +1,142 @@
+import re
+from collections import Counter
+from typing import Dict, List, NamedTuple, Set, Tuple
+
+from src.bot.schedule_cache import schedule_cache
+from src.utils.formatting import format_teacher_schedule
+
+WEEKDAY_KEYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday']
+TEACHER_PATTERN = re.compile(r'\b([А-ЯЁ][а-яё]+(?:-[А-ЯЁ][а-яё]+)?\s+[А-ЯЁ]\.[А-ЯЁ]\.)')
+PAIR_PATTERN = re.compile(r'^\s*(\d+)')
+
+# Латинские буквы, похожие на кириллические: «Ивaнов» с латинской a
+LOOKALIKES = str.maketrans("ABCEHKMOPTXYaceopxyk", "АВСЕНКМОРТХУасеорхук")
+MIN_SIMILARITY = 0.3  # коэффициент Дайса по триграммам
+MAX_SUGGESTIONS = 5
+
+
+class TeacherIndex(NamedTuple):
+    timetables: Dict[str, str]          # ФИО -> готовый текст расписания на неделю
+    by_surname: Dict[str, List[str]]    # нормализованная фамилия -> ФИО
+    names: List[str]                    # все ФИО по алфавиту
+    surnames: List[str]                 # нормализованные фамилии (id — позиция в списке)
+    by_trigram: Dict[str, List[int]]    # триграмма -> id фамилий, в которых она есть
+    trigram_counts: List[int]           # число триграмм у каждой фамилии
+
+
+def normalize(text: str) -> str:
+    """Нижний регистр, ё -> е, латинские двойники -> кириллица, одинарные пробелы"""
+    return " ".join(text.translate(LOOKALIKES).lower().replace("ё", "е").split())
+
+
+def trigrams(word: str) -> Set[str]:
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def pair_number(lesson: str) -> int:
+    match = PAIR_PATTERN.match(lesson)
+    return int(match.group(1)) if match else 99
+
+
+def build_teacher_index(schedules: Dict[str, Dict]) -> TeacherIndex:
+    """
+    Собирает расписания всех преподавателей из расписаний групп.
+
+    Args:
+        schedules (Dict[str, Dict]): {group_name: schedule_data}
+
+    Returns:
+        TeacherIndex: Готовые тексты и индекс по фамилиям
+    """
+    # ФИО -> день -> [(номер пары, группа, текст пары без ФИО)]
+    lessons: Dict[str, Dict[str, list]] = {}
+    day_dates: Dict[str, str] = {}
+    date_range = ''
+
+    for group, schedule_data in schedules.items():
+        date_range = date_range or schedule_data.get('date_range', '')
+        for day_key in WEEKDAY_KEYS:
+            day_data = schedule_data.get(day_key, {})
+            if day_data.get('date'):
+                day_dates.setdefault(day_key, day_data['date'])
+            for lesson in day_data.get('lessons', []):
+                for teacher in set(TEACHER_PATTERN.findall(lesson)):
+                    text = " ".join(lesson.replace(teacher, "").split())
+                    lessons.setdefault(teacher, {}).setdefault(day_key, []).append(
+                        (pair_number(lesson), group, text)
+                    )
+
+    timetables = {}
+    by_surname: Dict[str, List[str]] = {}
+    for teacher in sorted(lessons):
+        days = {
+            day_key: {
+                'date': day_dates.get(day_key, ''),
+                'lessons': [(text, group) for _, group, text in sorted(lessons[teacher].get(day_key, []))],
+            }
+            for day_key in WEEKDAY_KEYS
+        }
+        timetables[teacher] = format_teacher_schedule(teacher, days, date_range)
+        by_surname.setdefault(normalize(teacher.split()[0]), []).append(teacher)
+
+    surnames = sorted(by_surname)
+    by_trigram: Dict[str, List[int]] = {}
+    trigram_counts = []
+    for surname_id, surname in enumerate(surnames):
+        grams = trigrams(surname)
+        trigram_counts.append(len(grams))
+        for gram in grams:
+            by_trigram.setdefault(gram, []).append(surname_id)
+
+    return TeacherIndex(timetables, by_surname, sorted(lessons), surnames, by_trigram, trigram_counts)
+
+
+def teacher_index() -> TeacherIndex:
+    """Индекс для текущей версии расписаний (пересобирается только после их изменения)"""
+    return schedule_cache.derived("teachers", build_teacher_index)
+
+
+def find_teachers(query: str) -> List[str]:
+    """
+    ФИО преподавателей по фамилии или началу ФИО («Иванов», «иванов и.»).
+
+    Returns:
+        List[str]: Найденные ФИО по алфавиту
+    """
+    index = teacher_index()
+    query = normalize(query)
+    exact = index.by_surname.get(query)
+    if exact:
+        return exact
+    return [name for name in index.names if normalize(name).startswith(query)]
+
+
+def suggest_teachers(query: str, limit: int = MAX_SUGGESTIONS) -> List[Tuple[str, float]]:
+    """
+    Похожие фамилии для запроса с опечаткой («Иванв», «Семенова» вместо «Семёнова»).
+
+    Кандидаты — фамилии с общими триграммами, ранжированные по коэффициенту Дайса.
+
+    Returns:
+        List[Tuple[str, float]]: (ФИО, сходство) по убыванию сходства
+    """
+    index = teacher_index()
+    query = normalize(query).split(" ")[0]
+    grams = trigrams(query)
+    shared: Counter = Counter()
+    for gram in grams:
+        shared.update(index.by_trigram.get(gram, ()))
+
+    scored = []
+    for surname_id, common in shared.items():
+        score = 2 * common / (len(grams) + index.trigram_counts[surname_id])
+        if score >= MIN_SIMILARITY:
+            scored.append((score, index.surnames[surname_id]))
+    scored.sort(key=lambda item: (-item[0], item[1]))
+
+    suggestions = []
+    for score, surname in scored:
+        for teacher in index.by_surname[surname]:
+            suggestions.append((teacher, round(score, 2)))
+    return suggestions[:limit]
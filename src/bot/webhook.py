@@ -0,0 +1,228 @@
+import asyncio
+import hmac
+import json
+import signal
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from aiohttp import web
+from telebot.async_telebot import AsyncTeleBot
+from telebot.types import Update
+
+from src.bot.core import bot
+from src.bot.api import add_api_routes
+from src.bot.status import status
+from src.config.settings import (
+    WEBHOOK_URL,
+    WEBHOOK_PATH,
+    WEBHOOK_SECRET,
+    WEBHOOK_HOST,
+    WEBHOOK_PORT,
+    WEBHOOK_REPLY_TIMEOUT,
+    WEBHOOK_DRAIN_TIMEOUT,
+)
+from src.utils.logger import log
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def has_valid_secret(request: web.Request) -> bool:
+    """Секретный токен из заголовка Telegram; сравнение за постоянное время"""
+    # Байты, а не str: на не-ASCII заголовке compare_digest для строк бросает TypeError
+    return hmac.compare_digest(request.headers.get(SECRET_HEADER, "").encode(), WEBHOOK_SECRET.encode())
+
+
+# Параметры sendMessage, которые можно вернуть прямо в ответе на webhook
+INLINE_REPLY_KWARGS = {"parse_mode", "reply_markup", "disable_notification"}
+
+
+class DirectReply:
+    """
+    Ответ на обновление, который уйдёт в теле ответа на webhook.
+
+    Держит последний отправленный хендлером send_message. Если хендлер
+    отправляет ещё одно сообщение, предыдущее сначала уходит через API,
+    чтобы порядок сообщений в чате не нарушался.
+    """
+
+    def __init__(self, send_message) -> None:
+        self._send_message = send_message
+        self.pending: Optional[tuple[Any, str, dict]] = None
+        self.closed = False
+
+    async def flush(self) -> None:
+        pending, self.pending = self.pending, None
+        if pending is not None:
+            chat_id, text, kwargs = pending
+            await self._send_message(chat_id, text, **kwargs)
+
+    async def close(self, deliver_inline: bool) -> Optional[dict]:
+        """Закрывает слот: возвращает тело ответа или досылает сообщение через API"""
+        self.closed = True
+        if not deliver_inline:
+            await self.flush()
+            return None
+
+        pending, self.pending = self.pending, None
+        if pending is None:
+            return None
+        chat_id, text, kwargs = pending
+        payload = {"method": "sendMessage", "chat_id": chat_id, "text": text}
+        for key, value in kwargs.items():
+            if key == "reply_markup":
+                # Клавиатура приходит объектом telebot или уже готовой JSON-строкой
+                value = json.loads(value.to_json() if hasattr(value, "to_json") else value)
+            payload[key] = value
+        return payload
+
+
+_direct_reply: ContextVar[Optional[DirectReply]] = ContextVar("direct_reply", default=None)
+
+
+def install_direct_replies(target: AsyncTeleBot):
+    """
+    Оборачивает target.send_message: внутри обработки webhook-обновления
+    последнее сообщение в чат возвращается в ответе на webhook, а не отдельным
+    запросом к API. Такой вызов send_message возвращает None.
+
+    Returns:
+        Исходный send_message, который ходит в API напрямую
+    """
+    original = getattr(target, "_api_send_message", None)
+    if original is not None:
+        return original
+    original = target.send_message
+
+    async def send_message(chat_id, text, **kwargs):
+        reply = _direct_reply.get()
+        if reply is None or reply.closed:
+            return await original(chat_id, text, **kwargs)
+
+        await reply.flush()
+        # Пока ждали flush(), ответ на webhook мог уже уйти — тогда отложенное сообщение потерялось бы
+        if reply.closed or not set(kwargs) <= INLINE_REPLY_KWARGS:
+            return await original(chat_id, text, **kwargs)
+        reply.pending = (chat_id, text, kwargs)
+        return None
+
+    target.send_message = send_message
+    target._api_send_message = original
+    return original
+
+
+async def send_message_now(target: AsyncTeleBot, chat_id, text, **kwargs):
+    """
+    send_message мимо ответа на webhook: всегда отдельный запрос к API и
+    настоящий Message — для сообщений, которые потом редактируются.
+    Отложенный ответ того же обновления уходит раньше, порядок в чате сохраняется.
+    """
+    reply = _direct_reply.get()
+    if reply is not None and not reply.closed:
+        await reply.flush()
+    send = getattr(target, "_api_send_message", None) or target.send_message
+    return await send(chat_id, text, **kwargs)
+
+
+class WebhookState:
+    """Задачи обработки в полёте и флаг остановки"""
+
+    def __init__(self) -> None:
+        self.tasks: set[asyncio.Task] = set()
+        self.draining = False
+        self.processed = 0
+        self.api_send_message = None
+
+
+STATE_KEY = web.AppKey("webhook_state", WebhookState)
+
+
+async def _process_update(update: Update, reply: DirectReply) -> None:
+    _direct_reply.set(reply)
+    try:
+        await bot.process_new_updates([update])
+    except Exception as e:
+        log.error(f"💥 Ошибка обработки обновления {update.update_id}: {e}")
+
+
+async def handle_update(request: web.Request) -> web.Response:
+    state = request.app[STATE_KEY]
+    if state.draining:
+        return web.Response(status=503)
+
+    if not has_valid_secret(request):
+        log.warning("⛔ Webhook-запрос с неверным секретным токеном")
+        return web.Response(status=403)
+
+    try:
+        update = Update.de_json(await request.json())
+    except Exception:
+        return web.Response(status=400)
+
+    reply = DirectReply(state.api_send_message)
+    task = asyncio.create_task(_process_update(update, reply))
+    state.tasks.add(task)
+    task.add_done_callback(state.tasks.discard)
+
+    try:
+        await asyncio.wait_for(asyncio.shield(task), WEBHOOK_REPLY_TIMEOUT)
+    except asyncio.TimeoutError:
+        pass  # хендлер долгий — дорабатывает в фоне, отвечаем Telegram сразу
+
+    payload = await reply.close(deliver_inline=task.done())
+    state.processed += 1
+    if payload is None:
+        return web.Response(status=200)
+    return web.json_response(payload)
+
+
+async def handle_health(request: web.Request) -> web.Response:
+    """Готовность и ход предзагрузки: 200, когда бот уже отвечает, иначе 503"""
+    return web.json_response(status.as_dict(), status=200 if status.ready else 503)
+
+
+async def _on_startup(app: web.Application) -> None:
+    if WEBHOOK_URL:
+        await bot.set_webhook(url=WEBHOOK_URL.rstrip("/") + WEBHOOK_PATH, secret_token=WEBHOOK_SECRET)
+        log.info(f"🔗 Webhook установлен: {WEBHOOK_URL.rstrip('/')}{WEBHOOK_PATH}")
+
+
+async def _on_shutdown(app: web.Application) -> None:
+    state = app[STATE_KEY]
+    state.draining = True
+    if state.tasks:
+        log.info(f"⏳ Дожидаемся {len(state.tasks)} обновлений в обработке...")
+        await asyncio.wait(set(state.tasks), timeout=WEBHOOK_DRAIN_TIMEOUT)
+    await bot.close_session()
+
+
+def create_app() -> web.Application:
+    state = WebhookState()
+    state.api_send_message = install_direct_replies(bot)
+    app = web.Application()
+    app[STATE_KEY] = state
+    app.router.add_post(WEBHOOK_PATH, handle_update)
+    app.router.add_get("/health", handle_health)
+    add_api_routes(app)
+    app.on_startup.append(_on_startup)
+    app.on_shutdown.append(_on_shutdown)
+    return app
+
+
+async def run_webhook() -> None:
+    """Запускает webhook-сервер и работает до Ctrl+C или SIGTERM"""
+    runner = web.AppRunner(create_app())
+    await runner.setup()
+    site = web.TCPSite(runner, WEBHOOK_HOST, WEBHOOK_PORT)
+    await site.start()
+    log.info(f"🌐 Webhook-сервер слушает {WEBHOOK_HOST}:{WEBHOOK_PORT}{WEBHOOK_PATH}")
+
+    stop = asyncio.Event()
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+    except (NotImplementedError, RuntimeError):
+        pass  # Windows — останавливаемся только по Ctrl+C
+
+    try:
+        await stop.wait()
+    finally:
+        await runner.cleanup()
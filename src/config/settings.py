@@ -1,4 +1,5 @@
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 
 load_dotenv()  
@@ -13,4 +14,74 @@ BASE_URL = os.getenv(
 
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD")
 if not ADMIN_PASSWORD:
-    raise ValueError("ADMIN_PASSWORD не установлен в .env! Добавьте строку ADMIN_PASSWORD=ваш_пароль")
\ No newline at end of file
+    raise ValueError("ADMIN_PASSWORD не установлен в .env! Добавьте строку ADMIN_PASSWORD=ваш_пароль")
+
+# Режим получения обновлений: polling (по умолчанию) или webhook
+BOT_MODE = os.getenv("BOT_MODE", "polling").lower()
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")  # публичный адрес, например https://bot.example.com
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("PORT", os.getenv("WEBHOOK_PORT", "8080")))
+WEBHOOK_REPLY_TIMEOUT = float(os.getenv("WEBHOOK_REPLY_TIMEOUT", "2"))
+WEBHOOK_DRAIN_TIMEOUT = float(os.getenv("WEBHOOK_DRAIN_TIMEOUT", "10"))
+if BOT_MODE == "webhook" and not WEBHOOK_SECRET:
+    raise ValueError("WEBHOOK_SECRET не установлен в .env! Он нужен для режима webhook")
+
+# Свой адрес Bot API (локальный telegram-bot-api или поддельный сервер для бенчмарков)
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "")
+
+# Количество процессов-обработчиков; больше 1 — обновления шардируются по chat.id
+BOT_WORKERS = int(os.getenv("BOT_WORKERS", "1"))
+
+# Время ежедневной рассылки расписания на завтра (местное, ЧЧ:ММ)
+DIGEST_TIME = os.getenv("DIGEST_TIME", "19:00")
+
+# Локальный HTTP-сервер с метриками в формате Prometheus (GET /metrics); порт 0 — выключен
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+
+# Профилировщик из админ-панели: сколько секунд снимать выборки и сколько функций показать
+PROFILE_SECONDS = int(os.getenv("PROFILE_SECONDS", "30"))
+PROFILE_TOP = int(os.getenv("PROFILE_TOP", "30"))
+
+# Смещение местного времени колледжа от UTC в часах (Казань — UTC+3): по нему считаются
+# «сегодня», текущая пара и время рассылки, а время пар в .ics переводится в UTC
+SCHEDULE_UTC_OFFSET = float(os.getenv("SCHEDULE_UTC_OFFSET", "3"))
+
+# HTTP API расписаний только для чтения (/api/groups, /api/teachers, календари .ics).
+# В режиме webhook оно работает на порту webhook; в polling — на API_PORT (0 — выключено)
+API_HOST = os.getenv("API_HOST", "0.0.0.0")
+API_PORT = int(os.getenv("API_PORT", "0"))
+API_PUBLIC_URL = os.getenv("API_PUBLIC_URL", "")  # внешний адрес API для ссылок на календари; по умолчанию WEBHOOK_URL
+
+# Хранилище: sqlite (по умолчанию) или memory — в памяти, без диска (для бенчмарков и отладки)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "sqlite").lower()
+DATABASE_PATH = os.getenv("DATABASE_PATH", "")  # пусто — data/schedule_bot.db в корне проекта
+
+# Сессии пользователей: через сколько часов простоя вытеснять и сохранять ли их между перезапусками
+SESSION_TTL = float(os.getenv("SESSION_TTL_HOURS", "12")) * 3600
+SESSION_PERSIST = os.getenv("SESSION_PERSIST", "0") == "1"
+
+# Общий лимит отправки, сообщений в секунду на всего бота (лимит Telegram)
+OUTBOX_GLOBAL_RATE = float(os.getenv("OUTBOX_GLOBAL_RATE", "30"))
+
+# Фоновые задачи админки: сколько тяжёлых задач одновременно и сколько завершённых помнить
+JOBS_CONCURRENCY = int(os.getenv("JOBS_CONCURRENCY", "1"))
+JOBS_HISTORY = int(os.getenv("JOBS_HISTORY", "20"))
+
+# Как часто слать подписчикам потока событий сводку кэша и очереди, с
+EVENTS_STATS_INTERVAL = float(os.getenv("EVENTS_STATS_INTERVAL", "2"))
+
+# Обновления дольше этого (мс) попадают в лог вместе с трассой
+SLOW_UPDATE_MS = float(os.getenv("SLOW_UPDATE_MS", "1000"))
+
+# Логирование
+LOG_DIR = Path(os.getenv("LOG_DIR", "logs"))
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Уровни отдельных логгеров: "schedule_bot.db=DEBUG,TeleBot=WARNING"
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+LOG_ROTATION = os.getenv("LOG_ROTATION", "size").lower()  # size — по размеру, time — по времени
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN", "midnight")
+LOG_BACKUPS = int(os.getenv("LOG_BACKUPS", "7"))
@@ -0,0 +1,95 @@
+from typing import Any, Dict, List, Optional, Protocol, Tuple
+
+
+class ScheduleStorage(Protocol):
+    """
+    Общий интерфейс хранилища бота.
+    Ему следуют SQLiteDatabase (на диске) и MemoryDatabase (в памяти).
+    """
+
+    async def connect(self) -> None:
+        """Подготовка хранилища к работе"""
+        ...
+
+    async def close(self) -> None:
+        """Освобождение ресурсов хранилища"""
+        ...
+
+    async def save_schedule(self, group_name: str, schedule_data: Dict, week_start: str) -> int:
+        """Сохраняет расписание группы и возвращает ID записи"""
+        ...
+
+    async def get_schedule(self, group_name: str, week_start: Optional[str] = None) -> Optional[Dict]:
+        """Возвращает актуальное расписание группы или None"""
+        ...
+
+    async def save_to_cache(self, group_name: str, schedule_data: Dict, ttl_hours: int = 1) -> None:
+        """Кладёт расписание в кэш с временем жизни"""
+        ...
+
+    async def get_from_cache(self, group_name: str) -> Optional[Dict]:
+        """Возвращает непросроченные данные из кэша или None"""
+        ...
+
+    async def save_user_preference(self, user_id: int, group_name: str) -> None:
+        """Запоминает выбранную пользователем группу"""
+        ...
+
+    async def get_user_group(self, user_id: int) -> Optional[str]:
+        """Возвращает сохранённую группу пользователя или None"""
+        ...
+
+    async def set_digest_subscription(self, user_id: int, enabled: bool) -> None:
+        """Подписывает пользователя на ежедневную рассылку или отписывает"""
+        ...
+
+    async def is_digest_subscribed(self, user_id: int) -> bool:
+        """Подписан ли пользователь на ежедневную рассылку"""
+        ...
+
+    async def get_digest_subscribers(self) -> Dict[str, List[int]]:
+        """Возвращает {group_name: [user_id, ...]} подписчиков рассылки"""
+        ...
+
+    async def log_request(self, user_id: int, group_name: str, day: str) -> None:
+        """Записывает запрос расписания в лог"""
+        ...
+
+    async def get_statistics(self) -> Dict[str, Any]:
+        """Возвращает total_users, total_requests и popular_groups"""
+        ...
+
+    async def cleanup_old_data(self, days_old: int = 30) -> None:
+        """Удаляет старые логи, деактивирует старые расписания и чистит кэш"""
+        ...
+
+    async def get_database_info(self) -> Dict[str, Any]:
+        """Возвращает путь к хранилищу и количество записей по таблицам"""
+        ...
+
+    async def get_all_schedules(self) -> Dict[str, Dict]:
+        """Возвращает {group_name: schedule_data} по всем активным расписаниям"""
+        ...
+
+    async def get_group_names(self) -> List[str]:
+        """Возвращает отсортированные названия групп с актуальным расписанием"""
+        ...
+
+    async def list_users(self, after_user_id: Optional[int] = None, limit: int = 50,
+                         group_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Страница пользователей по возрастанию user_id после after_user_id"""
+        ...
+
+    async def list_logs(self, before_id: Optional[int] = None, limit: int = 50,
+                        user_id: Optional[int] = None, group_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Страница логов, новые сверху, с id меньше before_id"""
+        ...
+
+    async def list_schedules(self, after: Optional[Tuple[str, str]] = None, limit: int = 50,
+                             group_prefix: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Страница расписаний по (group_name, week_start) после after"""
+        ...
+
+    async def backup(self, target_path: Optional[str] = None) -> Dict[str, Any]:
+        """Делает снимок хранилища и возвращает путь, размер и длительность"""
+        ...
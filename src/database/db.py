@@ -1,13 +1,32 @@
 import aiosqlite
 import asyncio
+import sqlite3
+import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import json
-from dotenv import load_dotenv
 from pathlib import Path
-from src.utils.logger import log
+from src.config.settings import DATABASE_PATH, STORAGE_BACKEND
+from src.database.base import ScheduleStorage
+from src.database.memory import MemoryDatabase
+from src.utils.events import events
+from src.utils.logger import get_logger
+from src.utils.metrics import registry, timed
+from src.utils.tracing import traced
+
+
+log = get_logger("db")
+
+BACKUP_STEP_PAGES = 4096  # ~16 МБ за шаг при странице 4 КБ: меньше шагов — меньше перезапусков от записи бота
+BACKUP_TIMEOUT = 300.0  # секунд на резервную копию
+
+DB_QUERY_SECONDS = registry.histogram("db_query_seconds", "Длительность запросов SQLiteDatabase по методам", ["method"])
+
+
+def _timed_query(func):
+    """Замеряет каждый вызов метода БД в DB_QUERY_SECONDS с меткой method и пишет отрезок в трассу"""
+    return traced(f"db.{func.__name__}")(timed(DB_QUERY_SECONDS, method=func.__name__)(func))
 
-load_dotenv()
 
 class SQLiteDatabase:
     """
@@ -25,19 +44,25 @@ class SQLiteDatabase:
             cls._instance = super(SQLiteDatabase, cls).__new__(cls)
         return cls._instance
     
-    async def connect(self) -> None:
-        """Подключение к базе данных в папке data/"""
+    async def connect(self, db_path: Optional[str] = None) -> None:
+        """Подключение к базе данных (по умолчанию в папке data/)"""
         if not self._is_connected or self._db is None:
-            # Определяем путь: корень проекта / data / schedule_bot.db
-            project_root = Path(__file__).resolve().parent.parent.parent
-            data_dir = project_root / "data"
-            data_dir.mkdir(parents=True, exist_ok=True)  # Создаём папку, если нет
+            if db_path is None:
+                db_path = DATABASE_PATH or None
+            if db_path is None:
+                # Определяем путь: корень проекта / data / schedule_bot.db
+                project_root = Path(__file__).resolve().parent.parent.parent
+                data_dir = project_root / "data"
+                data_dir.mkdir(parents=True, exist_ok=True)  # Создаём папку, если нет
+                db_path = str(data_dir / "schedule_bot.db")
             
-            db_path = data_dir / "schedule_bot.db"
-            self._db_path = str(db_path)  # Сохраняем путь для info
+            self._db_path = db_path  # Сохраняем путь для info
             
             self._db = await aiosqlite.connect(self._db_path)
             self._db.row_factory = aiosqlite.Row
+            # WAL: читатели не ждут писателя — важно, когда к файлу ходят несколько процессов
+            await self._db.execute("PRAGMA journal_mode=WAL")
+            await self._db.execute("PRAGMA busy_timeout=5000")
             self._is_connected = True
             await self._create_tables()
             log.info(f"✅ Подключение к SQLite установлено: {self._db_path}")
@@ -95,15 +120,28 @@ class SQLiteDatabase:
         )
         ''')
         
+        # Отдельная таблица: INSERT OR REPLACE в users не должен сбрасывать подписку
+        await db.execute('''
+        CREATE TABLE IF NOT EXISTS digest_subscriptions (
+            user_id INTEGER PRIMARY KEY,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
+        
         await db.execute('CREATE INDEX IF NOT EXISTS idx_schedules_group ON schedules(group_name, is_active)')
         await db.execute('CREATE INDEX IF NOT EXISTS idx_cache_group ON cache(group_name)')
         await db.execute('CREATE INDEX IF NOT EXISTS idx_users_id ON users(user_id)')
         await db.execute('CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON logs(timestamp)')
         await db.execute('CREATE INDEX IF NOT EXISTS idx_cache_expire ON cache(expire_at)')
+        # Для постраничного просмотра с фильтрами в админ-панели
+        await db.execute('CREATE INDEX IF NOT EXISTS idx_users_group ON users(group_name, user_id)')
+        await db.execute('CREATE INDEX IF NOT EXISTS idx_logs_user ON logs(user_id, id)')
+        await db.execute('CREATE INDEX IF NOT EXISTS idx_logs_group ON logs(group_name, id)')
         
         await db.commit()
-        print("✅ Таблицы базы данных созданы/проверены")
+        log.info("✅ Таблицы базы данных созданы/проверены")
     
+    @_timed_query
     async def save_schedule(self, group_name: str, schedule_data: Dict, week_start: str) -> int:
         """
         Сохраняет расписание группы в базу данных.
@@ -135,7 +173,7 @@ class SQLiteDatabase:
             # Также сохраняем в кэш
             await self.save_to_cache(group_name, schedule_data)
             
-            print(f"✅ Расписание для группы {group_name} сохранено в SQLite")
+            log.debug(f"✅ Расписание для группы {group_name} сохранено в SQLite")
             
             # Получаем ID вставленной записи
             cursor = await db.execute('SELECT last_insert_rowid()')
@@ -143,9 +181,10 @@ class SQLiteDatabase:
             return result[0] if result else 0
             
         except Exception as e:
-            print(f"❌ Ошибка сохранения расписания: {e}")
+            log.error(f"❌ Ошибка сохранения расписания: {e}")
             raise
     
+    @_timed_query
     async def get_schedule(self, group_name: str, week_start: Optional[str] = None) -> Optional[Dict]:
         """
         Получает расписание группы из базы данных.
@@ -164,7 +203,7 @@ class SQLiteDatabase:
             # Сначала проверяем кэш
             cached = await self.get_from_cache(group_name)
             if cached:
-                print(f"📦 Используем кэшированные данные для {group_name}")
+                log.debug(f"📦 Используем кэшированные данные для {group_name}")
                 return cached
             
             # Ищем в основном хранилище
@@ -195,9 +234,10 @@ class SQLiteDatabase:
             return None
             
         except Exception as e:
-            print(f"❌ Ошибка получения расписания: {e}")
+            log.error(f"❌ Ошибка получения расписания: {e}")
             return None
     
+    @_timed_query
     async def save_to_cache(self, group_name: str, schedule_data: Dict, ttl_hours: int = 1) -> None:
         """
         Сохраняет данные в кэш с TTL (время жизни).
@@ -223,8 +263,9 @@ class SQLiteDatabase:
             await db.commit()
             
         except Exception as e:
-            print(f"❌ Ошибка сохранения в кэш: {e}")
+            log.error(f"❌ Ошибка сохранения в кэш: {e}")
     
+    @_timed_query
     async def get_from_cache(self, group_name: str) -> Optional[Dict]:
         """
         Получает данные из кэша.
@@ -252,9 +293,10 @@ class SQLiteDatabase:
             return None
             
         except Exception as e:
-            print(f"❌ Ошибка получения из кэша: {e}")
+            log.error(f"❌ Ошибка получения из кэша: {e}")
             return None
     
+    @_timed_query
     async def save_user_preference(self, user_id: int, group_name: str) -> None:
         """
         Сохраняет предпочтения пользователя.
@@ -275,11 +317,12 @@ class SQLiteDatabase:
             
             await db.commit()
             
-            print(f"✅ Предпочтения пользователя {user_id} сохранены")
+            log.debug(f"✅ Предпочтения пользователя {user_id} сохранены")
             
         except Exception as e:
-            print(f"❌ Ошибка сохранения предпочтений: {e}")
+            log.error(f"❌ Ошибка сохранения предпочтений: {e}")
     
+    @_timed_query
     async def get_user_group(self, user_id: int) -> Optional[str]:
         """
         Получает сохраненную группу пользователя.
@@ -303,9 +346,83 @@ class SQLiteDatabase:
             return row['group_name'] if row else None
             
         except Exception as e:
-            print(f"❌ Ошибка получения группы пользователя: {e}")
+            log.error(f"❌ Ошибка получения группы пользователя: {e}")
             return None
     
+    @_timed_query
+    async def set_digest_subscription(self, user_id: int, enabled: bool) -> None:
+        """
+        Включает или выключает ежедневную рассылку расписания на завтра.
+        
+        Args:
+            user_id (int): ID пользователя в Telegram
+            enabled (bool): Подписать (True) или отписать (False)
+        """
+        await self.connect()
+        db = self._ensure_connected()
+        
+        try:
+            if enabled:
+                await db.execute(
+                    'INSERT OR IGNORE INTO digest_subscriptions (user_id, created_at) VALUES (?, ?)',
+                    (user_id, datetime.utcnow())
+                )
+            else:
+                await db.execute('DELETE FROM digest_subscriptions WHERE user_id = ?', (user_id,))
+            await db.commit()
+            
+        except Exception as e:
+            log.error(f"❌ Ошибка изменения подписки на рассылку: {e}")
+    
+    @_timed_query
+    async def is_digest_subscribed(self, user_id: int) -> bool:
+        """
+        Проверяет, подписан ли пользователь на ежедневную рассылку.
+        
+        Args:
+            user_id (int): ID пользователя в Telegram
+            
+        Returns:
+            bool: True, если подписан
+        """
+        await self.connect()
+        db = self._ensure_connected()
+        
+        try:
+            cursor = await db.execute('SELECT 1 FROM digest_subscriptions WHERE user_id = ?', (user_id,))
+            return await cursor.fetchone() is not None
+            
+        except Exception as e:
+            log.error(f"❌ Ошибка проверки подписки на рассылку: {e}")
+            return False
+    
+    @_timed_query
+    async def get_digest_subscribers(self) -> Dict[str, List[int]]:
+        """
+        Возвращает подписчиков рассылки, сгруппированных по сохранённой группе.
+        
+        Returns:
+            Dict[str, List[int]]: {group_name: [user_id, ...]}
+        """
+        await self.connect()
+        db = self._ensure_connected()
+        
+        try:
+            cursor = await db.execute('''
+            SELECT u.group_name, u.user_id
+            FROM digest_subscriptions d
+            JOIN users u ON u.user_id = d.user_id
+            ''')
+            result: Dict[str, List[int]] = {}
+            async for row in cursor:
+                result.setdefault(row['group_name'], []).append(row['user_id'])
+            return result
+            
+        except Exception as e:
+            log.error(f"❌ Ошибка получения подписчиков рассылки: {e}")
+            return {}
+    
+    @_timed_query
     async def log_request(self, user_id: int, group_name: str, day: str) -> None:
         """
         Логирует запросы пользователей.
@@ -325,10 +442,12 @@ class SQLiteDatabase:
             ''', (user_id, group_name, day, datetime.utcnow()))
             
             await db.commit()
+            events.publish("request", user_id=user_id, group=group_name, day=day)
             
         except Exception as e:
-            print(f"❌ Ошибка логирования: {e}")
+            log.error(f"❌ Ошибка логирования: {e}")
     
+    @_timed_query
     async def get_statistics(self) -> Dict[str, Any]:
         """
         Получает статистику использования бота.
@@ -369,13 +488,14 @@ class SQLiteDatabase:
             }
             
         except Exception as e:
-            print(f"Ошибка получения статистики: {e}")
+            log.error(f"❌ Ошибка получения статистики: {e}")
             return {
                 'total_users': 0,
                 'total_requests': 0,
                 'popular_groups': []
             }
     
+    @_timed_query
     async def cleanup_old_data(self, days_old: int = 30) -> None:
         """
         Удаляет старые данные.
@@ -412,13 +532,14 @@ class SQLiteDatabase:
             
             await db.commit()
             
-            print(f"🧹 Очистка данных: удалено {deleted_logs} логов, "
-                  f"деактивировано {deactivated_schedules} расписаний, "
-                  f"удалено {deleted_cache} кэшей")
+            log.info(f"🧹 Очистка данных: удалено {deleted_logs} логов, "
+                     f"деактивировано {deactivated_schedules} расписаний, "
+                     f"удалено {deleted_cache} кэшей")
             
         except Exception as e:
-            print(f"❌ Ошибка очистки данных: {e}")
+            log.error(f"❌ Ошибка очистки данных: {e}")
     
+    @_timed_query
     async def get_database_info(self) -> Dict[str, Any]:
         """
         Получает информацию о базе данных.
@@ -447,9 +568,10 @@ class SQLiteDatabase:
             return info
             
         except Exception as e:
-            print(f"❌ Ошибка получения информации о БД: {e}")
+            log.error(f"❌ Ошибка получения информации о БД: {e}")
             return {}
             
+    @_timed_query
     async def get_all_schedules(self) -> Dict[str, Dict]:
         """
         Возвращает все актуальные расписания для всех групп.
@@ -478,19 +600,230 @@ class SQLiteDatabase:
                 schedule_data = json.loads(schedule_json)
                 result[group_name] = schedule_data
             
-            print(f"📚 Загружено {len(result)} актуальных расписаний для поиска по преподавателям")
+            log.info(f"📚 Загружено {len(result)} актуальных расписаний для поиска по преподавателям")
             return result
             
         except Exception as e:
-            print(f"❌ Ошибка получения всех расписаний: {e}")
+            log.error(f"❌ Ошибка получения всех расписаний: {e}")
             return {}
+
+    @_timed_query
+    async def get_group_names(self) -> List[str]:
+        """
+        Названия групп с актуальным расписанием — без разбора JSON.
+
+        Returns:
+            List[str]: Отсортированный список групп
+        """
+        await self.connect()
+        db = self._ensure_connected()
+        
+        try:
+            cursor = await db.execute(
+                "SELECT DISTINCT group_name FROM schedules WHERE is_active = 1 ORDER BY group_name"
+            )
+            return [row['group_name'] async for row in cursor]
+        except Exception as e:
+            log.error(f"❌ Ошибка получения списка групп: {e}")
+            return []
+
+    @_timed_query
+    async def list_users(self, after_user_id: Optional[int] = None, limit: int = 50,
+                         group_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Страница пользователей по возрастанию user_id (keyset-пагинация).
+        
+        Args:
+            after_user_id (int, optional): Последний user_id предыдущей страницы
+            limit (int): Размер страницы
+            group_name (str, optional): Только пользователи этой группы
+        
+        Returns:
+            List[Dict]: user_id, group_name, last_activity
+        """
+        await self.connect()
+        db = self._ensure_connected()
+        
+        conditions, params = [], []
+        if after_user_id is not None:
+            conditions.append("user_id > ?")
+            params.append(after_user_id)
+        if group_name:
+            conditions.append("group_name = ?")
+            params.append(group_name)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        try:
+            cursor = await db.execute(
+                f"SELECT user_id, group_name, last_activity FROM users {where} ORDER BY user_id LIMIT ?",
+                (*params, limit)
+            )
+            return [dict(row) async for row in cursor]
+        except Exception as e:
+            log.error(f"❌ Ошибка получения списка пользователей: {e}")
+            return []
+
+    @_timed_query
+    async def list_logs(self, before_id: Optional[int] = None, limit: int = 50,
+                        user_id: Optional[int] = None, group_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Страница логов запросов, новые сверху (keyset-пагинация по id).
+        
+        Args:
+            before_id (int, optional): Последний id предыдущей страницы
+            limit (int): Размер страницы
+            user_id (int, optional): Только запросы этого пользователя
+            group_name (str, optional): Только запросы этой группы
+        
+        Returns:
+            List[Dict]: id, user_id, group_name, day, timestamp
+        """
+        await self.connect()
+        db = self._ensure_connected()
+        
+        conditions, params = [], []
+        if before_id is not None:
+            conditions.append("id < ?")
+            params.append(before_id)
+        if user_id is not None:
+            conditions.append("user_id = ?")
+            params.append(user_id)
+        if group_name:
+            conditions.append("group_name = ?")
+            params.append(group_name)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        try:
+            cursor = await db.execute(
+                f"SELECT id, user_id, group_name, day, timestamp FROM logs {where} ORDER BY id DESC LIMIT ?",
+                (*params, limit)
+            )
+            return [dict(row) async for row in cursor]
+        except Exception as e:
+            log.error(f"❌ Ошибка получения логов: {e}")
+            return []
+
+    @_timed_query
+    async def list_schedules(self, after: Optional[Tuple[str, str]] = None, limit: int = 50,
+                             group_prefix: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Страница сохранённых расписаний по (группа, неделя) — без разбора JSON.
+        
+        Args:
+            after (Tuple[str, str], optional): (group_name, week_start) последней строки предыдущей страницы
+            limit (int): Размер страницы
+            group_prefix (str, optional): Группы, начинающиеся с этой строки
+        
+        Returns:
+            List[Dict]: group_name, week_start, updated_at, is_active, size_bytes
+        """
+        await self.connect()
+        db = self._ensure_connected()
+        
+        conditions, params = [], []
+        if after is not None:
+            conditions.append("(group_name, week_start) > (?, ?)")
+            params.extend(after)
+        if group_prefix:
+            # Диапазон вместо LIKE: так SQLite идёт по индексу idx_schedules_group
+            conditions.append("group_name >= ? AND group_name < ?")
+            params.extend((group_prefix, group_prefix + "\U0010ffff"))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        try:
+            cursor = await db.execute(
+                f"""SELECT group_name, week_start, updated_at, is_active, LENGTH(schedule_data) AS size_bytes
+                FROM schedules {where} ORDER BY group_name, week_start LIMIT ?""",
+                (*params, limit)
+            )
+            return [dict(row) async for row in cursor]
+        except Exception as e:
+            log.error(f"❌ Ошибка получения списка расписаний: {e}")
+            return []
+
+    @_timed_query
+    async def backup(self, target_path: Optional[str] = None, pages: int = BACKUP_STEP_PAGES,
+                     sleep: float = 0, timeout: float = BACKUP_TIMEOUT) -> Dict[str, Any]:
+        """
+        Делает онлайн-копию базы данных через SQLite backup API.
+
+        Копирование идёт в отдельном потоке и через отдельное соединение,
+        поэтому запросы бота не блокируются (WAL: запись не ждёт чтения).
+        Запись в базу между шагами заставляет SQLite начать копирование
+        заново, поэтому шаг крупный, а перезапуски считаются и попадают в отчёт.
+
+        Args:
+            target_path (str, optional): Куда сохранить копию (по умолчанию data/backups/)
+            pages (int): Сколько страниц копировать за один шаг (-1 — всё за один шаг)
+            sleep (float): Пауза между шагами в секундах
+            timeout (float): Предел длительности; дольше — TimeoutError, неполная копия удаляется
+
+        Returns:
+            Dict: Путь, размер, длительность, скорость копирования и число перезапусков
+        """
+        await self.connect()
+
+        if target_path is None:
+            backup_dir = Path(self._db_path).parent / "backups"
+            backup_dir.mkdir(parents=True, exist_ok=True)
+            stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            target_path = str(backup_dir / f"schedule_bot_{stamp}.db")
+
+        try:
+            result = await asyncio.to_thread(self._run_backup, self._db_path, target_path, pages, sleep, timeout)
+            log.info(f"💾 Резервная копия создана: {target_path} "
+                     f"({result['size_bytes']} байт за {result['duration']:.2f} с, "
+                     f"перезапусков: {result['restarts']})")
+            return result
+        except Exception as e:
+            log.error(f"❌ Ошибка резервного копирования: {e}")
+            Path(target_path).unlink(missing_ok=True)
+            raise
+
+    @staticmethod
+    def _run_backup(source_path: str, target_path: str, pages: int, sleep: float, timeout: float) -> Dict[str, Any]:
+        """Пошаговое копирование (выполняется вне event loop)"""
+        total_pages = 0
+        copied = 0
+        restarts = 0
+        deadline = time.perf_counter() + timeout
+
+        def progress(status, remaining, total):
+            nonlocal total_pages, copied, restarts
+            done = total - remaining
+            # Скопировано меньше, чем на прошлом шаге — базу изменили и SQLite начал сначала
+            if done < copied:
+                restarts += 1
+            total_pages, copied = total, done
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"копирование дольше {timeout:.0f} с, перезапусков: {restarts}")
+
+        started = time.perf_counter()
+        source = sqlite3.connect(source_path)
+        target = sqlite3.connect(target_path)
+        try:
+            source.backup(target, pages=pages, progress=progress, sleep=sleep)
+        finally:
+            target.close()
+            source.close()
+        duration = time.perf_counter() - started
+
+        return {
+            'path': target_path,
+            'size_bytes': Path(target_path).stat().st_size,
+            'duration': duration,
+            'pages': total_pages,
+            'pages_per_sec': total_pages / duration if duration > 0 else 0.0,
+            'restarts': restarts,
+        }
+
     async def close(self) -> None:
         """Закрытие подключения к базе данных"""
         if self._db and self._is_connected:
             await self._db.close()
             self._db = None
             self._is_connected = False
-            print("🔌 Подключение к SQLite закрыто")
+            log.info("🔌 Подключение к SQLite закрыто")
 
     async def add_test_stats():
         await db.connect()
@@ -500,7 +833,8 @@ class SQLiteDatabase:
         await db.log_request(123456789, "4pk2", "Понедельник")
         await db.log_request(123456789, "4pk2", "Вся неделя")
         await db.log_request(123456789, "4pk2", "Четверг")
-        print("Тестовые данные добавлены")
+        log.info("Тестовые данные добавлены")
 
 # Создаем глобальный экземпляр базы данных
-db = SQLiteDatabase()
\ No newline at end of file
+# STORAGE_BACKEND=memory — хранилище в памяти (без диска, для бенчмарков и отладки)
+db: ScheduleStorage = MemoryDatabase() if STORAGE_BACKEND == "memory" else SQLiteDatabase()
\ No newline at end of file
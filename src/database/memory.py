@@ -0,0 +1,394 @@
+import heapq
+import json
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils.events import events
+from src.utils.logger import log
+
+
+class MemoryDatabase:
+    """
+    Хранилище целиком в памяти процесса — без дискового ввода-вывода.
+    Повторяет поведение SQLiteDatabase и нужно для бенчмарков и отладки.
+
+    Возвращаемые словари не копируются: изменять их нельзя.
+    """
+
+    def __init__(self) -> None:
+        # (group_name, week_start) -> [schedule_data, updated_at, is_active, id]
+        self._schedules: Dict[Tuple[str, str], list] = {}
+        self._schedules_by_group: Dict[str, Dict[str, list]] = {}
+        self._next_schedule_id = 1
+
+        # group_name -> (data, expire_at)
+        self._cache: Dict[str, Tuple[Dict, float]] = {}
+
+        self._users: Dict[int, str] = {}
+        self._digest_subscribers: set = set()
+
+        # Логи хранятся по столбцам: миллионы строк без объекта на каждую
+        self._strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+        self._log_users = array('q')
+        self._log_groups = array('I')
+        self._log_days = array('I')
+        self._log_times = array('d')
+        self._log_head = 0  # индекс первой живой строки после очистки
+        self._log_base = 0  # сколько строк выброшено при сжатии: id строки = _log_base + индекс + 1
+        self._group_counts: Counter = Counter()
+
+    def _intern(self, value: str) -> int:
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._strings.append(value)
+            self._string_ids[value] = string_id
+        return string_id
+
+    async def connect(self) -> None:
+        """Подключение не требуется"""
+        return None
+
+    async def close(self) -> None:
+        """Данные живут до конца процесса"""
+        return None
+
+    async def save_schedule(self, group_name: str, schedule_data: Dict, week_start: str) -> int:
+        """
+        Сохраняет расписание группы.
+
+        Args:
+            group_name (str): Название группы
+            schedule_data (Dict): Данные расписания
+            week_start (str): Начало недели (для идентификации)
+
+        Returns:
+            int: ID сохраненной записи
+        """
+        record_id = self._next_schedule_id
+        self._next_schedule_id += 1
+
+        record = [schedule_data, time.time(), True, record_id]
+        self._schedules[(group_name, week_start)] = record
+        self._schedules_by_group.setdefault(group_name, {})[week_start] = record
+
+        await self.save_to_cache(group_name, schedule_data)
+        return record_id
+
+    def _latest_record(self, group_name: str, week_start: Optional[str] = None) -> Optional[list]:
+        if week_start is not None:
+            record = self._schedules.get((group_name, week_start))
+            return record if record and record[2] else None
+
+        weeks = self._schedules_by_group.get(group_name)
+        if not weeks:
+            return None
+        active = [record for record in weeks.values() if record[2]]
+        return max(active, key=lambda record: record[1]) if active else None
+
+    async def get_schedule(self, group_name: str, week_start: Optional[str] = None) -> Optional[Dict]:
+        """
+        Получает расписание группы (сначала из кэша).
+
+        Args:
+            group_name (str): Название группы
+            week_start (str, optional): Начало недели
+
+        Returns:
+            Optional[Dict]: Данные расписания или None
+        """
+        cached = await self.get_from_cache(group_name)
+        if cached:
+            return cached
+
+        record = self._latest_record(group_name, week_start)
+        if record is None:
+            return None
+
+        await self.save_to_cache(group_name, record[0])
+        return record[0]
+
+    async def save_to_cache(self, group_name: str, schedule_data: Dict, ttl_hours: int = 1) -> None:
+        """
+        Сохраняет данные в кэш с TTL.
+
+        Args:
+            group_name (str): Название группы
+            schedule_data (Dict): Данные расписания
+            ttl_hours (int): Время жизни кэша в часах
+        """
+        self._cache[group_name] = (schedule_data, time.time() + ttl_hours * 3600)
+
+    async def get_from_cache(self, group_name: str) -> Optional[Dict]:
+        """
+        Получает данные из кэша.
+
+        Args:
+            group_name (str): Название группы
+
+        Returns:
+            Optional[Dict]: Данные из кэша или None
+        """
+        entry = self._cache.get(group_name)
+        if entry and entry[1] > time.time():
+            return entry[0]
+        return None
+
+    async def save_user_preference(self, user_id: int, group_name: str) -> None:
+        """
+        Сохраняет предпочтения пользователя.
+
+        Args:
+            user_id (int): ID пользователя в Telegram
+            group_name (str): Выбранная группа
+        """
+        self._users[user_id] = group_name
+
+    async def get_user_group(self, user_id: int) -> Optional[str]:
+        """
+        Получает сохраненную группу пользователя.
+
+        Args:
+            user_id (int): ID пользователя в Telegram
+
+        Returns:
+            Optional[str]: Название группы или None
+        """
+        return self._users.get(user_id)
+
+    async def set_digest_subscription(self, user_id: int, enabled: bool) -> None:
+        """
+        Включает или выключает ежедневную рассылку расписания на завтра.
+
+        Args:
+            user_id (int): ID пользователя в Telegram
+            enabled (bool): Подписать (True) или отписать (False)
+        """
+        if enabled:
+            self._digest_subscribers.add(user_id)
+        else:
+            self._digest_subscribers.discard(user_id)
+
+    async def is_digest_subscribed(self, user_id: int) -> bool:
+        return user_id in self._digest_subscribers
+
+    async def get_digest_subscribers(self) -> Dict[str, List[int]]:
+        """
+        Возвращает подписчиков рассылки, сгруппированных по сохранённой группе.
+
+        Returns:
+            Dict[str, List[int]]: {group_name: [user_id, ...]}
+        """
+        result: Dict[str, List[int]] = {}
+        for user_id in self._digest_subscribers:
+            group_name = self._users.get(user_id)
+            if group_name is not None:
+                result.setdefault(group_name, []).append(user_id)
+        return result
+
+    async def log_request(self, user_id: int, group_name: str, day: str) -> None:
+        """
+        Логирует запросы пользователей.
+
+        Args:
+            user_id (int): ID пользователя
+            group_name (str): Запрошенная группа
+            day (str): Запрошенный день
+        """
+        self.append_log(user_id, group_name, day, time.time())
+        events.publish("request", user_id=user_id, group=group_name, day=day)
+
+    def append_log(self, user_id: int, group_name: str, day: str, timestamp: float) -> None:
+        """Добавляет строку лога с заданным временем (для массовой загрузки)"""
+        group_id = self._intern(group_name)
+        self._log_users.append(user_id)
+        self._log_groups.append(group_id)
+        self._log_days.append(self._intern(day))
+        self._log_times.append(timestamp)
+        self._group_counts[group_id] += 1
+
+    async def get_statistics(self) -> Dict[str, Any]:
+        """
+        Получает статистику использования бота.
+        """
+        return {
+            'total_users': len(self._users),
+            'total_requests': len(self._log_times) - self._log_head,
+            'popular_groups': [
+                {'_id': self._strings[group_id], 'count': count}
+                for group_id, count in self._group_counts.most_common(5)
+            ]
+        }
+
+    async def cleanup_old_data(self, days_old: int = 30) -> None:
+        """
+        Удаляет старые данные.
+
+        Args:
+            days_old (int): Удалять данные старше N дней
+        """
+        now = time.time()
+        cutoff = now - days_old * 86400
+
+        # Логи пишутся по возрастанию времени — отрезаем голову бинарным поиском
+        new_head = bisect_left(self._log_times, cutoff, lo=self._log_head)
+        deleted_logs = new_head - self._log_head
+        for i in range(self._log_head, new_head):
+            self._group_counts[self._log_groups[i]] -= 1
+        self._log_head = new_head
+        if deleted_logs:
+            self._group_counts = +self._group_counts  # убираем нулевые счётчики
+
+        # Сжимаем массивы, когда мёртвых строк больше половины
+        if self._log_head and self._log_head * 2 >= len(self._log_times):
+            for column in (self._log_users, self._log_groups, self._log_days, self._log_times):
+                del column[:self._log_head]
+            self._log_base += self._log_head
+            self._log_head = 0
+
+        deactivated_schedules = 0
+        for record in self._schedules.values():
+            if record[2] and record[1] < cutoff:
+                record[2] = False
+                deactivated_schedules += 1
+
+        expired = [group for group, (_, expire_at) in self._cache.items() if expire_at < now]
+        for group in expired:
+            del self._cache[group]
+
+        log.info(f"🧹 Очистка данных (память): удалено {deleted_logs} логов, "
+                 f"деактивировано {deactivated_schedules} расписаний, "
+                 f"удалено {len(expired)} кэшей")
+
+    async def get_database_info(self) -> Dict[str, Any]:
+        """
+        Получает информацию о хранилище.
+
+        Returns:
+            Dict: Информация о хранилище
+        """
+        return {
+            'database_path': ':memory:',
+            'tables': {
+                'schedules': len(self._schedules),
+                'cache': len(self._cache),
+                'users': len(self._users),
+                'digest_subscriptions': len(self._digest_subscribers),
+                'logs': len(self._log_times) - self._log_head
+            }
+        }
+
+    async def get_all_schedules(self) -> Dict[str, Dict]:
+        """
+        Возвращает все актуальные расписания для всех групп.
+
+        Returns:
+            Dict[str, Dict]: {group_name: schedule_data}
+        """
+        result = {}
+        for group_name in self._schedules_by_group:
+            record = self._latest_record(group_name)
+            if record is not None:
+                result[group_name] = record[0]
+        return result
+
+    async def get_group_names(self) -> List[str]:
+        """Названия групп с актуальным расписанием"""
+        return sorted(group for group in self._schedules_by_group if self._latest_record(group) is not None)
+
+    async def list_users(self, after_user_id: Optional[int] = None, limit: int = 50,
+                         group_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Страница пользователей по возрастанию user_id"""
+        user_ids = heapq.nsmallest(limit, (
+            user_id for user_id, group in self._users.items()
+            if (after_user_id is None or user_id > after_user_id) and (not group_name or group == group_name)
+        ))
+        return [{'user_id': user_id, 'group_name': self._users[user_id], 'last_activity': None} for user_id in user_ids]
+
+    async def list_logs(self, before_id: Optional[int] = None, limit: int = 50,
+                        user_id: Optional[int] = None, group_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Страница логов, новые сверху"""
+        end = len(self._log_times)
+        if before_id is not None:
+            end = min(end, before_id - 1 - self._log_base)
+        group_id = self._string_ids.get(group_name) if group_name else None
+        if group_name and group_id is None:
+            return []
+
+        result = []
+        for i in range(end - 1, self._log_head - 1, -1):
+            if len(result) >= limit:
+                break
+            if user_id is not None and self._log_users[i] != user_id:
+                continue
+            if group_id is not None and self._log_groups[i] != group_id:
+                continue
+            result.append({
+                'id': self._log_base + i + 1,
+                'user_id': self._log_users[i],
+                'group_name': self._strings[self._log_groups[i]],
+                'day': self._strings[self._log_days[i]],
+                'timestamp': datetime.fromtimestamp(self._log_times[i]).strftime("%Y-%m-%d %H:%M:%S"),
+            })
+        return result
+
+    async def list_schedules(self, after: Optional[Tuple[str, str]] = None, limit: int = 50,
+                             group_prefix: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Страница расписаний по (group_name, week_start)"""
+        keys = heapq.nsmallest(limit, (
+            key for key in self._schedules
+            if (after is None or key > after) and (not group_prefix or key[0].startswith(group_prefix))
+        ))
+        result = []
+        for group_name, week_start in keys:
+            _, updated_at, is_active, _ = self._schedules[(group_name, week_start)]
+            result.append({
+                'group_name': group_name,
+                'week_start': week_start,
+                'updated_at': datetime.fromtimestamp(updated_at).strftime("%Y-%m-%d %H:%M:%S"),
+                'is_active': is_active,
+                'size_bytes': None,  # JSON в памяти не хранится
+            })
+        return result
+
+    async def backup(self, target_path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Сохраняет расписания и пользователей в JSON-снимок.
+
+        Args:
+            target_path (str, optional): Куда сохранить снимок (по умолчанию data/backups/)
+
+        Returns:
+            Dict: Путь, размер и длительность
+        """
+        if target_path is None:
+            backup_dir = Path(__file__).resolve().parent.parent.parent / "data" / "backups"
+            backup_dir.mkdir(parents=True, exist_ok=True)
+            stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            target_path = str(backup_dir / f"schedule_bot_{stamp}.json")
+
+        started = time.perf_counter()
+        snapshot = {
+            'schedules': [
+                {'group_name': group, 'week_start': week, 'schedule_data': record[0], 'is_active': record[2]}
+                for (group, week), record in self._schedules.items()
+            ],
+            'users': self._users,
+            'digest_subscriptions': sorted(self._digest_subscribers)
+        }
+        Path(target_path).write_text(json.dumps(snapshot, ensure_ascii=False), encoding="utf-8")
+        duration = time.perf_counter() - started
+
+        return {
+            'path': target_path,
+            'size_bytes': Path(target_path).stat().st_size,
+            'duration': duration,
+            'pages': 0,
+            'pages_per_sec': 0.0
+        }
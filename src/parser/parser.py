@@ -5,6 +5,12 @@ from fake_useragent import UserAgent
 import re
 from datetime import datetime
 import ssl
+from urllib.parse import parse_qs, urlparse
+
+from src.utils.logger import get_logger
+from src.utils.metrics import registry
+
+log = get_logger("parser")
 
 user_agent = UserAgent().random
 headers = {'user-agent': user_agent}
@@ -13,6 +19,9 @@ ssl_context = ssl.create_default_context()
 ssl_context.check_hostname = False
 ssl_context.verify_mode = ssl.CERT_NONE
 
+SCRAPE_SECONDS = registry.histogram("scrape_seconds", "Загрузка (fetch) и разбор (parse) страницы расписания",
+                                    ["group", "stage"])
+
 async def fetch_html(session, url):
     """Асинхронное получение HTML контента"""
     try:
@@ -20,52 +29,21 @@ async def fetch_html(session, url):
             response.raise_for_status()
             return await response.text()
     except Exception as e:
-        print(f"Ошибка при получении {url}: {e}")
+        log.error(f"❌ Ошибка при получении {url}: {e}")
         return None
 
 async def get_info(url):
     """Асинхронная версия функции get_info"""
+    group = parse_qs(urlparse(url).query).get('group', [''])[0]
     async with aiohttp.ClientSession() as session:
-        html_content = await fetch_html(session, url)
+        with SCRAPE_SECONDS.time(group=group, stage="fetch"):
+            html_content = await fetch_html(session, url)
         
         if not html_content:
             return {}
         
-        html = BS(html_content, 'html.parser')
-        
-        schedule_dict = {}
-        days = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday']
-        
-        title_tag = html.find('p', align="center")
-        date_range = ""
-        if title_tag:
-            date_text = title_tag.get_text(strip=True)
-            date_match = re.search(r'на\s+(\d{2}\.\d{2}\.\d{4}-\d{2}\.\d{2}\.\d{4})', date_text)
-            if date_match:
-                date_range = date_match.group(1)
-        
-        week_dates = get_week_dates(date_range)
-        
-        for day in days:
-            day_cell = html.find('td', id=day)
-            if day_cell:
-                lessons = day_cell.find_all('li')
-                day_lessons = []
-                
-                for lesson in lessons:
-                    text = lesson.get_text(strip=True)
-                    if text:
-                        day_lessons.append(text)
-                
-                schedule_dict[day] = {
-                    'lessons': day_lessons,
-                    'date': week_dates.get(day, '')
-                }
-        
-        schedule_dict['date_range'] = date_range
-        schedule_dict['current_day'] = get_current_day_date(date_range)
-        
-        return schedule_dict
+        with SCRAPE_SECONDS.time(group=group, stage="parse"):
+            return process_html_content(html_content)
 
 async def get_info_multiple_urls(urls):
     """Получение информации с нескольких URL асинхронно"""
@@ -212,7 +190,7 @@ async def main():
     url = "https://example.com/schedule"
     
     schedule = await get_info(url)
-    print(schedule)
+    log.info(schedule)
     
     urls = [
         "https://example.com/schedule1",
@@ -222,8 +200,7 @@ async def main():
     
     schedules = await get_info_multiple_urls(urls)
     for i, schedule in enumerate(schedules):
-        print(f"\nSchedule {i+1}:")
-        print(schedule)
+        log.info(f"Schedule {i+1}: {schedule}")
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,20 @@
+from datetime import date, datetime, timedelta, timezone
+
+from src.config.settings import SCHEDULE_UTC_OFFSET
+
+# Часовой пояс колледжа: расписание, рассылка и «текущая пара» живут по нему, а не по часам сервера
+COLLEGE_TZ = timezone(timedelta(hours=SCHEDULE_UTC_OFFSET))
+
+
+def college_now() -> datetime:
+    """Текущее время колледжа без tzinfo — его можно сравнивать со временем пар и ЧЧ:ММ рассылки"""
+    return datetime.now(COLLEGE_TZ).replace(tzinfo=None)
+
+
+def college_today() -> date:
+    return college_now().date()
+
+
+def to_utc(local: datetime) -> datetime:
+    """Местное время колледжа (без tzinfo) -> время UTC с tzinfo"""
+    return local.replace(tzinfo=COLLEGE_TZ).astimezone(timezone.utc)
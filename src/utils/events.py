@@ -0,0 +1,56 @@
+import asyncio
+import time
+from typing import Any, Dict, Set
+
+from src.utils.metrics import registry
+
+QUEUE_SIZE = 1000  # событий на подписчика; медленный подписчик теряет новые, а не тормозит бота
+
+EVENTS_DROPPED = registry.counter("events_dropped_total", "События, не влезшие в очередь подписчика")
+
+
+class EventBus:
+    """
+    Лёгкие события процесса бота для живых подписчиков (админ-панели).
+
+    publish() не ждёт и не ходит в сеть: событие кладётся в очередь каждого
+    подписчика, а пока подписчиков нет — просто отбрасывается.
+    """
+
+    def __init__(self, queue_size: int = QUEUE_SIZE) -> None:
+        self.queue_size = queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, kind: str, /, **data: Any) -> None:
+        """
+        Отправляет событие всем подписчикам.
+
+        Args:
+            kind (str): Тип события: request, preload, error, stats...
+            **data: Поля события (должны сериализоваться в JSON)
+        """
+        if not self._subscribers:
+            return
+        event: Dict[str, Any] = {"type": kind, "ts": time.time(), **data}
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                EVENTS_DROPPED.inc()
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+
+events = EventBus()
+
+registry.gauge("events_subscribers", "Подключённые подписчики потока событий", function=lambda: events.subscribers)
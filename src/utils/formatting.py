@@ -63,8 +63,57 @@ def format_weekly_schedule(schedule_data, group_name):
         
         response += "\n"
     
-    # Обрезаем, если слишком длинное
-    if len(response) > 4000:
-        response = response[:4000] + "\n\n... (сообщение слишком длинное)"
+    # Длинный текст не обрезаем — при отправке он делится на страницы (src/bot/pagination.py)
+    return response
+
+def format_teacher_schedule(teacher_name, days, date_range=''):
+    """
+    Форматирование недельного расписания преподавателя по всем группам.
+    days: {day_key: {'date': ..., 'lessons': [(текст пары, группа), ...]}}, пары уже отсортированы
+    """
+    day_names = {
+        'monday': 'ПОНЕДЕЛЬНИК',
+        'tuesday': 'ВТОРНИК',
+        'wednesday': 'СРЕДА',
+        'thursday': 'ЧЕТВЕРГ',
+        'friday': 'ПЯТНИЦА',
+        'saturday': 'СУББОТА'
+    }
+    
+    response = f"РАСПИСАНИЕ ПРЕПОДАВАТЕЛЯ\n{teacher_name}\n"
+    if date_range:
+        response += f"Период: {date_range}\n"
+    response += "\n" + "="*30 + "\n\n"
     
-    return response
\ No newline at end of file
+    for day_key, day_name in day_names.items():
+        day_data = days.get(day_key, {})
+        lessons = day_data.get('lessons', [])
+        date = day_data.get('date', '')
+        
+        response += f"▫️ {day_name}\n"
+        if date:
+            response += f"{date}\n"
+        
+        if lessons:
+            for lesson, group in lessons:
+                response += f"  {lesson} — {group}\n"
+        else:
+            response += "  🎉 Занятий нет\n"
+        
+        response += "\n"
+    
+    return response
+
+
+def format_free_rooms(day_name, pair, times, rooms, total):
+    """Список свободных кабинетов на пару"""
+    response = f"🚪 <b>Свободные кабинеты</b>\n{day_name}, {pair} пара"
+    if times:
+        response += f" ({times[0]}–{times[1]})"
+    response += "\n\n"
+    if rooms:
+        response += ", ".join(rooms)
+        response += f"\n\nСвободно: <b>{len(rooms)}</b> из {total} кабинетов, встречающихся в расписании"
+    else:
+        response += "Все известные кабинеты заняты 😔"
+    return response
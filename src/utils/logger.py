@@ -1,22 +1,119 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import multiprocessing
+import queue
+from datetime import datetime
 from pathlib import Path
 
-# Создаём папку logs, если её нет
-log_dir = Path("logs")
-log_dir.mkdir(parents=True, exist_ok=True)
-
-# Настраиваем логирование
-logging.basicConfig(
-    level=logging.INFO,  # INFO — достаточно для основных событий
-    format="%(asctime)s | %(levelname)s | %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-    handlers=[
-        logging.FileHandler(log_dir / "bot.log", encoding="utf-8"),
-        logging.StreamHandler()  # Чтобы и в консоль выводилось
-    ]
+from src.config.settings import (
+    LOG_BACKUPS,
+    LOG_DIR,
+    LOG_LEVEL,
+    LOG_LEVELS,
+    LOG_MAX_BYTES,
+    LOG_ROTATE_WHEN,
+    LOG_ROTATION,
 )
 
+CONSOLE_FORMAT = "%(asctime)s | %(levelname)s | %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Одна запись — одна строка JSON: удобно для grep, jq и сборщиков логов"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "process": record.processName,
+        }
+        # Трейсбек приходит из очереди уже текстом (см. _TextQueueHandler)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _TextQueueHandler(logging.handlers.QueueHandler):
+    """
+    Кладёт в очередь копию записи с уже подставленным текстом; трейсбек
+    не склеивается с сообщением, а передаётся строкой в exc_text —
+    в JSON он попадает отдельным полем.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # Объект трейсбека нельзя хранить в очереди вечно — заменяем текстом
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _log_file() -> Path:
+    # Процессы-шарды пишут каждый в свой файл: ротация одного файла из нескольких процессов небезопасна
+    process = multiprocessing.current_process().name
+    suffix = "" if process == "MainProcess" else f".{process}"
+    return LOG_DIR / f"bot{suffix}.jsonl"
+
+
+def _file_handler() -> logging.Handler:
+    path = _log_file()
+    if LOG_ROTATION == "time":
+        return logging.handlers.TimedRotatingFileHandler(path, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUPS,
+                                                         encoding="utf-8")
+    return logging.handlers.RotatingFileHandler(path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS,
+                                                encoding="utf-8")
+
+
+def setup_logging() -> logging.handlers.QueueListener:
+    """
+    Логи пишет фоновый поток: логгеры только кладут запись в очередь,
+    поэтому запись в файл и консоль не блокирует цикл событий.
+
+    Returns:
+        QueueListener: Поток-писатель (останавливается при выходе из процесса)
+    """
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+
+    console = logging.StreamHandler()  # Чтобы и в консоль выводилось
+    console.setFormatter(logging.Formatter(CONSOLE_FORMAT, DATE_FORMAT))
+    file_handler = _file_handler()
+    file_handler.setFormatter(JsonLinesFormatter())
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_TextQueueHandler(records))
+    root.setLevel(LOG_LEVEL)
+
+    for item in filter(None, (part.strip() for part in LOG_LEVELS.split(","))):
+        name, _, level = item.partition("=")
+        logging.getLogger(name.strip()).setLevel(level.strip().upper())
+
+    listener = logging.handlers.QueueListener(records, console, file_handler, respect_handler_level=True)
+    listener.start()
+    # При выходе дописываем всё, что осталось в очереди
+    atexit.register(listener.stop)
+    return listener
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Логгер модуля: schedule_bot.<name>, уровень можно задать через LOG_LEVELS"""
+    return logging.getLogger(f"schedule_bot.{name}")
+
+
+listener = setup_logging()
 log = logging.getLogger("schedule_bot")
 
 # Тестовое сообщение — удали, если не нужно
-log.info("🔧 Логгер успешно инициализирован")
\ No newline at end of file
+log.info("🔧 Логгер успешно инициализирован")
@@ -0,0 +1,137 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+# Функции, в которых цикл событий ждёт ввода-вывода: такие выборки — простой, а не нагрузка
+IDLE_FUNCTIONS = {"select", "poll", "epoll", "_run_once"}
+# Кадры самого asyncio есть почти в каждом стеке — в таблицу общего времени их не берём
+ASYNCIO_DIR = os.path.dirname(asyncio.__file__)
+
+
+class SamplingProfiler:
+    """
+    Выборочный профилировщик потока с циклом событий.
+
+    Отдельный поток раз в interval снимает стек целевого потока через
+    sys._current_frames() и считает, какие функции в нём встречаются.
+    Код бота не меняется и не замедляется, пока профилировщик выключен.
+    """
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self._thread: Optional[threading.Thread] = None
+        self._halt = threading.Event()
+        self._stop_requested: Optional[asyncio.Event] = None
+        self._self_counts: Counter = Counter()
+        self._total_counts: Counter = Counter()
+        self._samples = 0
+        self._idle = 0
+        self._started = 0.0
+        self._duration = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def _sample_loop(self, thread_id: int) -> None:
+        while not self._halt.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            if frame is None:
+                return
+            leaf = frame.f_code
+            self._samples += 1
+            if leaf.co_name in IDLE_FUNCTIONS:
+                self._idle += 1
+                continue
+            self._self_counts[(leaf.co_filename, leaf.co_firstlineno, leaf.co_name)] += 1
+            seen = set()
+            while frame is not None:
+                code = frame.f_code
+                if not code.co_filename.startswith(ASYNCIO_DIR):
+                    seen.add((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            self._total_counts.update(seen)
+
+    def start(self) -> None:
+        """
+        Начинает снимать выборки с текущего потока (потока цикла событий).
+
+        Вызывается синхронно из хендлера до create_task(run()): так второе
+        быстрое нажатие уже видит running и не запускает второй профилировщик.
+        """
+        if self.running:
+            return
+        self._stop_requested = asyncio.Event()
+        self._self_counts.clear()
+        self._total_counts.clear()
+        self._samples = self._idle = 0
+        self._halt.clear()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample_loop, args=(threading.get_ident(),),
+                                        name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        if not self.running:
+            return
+        self._halt.set()
+        # Поток выборок просыпается раз в interval, но join в цикле событий ждать не должен
+        await asyncio.to_thread(self._thread.join)
+        self._thread = None
+        self._duration = time.perf_counter() - self._started
+
+    async def run(self, seconds: float) -> None:
+        """Профилирует seconds секунд или до request_stop(); если start() уже был, продолжает его"""
+        self.start()
+        try:
+            await asyncio.wait_for(self._stop_requested.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._stop_requested = None
+            await self.stop()
+
+    def request_stop(self) -> None:
+        """Досрочно завершает run()"""
+        if self._stop_requested is not None:
+            self._stop_requested.set()
+
+    def report(self, top: int = 30) -> str:
+        """
+        Текстовый отчёт: самые частые функции по собственному и по общему времени.
+
+        Args:
+            top (int): Сколько функций показать в каждой таблице
+
+        Returns:
+            str: Отчёт для отправки файлом
+        """
+        busy = self._samples - self._idle
+        lines = [
+            f"Длительность: {self._duration:.1f} с, выборок: {self._samples} (шаг {self.interval * 1000:.0f} мс)",
+            f"Цикл событий занят: {busy / max(1, self._samples):.1%} выборок, простой: {self._idle}",
+            "",
+        ]
+        for title, counts in (("Собственное время (функция на вершине стека)", self._self_counts),
+                              ("Общее время (функция где-то в стеке)", self._total_counts)):
+            lines.append(f"=== {title} ===")
+            lines.append(f"{'выборок':>8} {'доля':>7}  функция")
+            for (filename, line, name), count in counts.most_common(top):
+                lines.append(f"{count:>8} {count / max(1, busy):>7.1%}  {name}  {_short_path(filename)}:{line}")
+            lines.append("")
+        return "\n".join(lines)
+
+
+def _short_path(filename: str) -> str:
+    try:
+        relative = os.path.relpath(filename)
+    except ValueError:
+        return filename
+    return filename if relative.startswith("..") else relative
+
+
+profiler = SamplingProfiler()
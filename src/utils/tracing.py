@@ -0,0 +1,108 @@
+import functools
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from src.config.settings import SLOW_UPDATE_MS
+from src.utils.logger import log
+from src.utils.metrics import registry
+
+MAX_SPANS = 200  # на случай цикла с запросами в одном обновлении
+
+SLOW_UPDATES = registry.counter("bot_slow_updates_total", "Обновления дольше SLOW_UPDATE_MS")
+
+_NO_SPAN = nullcontext()
+
+
+class Trace:
+    """
+    Отрезки времени одного обновления: хендлер, запросы к БД, отправка.
+
+    Задачи, созданные во время обработки, наследуют трассу через contextvars,
+    поэтому отрезки из них попадают сюда же.
+    """
+
+    __slots__ = ("name", "started", "spans", "duration")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.started = time.perf_counter()
+        self.spans: List[Tuple[str, float, float]] = []  # (имя, начало от старта, длительность)
+        self.duration = 0.0
+
+    def add(self, name: str, started: float, finished: float) -> None:
+        if len(self.spans) < MAX_SPANS:
+            self.spans.append((name, started - self.started, finished - started))
+
+    def finish(self) -> float:
+        self.duration = time.perf_counter() - self.started
+        return self.duration
+
+    def format(self) -> str:
+        lines = [f"{self.name}: {self.duration * 1000:.0f} мс"]
+        for name, offset, duration in sorted(self.spans, key=lambda span: span[1]):
+            lines.append(f"  +{offset * 1000:7.1f} мс  {duration * 1000:7.1f} мс  {name}")
+        return "\n".join(lines)
+
+
+_current: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current.get()
+
+
+class _Span:
+    __slots__ = ("trace", "name", "started")
+
+    def __init__(self, trace: Trace, name: str) -> None:
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self) -> "_Span":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        self.trace.add(self.name, self.started, time.perf_counter())
+        return False
+
+
+def span(name: str, trace: Optional[Trace] = None):
+    """
+    with span("db.get_schedule"): ... — отрезок в трассе текущего обновления.
+
+    Вне обработки обновления ничего не записывает.
+    """
+    trace = trace or _current.get()
+    if trace is None:
+        return _NO_SPAN
+    return _Span(trace, name)
+
+
+def traced(name: str):
+    """Декоратор для корутин: каждый вызов — отрезок name в трассе обновления"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with span(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+async def run_traced(name: str, coro) -> None:
+    """
+    Выполняет обработку обновления в отдельной трассе и пишет в лог,
+    если она заняла больше SLOW_UPDATE_MS.
+    """
+    trace = Trace(name)
+    token = _current.set(trace)
+    try:
+        await coro
+    finally:
+        _current.reset(token)
+        if trace.finish() * 1000 >= SLOW_UPDATE_MS:
+            SLOW_UPDATES.inc()
+            log.warning(f"🐢 Медленное обновление {trace.format()}")
@@ -0,0 +1,53 @@
+import asyncio
+import os
+from types import SimpleNamespace
+
+os.environ.setdefault("BOT_TOKEN", "123456:test")
+os.environ.setdefault("ADMIN_PASSWORD", "test")
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+
+from src.bot import webhook  # noqa: E402
+from src.bot.core import bot  # noqa: E402
+from src.bot.handlers import start_job  # noqa: E402
+from src.bot.jobs import DONE, jobs  # noqa: E402
+
+
+def test_job_progress_under_direct_reply(monkeypatch):
+    """Задача, запущенная из webhook-обновления, правит своё сообщение о ходе"""
+    sent, edits = [], []
+
+    async def api_send_message(chat_id, text, **kwargs):
+        sent.append((chat_id, text))
+        return SimpleNamespace(message_id=len(sent))
+
+    async def edit_message_text(text, chat_id=None, message_id=None, **kwargs):
+        edits.append((chat_id, message_id, text))
+
+    monkeypatch.setattr(bot, "send_message", api_send_message)
+    monkeypatch.setattr(bot, "_api_send_message", None, raising=False)
+    monkeypatch.setattr(bot, "edit_message_text", edit_message_text)
+    webhook.install_direct_replies(bot)
+
+    async def work(job):
+        return "готово"
+
+    async def scenario():
+        reply = webhook.DirectReply(api_send_message)
+        token = webhook._direct_reply.set(reply)
+        try:
+            # Ответ хендлера, отложенный до ответа на webhook, уходит раньше сообщения о задаче
+            await bot.send_message(1, "запускаю")
+            await start_job(1, "test_direct_reply", "Тест", work)
+        finally:
+            webhook._direct_reply.reset(token)
+        job = jobs.find_active("test_direct_reply") or jobs.history[0]
+        await job.task
+        return job
+
+    job = asyncio.run(scenario())
+
+    assert job.state == DONE
+    assert [text for _, text in sent][0] == "запускаю"
+    assert len(sent) == 2
+    assert edits and edits[-1][:2] == (1, 2)
+    assert "готово" in edits[-1][2]